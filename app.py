@@ -1,5 +1,6 @@
 import logging
 import os
+import tempfile
 from datetime import datetime
 
 from flask import Flask
@@ -30,6 +31,63 @@ app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
     "pool_pre_ping": True,
 }
 
+# How many weeks ahead show instances are kept materialized
+app.config["INSTANCE_HORIZON_WEEKS"] = int(os.environ.get("INSTANCE_HORIZON_WEEKS", 13))
+
+# Concurrent live lineup streams per process (see lineup_events.py)
+app.config["LINEUP_STREAM_MAX_CLIENTS"] = int(
+    os.environ.get("LINEUP_STREAM_MAX_CLIENTS", 8)
+)
+
+# Per-request SQL counting and N+1 detection (see query_tracker.py)
+app.config["SQL_INSTRUMENTATION"] = os.environ.get("SQL_INSTRUMENTATION") == "1"
+app.config["SQL_QUERY_BUDGET_STRICT"] = os.environ.get("SQL_QUERY_BUDGET_STRICT") == "1"
+# Usernames allowed to view /debug/queries outside debug mode, comma separated
+app.config["SQL_DEBUG_USERS"] = {
+    name.strip().lower()
+    for name in os.environ.get("SQL_DEBUG_USERS", "").split(",")
+    if name.strip()
+}
+
+# Raise instead of lazy loading relationships (see loader_profiles.py)
+app.config["RAISE_ON_LAZY_LOAD"] = os.environ.get("RAISE_ON_LAZY_LOAD") == "1"
+
+# Cached month calendar data (see cache.py): memory, file or none
+app.config["CALENDAR_CACHE"] = os.environ.get("CALENDAR_CACHE", "memory")
+app.config["CALENDAR_CACHE_TTL"] = int(os.environ.get("CALENDAR_CACHE_TTL", 300))
+# User name search index (see user_lookup.py)
+app.config["USERS_CACHE"] = os.environ.get("USERS_CACHE", "memory")
+app.config["USERS_CACHE_TTL"] = int(os.environ.get("USERS_CACHE_TTL", 600))
+# Logged-in user records with their show roles (see session_users.py)
+app.config["SESSION_USERS_CACHE"] = os.environ.get("SESSION_USERS_CACHE", "memory")
+app.config["SESSION_USERS_CACHE_TTL"] = int(
+    os.environ.get("SESSION_USERS_CACHE_TTL", 60)
+)
+app.config["SESSION_USERS_CACHE_SIZE"] = int(
+    os.environ.get("SESSION_USERS_CACHE_SIZE", 4096)
+)
+app.config["CACHE_DIR"] = os.environ.get("CACHE_DIR")
+
+# Email outbox (see email_outbox.py): ses, file or memory transport
+app.config["EMAIL_TRANSPORT"] = os.environ.get(
+    "EMAIL_TRANSPORT", "ses" if os.environ.get("AWS_ACCESS_KEY_ID") else "file"
+)
+app.config["EMAIL_FROM"] = os.environ.get("SES_FROM_EMAIL", "noreply@comedyopenmic.com")
+app.config["AWS_REGION"] = os.environ.get("AWS_REGION", "us-east-1")
+app.config["EMAIL_FILE_DIR"] = os.environ.get(
+    "EMAIL_FILE_DIR", os.path.join(tempfile.gettempdir(), "comedy_open_mics_mail")
+)
+app.config["EMAIL_MAX_ATTEMPTS"] = int(os.environ.get("EMAIL_MAX_ATTEMPTS", 5))
+app.config["EMAIL_SEND_CONCURRENCY"] = int(os.environ.get("EMAIL_SEND_CONCURRENCY", 4))
+# Public address used for links in emails, which may be rendered off-request
+app.config["EMAIL_BASE_URL"] = os.environ.get("EMAIL_BASE_URL", "http://localhost:5000")
+
+# Password hashing cost and concurrency (see passwords.py)
+app.config["PASSWORD_HASH_METHOD"] = os.environ.get("PASSWORD_HASH_METHOD", "scrypt")
+app.config["PASSWORD_SALT_LENGTH"] = int(os.environ.get("PASSWORD_SALT_LENGTH", 16))
+app.config["PASSWORD_HASH_THREADS"] = int(os.environ.get("PASSWORD_HASH_THREADS", 0))
+app.config["PASSWORD_HASH_QUEUE"] = int(os.environ.get("PASSWORD_HASH_QUEUE", 32))
+
 # Initialize the app with the extension
 db.init_app(app)
 
@@ -42,23 +100,49 @@ login_manager.login_message = "Please log in to access this page."
 
 @login_manager.user_loader
 def load_user(user_id):
-    from models import User
+    from session_users import load_session_user
 
-    return User.query.get(int(user_id))
+    return load_session_user(int(user_id))
 
 
 with app.app_context():
     # Make sure to import the models here or their tables won't be created
+    import indexes  # noqa: F401
     import models  # noqa: F401
 
     db.create_all()
 
 
+from query_tracker import init_query_tracking  # noqa: E402
+
+init_query_tracking(app, db)
+
+
 # Make current year available to all templates
 @app.context_processor
 def inject_current_year():
     return {"current_year": datetime.now().year}
 
 
-# Import routes to register them with the app
+# Import routes, CLI commands and cache hooks to register them with the app
+import cli  # noqa: F401
 import routes  # noqa: F401
+import session_users  # noqa: F401
+from email_service import init_email  # noqa: E402
+
+# Compile email templates once routes exist for their links
+init_email(app)
+
+# Optionally keep show instances materialized ahead from a background thread
+if os.environ.get("MATERIALIZE_INTERVAL_MINUTES"):
+    from scheduler import start_background_materializer
+
+    start_background_materializer(
+        app, int(os.environ["MATERIALIZE_INTERVAL_MINUTES"]) * 60
+    )
+
+# Optionally send queued email from a background thread
+if os.environ.get("EMAIL_WORKER_INTERVAL_SECONDS"):
+    from email_outbox import start_email_worker
+
+    start_email_worker(app, int(os.environ["EMAIL_WORKER_INTERVAL_SECONDS"]))
@@ -0,0 +1,171 @@
+"""
+Bulk writers for ShowInstance, Signup and User rows.
+
+Used for seeding, load testing and other large imports where going through
+the ORM unit of work one object at a time is far too slow. Rows are plain
+dicts keyed by column name. On PostgreSQL (psycopg2) they are streamed with
+COPY; elsewhere they go through a Core ``insert()`` executemany in batches.
+
+These writers bypass ORM events, so ``ShowInstance.signup_count`` and
+``is_full`` must be refreshed afterwards with ``refresh_signup_counts``.
+"""
+
+import csv
+import io
+from itertools import groupby, islice
+
+from sqlalchemy import bindparam, func, insert, select, update
+
+from app import db
+from models import ShowInstance, Signup, User
+from signup_service import refresh_fill_flags
+
+DEFAULT_BATCH_SIZE = 10_000
+BULK_MODELS = (ShowInstance, Signup, User)
+
+NULL = "\\N"
+
+
+def _batches(rows, size):
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+def _can_copy(connection):
+    return connection.dialect.name == "postgresql" and connection.dialect.driver in (
+        "psycopg2",
+    )
+
+
+def _with_defaults(table, rows):
+    """Fill Python-side column defaults, which COPY would otherwise skip"""
+    defaults = {}
+    for col in table.columns:
+        if col.default is not None and col.default.is_scalar:
+            defaults[col.name] = col.default.arg
+        elif col.default is not None and col.default.is_callable:
+            defaults[col.name] = col.default.arg(None)
+    for row in rows:
+        yield {**defaults, **row}
+
+
+def copy_columns(table):
+    """Columns written by COPY: every column but the autoincrement key"""
+    return [c.name for c in table.columns if c is not table.autoincrement_column]
+
+
+def _validated(table, rows, columns):
+    """Pass rows through, rejecting keys that aren't writable columns"""
+    allowed = set(columns)
+    for row in rows:
+        unknown = row.keys() - allowed
+        if unknown:
+            raise ValueError(
+                f"Unknown columns for {table.name}: {', '.join(sorted(unknown))}"
+            )
+        yield row
+
+
+def copy_csv(columns, batch):
+    """A CSV buffer of ``batch`` in ``columns`` order, for COPY ... FROM STDIN
+
+    Columns missing from a row are written as NULL.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in batch:
+        writer.writerow([NULL if row.get(c) is None else row[c] for c in columns])
+    buffer.seek(0)
+    return buffer
+
+
+def _copy_batch(connection, table, columns, batch):
+    quoted = ", ".join(f'"{c}"' for c in columns)
+    cursor = connection.connection.driver_connection.cursor()
+    try:
+        cursor.copy_expert(
+            f'COPY "{table.name}" ({quoted}) FROM STDIN '
+            f"WITH (FORMAT csv, NULL '{NULL}')",
+            copy_csv(columns, batch),
+        )
+    finally:
+        cursor.close()
+
+
+def bulk_insert(model, rows, batch_size=DEFAULT_BATCH_SIZE, use_copy=None):
+    """Insert an iterable of row dicts for ``model`` and return the count.
+
+    Runs on the current session's connection and transaction; the caller
+    commits. ``use_copy`` forces COPY on or off (default: when available).
+    Rows may leave out columns but not add unknown ones (ValueError); the
+    autoincrement id is always assigned by the database.
+    """
+    if model not in BULK_MODELS:
+        raise ValueError(f"Bulk insert is not supported for {model.__name__}")
+
+    table = model.__table__
+    columns = copy_columns(table)
+    rows = _validated(table, rows, columns)
+    connection = db.session.connection()
+    if use_copy is None:
+        use_copy = _can_copy(connection)
+
+    total = 0
+    if use_copy:
+        for batch in _batches(_with_defaults(table, rows), batch_size):
+            _copy_batch(connection, table, columns, batch)
+            total += len(batch)
+    else:
+        statement = insert(table)
+        for batch in _batches(rows, batch_size):
+            # executemany takes its columns from the first row, so rows with
+            # other keys go in their own statement
+            for _, group in groupby(batch, key=lambda row: frozenset(row)):
+                connection.execute(statement, list(group))
+            total += len(batch)
+    return total
+
+
+def bulk_insert_users(rows, **kwargs):
+    return bulk_insert(User, rows, **kwargs)
+
+
+def bulk_insert_instances(rows, **kwargs):
+    return bulk_insert(ShowInstance, rows, **kwargs)
+
+
+def bulk_insert_signups(rows, **kwargs):
+    return bulk_insert(Signup, rows, **kwargs)
+
+
+def refresh_signup_counts(instance_ids=None):
+    """Recompute ShowInstance.signup_count and is_full from the Signup table.
+
+    Counts are grouped in one query and written back with an executemany
+    UPDATE, which stays fast without an index on Signup.show_instance_id.
+    """
+    table = ShowInstance.__table__
+    counts = select(Signup.show_instance_id, func.count(Signup.id)).group_by(
+        Signup.show_instance_id
+    )
+    reset = update(table).values(signup_count=0)
+    if instance_ids is not None:
+        counts = counts.where(Signup.show_instance_id.in_(instance_ids))
+        reset = reset.where(table.c.id.in_(instance_ids))
+
+    rows = [
+        {"instance_id": instance_id, "count": count}
+        for instance_id, count in db.session.execute(counts)
+    ]
+    connection = db.session.connection()
+    connection.execute(reset)
+    if rows:
+        connection.execute(
+            update(table)
+            .where(table.c.id == bindparam("instance_id"))
+            .values(signup_count=bindparam("count")),
+            rows,
+        )
+    refresh_fill_flags(db.session, instance_ids)
+    return len(rows)
@@ -0,0 +1,159 @@
+"""
+Small pluggable caches with LRU eviction and TTL expiry.
+
+Each named cache is configured from the app config:
+
+- ``<NAME>_CACHE``: ``memory`` (per process, default), ``file`` (shared by
+  processes on one host) or ``none``
+- ``<NAME>_CACHE_TTL``: seconds before an entry expires (default 300)
+- ``<NAME>_CACHE_SIZE``: maximum entries kept in memory (default 128)
+- ``CACHE_DIR``: where file caches keep their entries
+
+``get_cache("calendar")`` returns the app's instance, creating it on first
+use and keeping it in ``app.extensions["caches"]``.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+
+DEFAULT_TTL = 300
+DEFAULT_SIZE = 128
+
+
+class MemoryCache:
+    """Thread-safe in-process LRU cache whose entries expire after ``ttl``"""
+
+    def __init__(self, maxsize=DEFAULT_SIZE, ttl=DEFAULT_TTL, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires, value = entry
+            if expires <= self._clock():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class FileCache:
+    """Pickle-per-key cache in a directory, shared across processes"""
+
+    def __init__(self, directory, ttl=DEFAULT_TTL, clock=time.time):
+        self.directory = directory
+        self.ttl = ttl
+        self._clock = clock
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        digest = hashlib.sha1(str(key).encode()).hexdigest()
+        return os.path.join(self.directory, f"{digest}.pickle")
+
+    def get(self, key, default=None):
+        try:
+            with open(self._path(key), "rb") as f:
+                expires, value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return default
+        if expires <= self._clock():
+            self.delete(key)
+            return default
+        return value
+
+    def set(self, key, value):
+        # Write to a temp file and rename so readers never see partial data
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump((self._clock() + self.ttl, value), f)
+        os.replace(temp_path, self._path(key))
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith(".pickle"):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    pass
+
+
+class NullCache:
+    """Cache that stores nothing, for disabling caching"""
+
+    def get(self, key, default=None):
+        return default
+
+    def set(self, key, value):
+        pass
+
+    def delete(self, key):
+        pass
+
+    def clear(self):
+        pass
+
+
+def make_cache(name, config):
+    """Build the cache backend configured for ``name``"""
+    prefix = name.upper()
+    kind = config.get(f"{prefix}_CACHE", "memory")
+    ttl = config.get(f"{prefix}_CACHE_TTL", DEFAULT_TTL)
+
+    if kind == "memory":
+        return MemoryCache(
+            maxsize=config.get(f"{prefix}_CACHE_SIZE", DEFAULT_SIZE), ttl=ttl
+        )
+    if kind == "file":
+        base = config.get("CACHE_DIR") or os.path.join(
+            tempfile.gettempdir(), "comedy_open_mics_cache"
+        )
+        return FileCache(os.path.join(base, name), ttl=ttl)
+    if kind == "none":
+        return NullCache()
+    raise ValueError(f"Unknown {prefix}_CACHE backend: {kind}")
+
+
+def get_cache(name, app=None):
+    """The app's cache called ``name``, created on first use"""
+    app = app or current_app._get_current_object()
+    caches = app.extensions.setdefault("caches", {})
+    if name not in caches:
+        caches[name] = make_cache(name, app.config)
+    return caches[name]
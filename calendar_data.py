@@ -0,0 +1,246 @@
+"""
+Batched data access for the month calendar.
+
+Builds the ``events_by_date`` mapping rendered by ``calendar.html`` with a
+fixed number of queries, no matter how many show instances fall in the month.
+
+The month grid is the same for everyone, so it is split into a shared
+payload (instance cards, which carry their signup counts), cached per month in the
+``calendar`` cache, and a per-user overlay (which instances the viewer owns
+or is signed up for). Flushes that add or remove signups, or change
+instances or shows, invalidate the affected months once the transaction
+commits.
+"""
+
+import base64
+import binascii
+from datetime import date
+
+from flask import has_app_context
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app import db
+from cache import get_cache
+from models import Show, ShowInstance, Signup
+from read_models import instance_cards
+
+DEFAULT_COLOR = "#6c757d"  # Default dull gray
+OWNED_COLOR = "#dc3545"  # Red for owned events
+SIGNED_UP_COLOR = "#28a745"  # Green for signed up events
+
+
+def get_month_instances(month_start, next_month_start):
+    """Get read-only cards for active instances in the range"""
+    return instance_cards(month_start, next_month_start)
+
+
+def get_user_signup_ids(user_id, month_start, next_month_start):
+    """Get the set of instance IDs in the range the user is signed up for"""
+    rows = (
+        db.session.query(Signup.show_instance_id)
+        .join(ShowInstance, Signup.show_instance_id == ShowInstance.id)
+        .filter(
+            Signup.comedian_id == user_id,
+            ShowInstance.instance_date >= month_start,
+            ShowInstance.instance_date < next_month_start,
+        )
+        .all()
+    )
+    return {row[0] for row in rows}
+
+
+FEED_DEFAULT_DAYS = 90
+FEED_PAGE_SIZE = 500
+FEED_MAX_PAGE_SIZE = 2000
+
+
+def encode_cursor(card):
+    """Opaque keyset cursor pointing just past ``card``"""
+    raw = f"{card.instance_date.isoformat()},{card.id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """``(instance_date, id)`` from a cursor, or ValueError"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        day, instance_id = base64.urlsafe_b64decode(padded).decode().split(",")
+        return date.fromisoformat(day), int(instance_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+
+def feed_page(
+    start,
+    end,
+    show_id=None,
+    venue=None,
+    open_only=False,
+    cursor=None,
+    limit=FEED_PAGE_SIZE,
+):
+    """One keyset page of calendar feed cards and the cursor for the next
+
+    The next cursor is None on the last page. ``limit=None`` returns every
+    card in the range as a single page.
+    """
+    after = decode_cursor(cursor) if cursor else None
+    cards = instance_cards(
+        start,
+        end,
+        show_id=show_id,
+        venue=venue,
+        open_only=open_only,
+        after=after,
+        limit=None if limit is None else limit + 1,
+    )
+    if limit is None or len(cards) <= limit:
+        return cards, None
+    cards = cards[:limit]
+    return cards, encode_cursor(cards[-1])
+
+
+def month_bounds(day):
+    """First day of ``day``'s month and of the following month"""
+    month_start = day.replace(day=1)
+    if month_start.month == 12:
+        return month_start, date(month_start.year + 1, 1, 1)
+    return month_start, date(month_start.year, month_start.month + 1, 1)
+
+
+def _month_key(month_start):
+    return f"month:{month_start.isoformat()}"
+
+
+def get_month_payload(month_start, next_month_start):
+    """Shared calendar data for the range, cached when it is one whole month"""
+    cacheable = month_bounds(month_start) == (month_start, next_month_start)
+    cache = get_cache("calendar")
+    if cacheable:
+        payload = cache.get(_month_key(month_start))
+        if payload is not None:
+            return payload
+
+    payload = {"instances": get_month_instances(month_start, next_month_start)}
+    if cacheable:
+        cache.set(_month_key(month_start), payload)
+    return payload
+
+
+def build_events_by_date(month_start, next_month_start, user=None):
+    """Group the month's instances by date for the calendar template.
+
+    Runs two queries (one without a user) regardless of instance count, or
+    only the user's signup lookup when the month is cached. Signup counts
+    come from the denormalized ShowInstance.signup_count.
+    """
+    payload = get_month_payload(month_start, next_month_start)
+    instances = payload["instances"]
+    if not instances:
+        return {}
+
+    user_signup_ids = set()
+    if user is not None and user.is_authenticated:
+        user_signup_ids = get_user_signup_ids(user.id, month_start, next_month_start)
+
+    events_by_date = {}
+    for instance in instances:
+        # Determine color based on user's relationship to event
+        background_color = DEFAULT_COLOR
+        color_class = "default-event"
+
+        if user is not None and user.is_authenticated:
+            if instance.show.owner_id == user.id:
+                background_color = OWNED_COLOR
+                color_class = "owned-event"
+            elif instance.id in user_signup_ids:
+                background_color = SIGNED_UP_COLOR
+                color_class = "signed-up-event"
+
+        events_by_date.setdefault(instance.instance_date, []).append(
+            {
+                "event": instance,
+                "date": instance.instance_date,
+                "signup_count": instance.signup_count,
+                "background_color": background_color,
+                "color_class": color_class,
+            }
+        )
+
+    return events_by_date
+
+
+def mark_dates_changed(session, dates=(), all_months=False):
+    """Queue calendar months for invalidation when ``session`` commits"""
+    pending = session.info.setdefault(
+        "calendar_changes", {"months": set(), "all": False}
+    )
+    pending["months"].update(month_bounds(day)[0] for day in dates)
+    pending["all"] = pending["all"] or all_months
+
+
+def invalidate_months(months=(), all_months=False):
+    """Drop cached month payloads now"""
+    cache = get_cache("calendar")
+    if all_months:
+        cache.clear()
+        return
+    for month_start in months:
+        cache.delete(_month_key(month_start))
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_months(session, flush_context):
+    """Note which months' shared calendar data this flush changed"""
+    dates = set()
+    instance_ids = set()
+    all_months = False
+
+    for obj in session.new | session.deleted:
+        if isinstance(obj, Signup):
+            instance_ids.add(obj.show_instance_id)
+        elif isinstance(obj, ShowInstance):
+            dates.add(obj.instance_date)
+        elif isinstance(obj, Show) and obj in session.deleted:
+            all_months = True
+
+    for obj in session.dirty:
+        if not session.is_modified(obj, include_collections=False):
+            continue
+        if isinstance(obj, ShowInstance):
+            history = db.inspect(obj).attrs.instance_date.history
+            if history.added and not history.deleted:
+                # Moved from a date that was never loaded, so any month
+                all_months = True
+            dates.update(history.deleted or ())
+            dates.add(obj.instance_date)
+        elif isinstance(obj, Show):
+            # Names, venues and times appear on every month of the show
+            all_months = True
+
+    instance_ids.discard(None)
+    if instance_ids:
+        dates.update(
+            session.execute(
+                select(ShowInstance.instance_date).where(
+                    ShowInstance.id.in_(instance_ids)
+                )
+            ).scalars()
+        )
+
+    dates.discard(None)
+    if dates or all_months:
+        mark_dates_changed(session, dates, all_months)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_months(session):
+    pending = session.info.pop("calendar_changes", None)
+    if pending and (pending["months"] or pending["all"]) and has_app_context():
+        invalidate_months(pending["months"], pending["all"])
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_months(session):
+    session.info.pop("calendar_changes", None)
@@ -0,0 +1,64 @@
+"""
+Flask CLI commands for maintenance jobs
+"""
+
+import json
+
+import click
+
+from app import app
+
+
+@app.cli.command("materialize-instances")
+@click.option(
+    "--weeks",
+    type=int,
+    default=None,
+    help="How many weeks ahead to keep instances created.",
+)
+@click.option("--batch-size", type=int, default=200, help="Shows per batch.")
+def materialize_instances_command(weeks, batch_size):
+    """Create missing show instances for every active show."""
+    from scheduler import DEFAULT_HORIZON_WEEKS, sweep
+
+    weeks = weeks or app.config.get("INSTANCE_HORIZON_WEEKS", DEFAULT_HORIZON_WEEKS)
+    result = sweep(weeks, batch_size)
+    click.echo(json.dumps(result))
+
+
+@app.cli.command("upgrade-db")
+def upgrade_db_command():
+    """Apply pending schema migrations."""
+    from migrations import upgrade
+
+    try:
+        applied = upgrade()
+    except RuntimeError as exc:
+        raise click.ClickException(str(exc)) from exc
+    for name in applied:
+        click.echo(f"✓ Applied {name}")
+    if not applied:
+        click.echo("Database schema is up to date")
+
+
+@app.cli.command("send-emails")
+@click.option("--batch-size", type=int, default=50, help="Messages per batch.")
+def send_emails_command(batch_size):
+    """Send every queued email that is due."""
+    from email_outbox import drain
+
+    click.echo(json.dumps(drain(batch_size)))
+
+
+@app.cli.command("reconcile-signup-counts")
+@click.option("--dry-run", is_flag=True, help="Report drift without fixing it.")
+def reconcile_signup_counts_command(dry_run):
+    """Fix ShowInstance signup counts and full flags that drifted."""
+    from signup_service import reconcile_signup_counts
+
+    drift = reconcile_signup_counts(fix=not dry_run)
+    for instance_id, stored, actual, full in drift:
+        click.echo(f"instance {instance_id}: signup_count {stored} -> {actual}")
+    click.echo(
+        json.dumps({"drifted": len(drift), "fixed": 0 if dry_run else len(drift)})
+    )
@@ -0,0 +1,231 @@
+"""
+Dashboard payloads in two queries.
+
+The combined and host dashboards need the shows a user owns, runs or hosts,
+upcoming instances of those shows, the user's next signups and a few
+counts. Rather than a query per list (plus lazy role and signup
+collections), everything is read with two statements that share a
+``memberships`` CTE, the same UNION permissions.py uses for roles:
+
+1. the user's signup totals (one aggregate row) LEFT JOINed to their shows,
+   each with its role and upcoming instance count from grouped CTEs, so
+   users with no shows still get their counts
+2. a UNION ALL of the next instances of those shows and the user's next
+   signups, as read-model cards
+
+Callers that don't render those lists pass ``instances=False`` and skip
+the second statement. Counts are computed in SQL; no collection is loaded to take its length.
+"""
+
+from dataclasses import dataclass, field
+from datetime import date, time
+
+from sqlalchemy import case, func, literal, null, select, true, union_all
+
+from app import db
+from models import Show, ShowInstance, Signup
+from permissions import ROLE_RANK, membership_query
+from read_models import InstanceCard, card_columns, instance_card
+
+UPCOMING_LIMIT = 10
+RECENT_SIGNUPS_LIMIT = 5
+
+
+@dataclass(slots=True, frozen=True)
+class DashboardShow:
+    id: int
+    name: str
+    venue: str
+    day_of_week: str
+    start_time: time
+    end_time: time | None
+    max_signups: int
+    description: str | None
+    owner_id: int
+    ended_date: date | None
+    is_deleted: bool
+    role: str
+    upcoming_instance_count: int = 0
+
+    @property
+    def is_active(self):
+        """Same as Show.is_active: not deleted and not permanently ended"""
+        return not self.is_deleted and self.ended_date is None
+
+
+@dataclass(slots=True, frozen=True)
+class SignupCard:
+    id: int
+    position: int | None
+    show_instance: InstanceCard
+
+
+@dataclass(slots=True)
+class Dashboard:
+    owned_shows: list = field(default_factory=list)
+    managed_shows: list = field(default_factory=list)
+    upcoming_instances: list = field(default_factory=list)
+    recent_signups: list = field(default_factory=list)
+    signup_count: int = 0
+    upcoming_signup_count: int = 0
+    performed_count: int = 0
+
+    @property
+    def all_shows(self):
+        return self.owned_shows + self.managed_shows
+
+
+def _memberships(user_id):
+    return membership_query(user_id).cte("memberships")
+
+
+def _shows_and_counts(user_id, today):
+    """Statement 1: signup totals joined to each show with its role"""
+    memberships = _memberships(user_id)
+    stats = (
+        select(
+            func.count(Signup.id).label("signup_count"),
+            func.coalesce(
+                func.sum(case((ShowInstance.instance_date >= today, 1), else_=0)), 0
+            ).label("upcoming_signup_count"),
+            func.coalesce(
+                func.sum(case((Signup.performed == True, 1), else_=0)), 0  # noqa: E712
+            ).label("performed_count"),
+        )
+        .select_from(Signup)
+        .join(ShowInstance, Signup.show_instance_id == ShowInstance.id)
+        .where(Signup.comedian_id == user_id)
+        .cte("signup_stats")
+    )
+    upcoming = (
+        select(
+            ShowInstance.show_id, func.count(ShowInstance.id).label("instance_count")
+        )
+        .where(
+            ShowInstance.show_id.in_(select(memberships.c.show_id)),
+            ShowInstance.instance_date >= today,
+            ShowInstance.is_cancelled == False,  # noqa: E712
+        )
+        .group_by(ShowInstance.show_id)
+        .cte("upcoming_counts")
+    )
+    shows = (
+        select(
+            Show.id,
+            Show.name,
+            Show.venue,
+            Show.day_of_week,
+            Show.start_time,
+            Show.end_time,
+            Show.max_signups,
+            Show.description,
+            Show.owner_id,
+            Show.ended_date,
+            Show.is_deleted,
+            memberships.c.role,
+            func.coalesce(upcoming.c.instance_count, 0).label("instance_count"),
+        )
+        .join(memberships, memberships.c.show_id == Show.id)
+        .outerjoin(upcoming, upcoming.c.show_id == Show.id)
+        .where(Show.is_deleted == False)  # noqa: E712
+        .subquery("shows")
+    )
+    return (
+        select(stats, shows)
+        .select_from(stats.outerjoin(shows, true()))
+        .order_by(shows.c.name, shows.c.id)
+    )
+
+
+def _instances(user_id, today, upcoming_limit, signups_limit):
+    """Statement 2: upcoming instances of the user's shows and their signups"""
+    memberships = _memberships(user_id)
+    managed = (
+        select(
+            *card_columns(),
+            literal("managed").label("kind"),
+            null().label("signup_id"),
+            null().label("signup_position"),
+        )
+        .join(Show, ShowInstance.show_id == Show.id)
+        .where(
+            ShowInstance.show_id.in_(select(memberships.c.show_id)),
+            Show.is_deleted == False,  # noqa: E712
+            ShowInstance.instance_date >= today,
+            ShowInstance.is_cancelled == False,  # noqa: E712
+        )
+        .order_by(ShowInstance.instance_date, ShowInstance.id)
+        .limit(upcoming_limit)
+        .subquery()
+    )
+    signed_up = (
+        select(
+            *card_columns(),
+            literal("signup").label("kind"),
+            Signup.id.label("signup_id"),
+            Signup.position.label("signup_position"),
+        )
+        .select_from(Signup)
+        .join(ShowInstance, Signup.show_instance_id == ShowInstance.id)
+        .join(Show, ShowInstance.show_id == Show.id)
+        .where(Signup.comedian_id == user_id, ShowInstance.instance_date >= today)
+        .order_by(ShowInstance.instance_date, ShowInstance.id)
+        .limit(signups_limit)
+        .subquery()
+    )
+    combined = union_all(select(managed), select(signed_up)).subquery()
+    return select(combined).order_by(combined.c.instance_date, combined.c.id)
+
+
+def build_dashboard(
+    user_id,
+    today=None,
+    instances=True,
+    upcoming_limit=UPCOMING_LIMIT,
+    signups_limit=RECENT_SIGNUPS_LIMIT,
+):
+    """The user's dashboard data in two queries (one without ``instances``)"""
+    today = today or date.today()
+    dashboard = Dashboard()
+    shows = {}
+    for row in db.session.execute(_shows_and_counts(user_id, today)):
+        dashboard.signup_count = row.signup_count
+        dashboard.upcoming_signup_count = row.upcoming_signup_count
+        dashboard.performed_count = row.performed_count
+        if row.id is None:
+            continue
+        # A show can appear once per role; keep the highest
+        current = shows.get(row.id)
+        if current is None or ROLE_RANK[row.role] > ROLE_RANK[current.role]:
+            shows[row.id] = DashboardShow(
+                id=row.id,
+                name=row.name,
+                venue=row.venue,
+                day_of_week=row.day_of_week,
+                start_time=row.start_time,
+                end_time=row.end_time,
+                max_signups=row.max_signups,
+                description=row.description,
+                owner_id=row.owner_id,
+                ended_date=row.ended_date,
+                is_deleted=bool(row.is_deleted),
+                role=row.role,
+                upcoming_instance_count=row.instance_count,
+            )
+    for show in shows.values():
+        if show.role == "owner":
+            dashboard.owned_shows.append(show)
+        else:
+            dashboard.managed_shows.append(show)
+
+    if instances:
+        statement = _instances(user_id, today, upcoming_limit, signups_limit)
+        for row in db.session.execute(statement):
+            card = instance_card(row)
+            if row.kind == "managed":
+                dashboard.upcoming_instances.append(card)
+            else:
+                dashboard.recent_signups.append(
+                    SignupCard(row.signup_id, row.signup_position, card)
+                )
+    return dashboard
@@ -0,0 +1,278 @@
+"""
+Persistent email outbox and background sender.
+
+Requests never talk to the mail provider: ``enqueue_email`` adds a row to
+the ``email_outbox`` table in the caller's transaction, so a message is
+only queued if the change that triggered it commits. ``send_pending``
+claims a batch of due rows (``FOR UPDATE SKIP LOCKED`` on Postgres, so
+several workers can share the queue), hands them to the app's transport on
+a small thread pool, and records the outcome. Failures are retried with
+exponential backoff until ``EMAIL_MAX_ATTEMPTS`` is reached.
+
+Transports are chosen with ``EMAIL_TRANSPORT``:
+
+- ``ses``: Amazon SES through one long-lived boto3 client per process,
+  whose connection pool is sized for the send concurrency
+- ``file``: writes each message as an ``.eml`` file to ``EMAIL_FILE_DIR``
+- ``memory``: keeps messages in a list, for tests
+
+Run the sender with ``flask send-emails`` or start the background thread
+with ``start_email_worker``.
+"""
+
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+
+from flask import current_app
+from sqlalchemy import insert, select
+
+from app import db
+from models import OutboundEmail
+
+DEFAULT_BATCH_SIZE = 50
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 6 * 60 * 60
+
+
+class SESTransport:
+    """Sends through Amazon SES with a client shared by every send"""
+
+    def __init__(self, region, sender, max_connections=10):
+        import boto3
+        from botocore.config import Config
+
+        self.sender = sender
+        # boto3 clients are thread-safe; one per process keeps TLS
+        # connections open between sends instead of reconnecting each time
+        self.client = boto3.client(
+            "ses",
+            region_name=region,
+            config=Config(
+                max_pool_connections=max_connections,
+                retries={"max_attempts": 2, "mode": "standard"},
+            ),
+        )
+
+    def send(self, message):
+        body = {"Text": {"Data": message.text_body}}
+        if message.html_body:
+            body["Html"] = {"Data": message.html_body}
+        self.client.send_email(
+            Source=self.sender,
+            Destination={"ToAddresses": [message.to_address]},
+            Message={"Subject": {"Data": message.subject}, "Body": body},
+        )
+
+
+class FileTransport:
+    """Writes each message to a directory as an .eml file"""
+
+    def __init__(self, directory, sender):
+        self.directory = directory
+        self.sender = sender
+        os.makedirs(directory, exist_ok=True)
+
+    def send(self, message):
+        email = EmailMessage()
+        email["From"] = self.sender
+        email["To"] = message.to_address
+        email["Subject"] = message.subject
+        email.set_content(message.text_body)
+        if message.html_body:
+            email.add_alternative(message.html_body, subtype="html")
+        path = os.path.join(self.directory, f"{message.id:08d}.eml")
+        with open(path, "wb") as f:
+            f.write(bytes(email))
+
+
+class MemoryTransport:
+    """Collects messages in ``sent``; set ``fail`` to simulate outages"""
+
+    def __init__(self):
+        self.sent = []
+        self.fail = None
+
+    def send(self, message):
+        if self.fail:
+            raise self.fail
+        self.sent.append(
+            {
+                "to": message.to_address,
+                "subject": message.subject,
+                "text": message.text_body,
+                "html": message.html_body,
+            }
+        )
+
+
+def make_transport(config):
+    """Build the transport configured by EMAIL_TRANSPORT"""
+    kind = config.get("EMAIL_TRANSPORT", "file")
+    sender = config.get("EMAIL_FROM", "noreply@comedyopenmic.com")
+    if kind == "ses":
+        return SESTransport(
+            config.get("AWS_REGION", "us-east-1"),
+            sender,
+            max_connections=config.get("EMAIL_SEND_CONCURRENCY", 4),
+        )
+    if kind == "file":
+        return FileTransport(config["EMAIL_FILE_DIR"], sender)
+    if kind == "memory":
+        return MemoryTransport()
+    raise ValueError(f"Unknown EMAIL_TRANSPORT: {kind}")
+
+
+def get_transport(app=None):
+    """The app's transport, created once and reused by every batch"""
+    app = app or current_app._get_current_object()
+    if "email_transport" not in app.extensions:
+        app.extensions["email_transport"] = make_transport(app.config)
+    return app.extensions["email_transport"]
+
+
+def enqueue_email(to_address, subject, text_body, html_body=None, kind=None):
+    """Queue a message in the current transaction (the caller commits)"""
+    message = OutboundEmail(
+        to_address=to_address,
+        subject=subject,
+        text_body=text_body,
+        html_body=html_body,
+        kind=kind,
+    )
+    db.session.add(message)
+    return message
+
+
+def enqueue_emails(messages, kind=None):
+    """Queue many rendered messages with one executemany INSERT
+
+    ``messages`` yields objects with to_address, subject, text_body and
+    html_body. Returns how many were queued (the caller commits).
+    """
+    now = datetime.utcnow()
+    rows = [
+        {
+            "to_address": message.to_address,
+            "subject": message.subject,
+            "text_body": message.text_body,
+            "html_body": message.html_body,
+            "kind": kind,
+            "status": "pending",
+            "attempts": 0,
+            "next_attempt_at": now,
+            "created_at": now,
+        }
+        for message in messages
+    ]
+    if rows:
+        db.session.execute(insert(OutboundEmail), rows)
+    return len(rows)
+
+
+def backoff(attempts):
+    """Delay before retry number ``attempts``, doubling with some jitter"""
+    delay = min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS)
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def _claim_batch(batch_size, now):
+    query = (
+        select(OutboundEmail)
+        .where(
+            OutboundEmail.status == "pending",
+            OutboundEmail.next_attempt_at <= now,
+        )
+        .order_by(OutboundEmail.next_attempt_at, OutboundEmail.id)
+        .limit(batch_size)
+    )
+    if db.engine.dialect.name == "postgresql":
+        query = query.with_for_update(skip_locked=True)
+    return db.session.scalars(query).all()
+
+
+def _attempt(transport, message):
+    try:
+        transport.send(message)
+    except Exception as e:
+        return e
+    return None
+
+
+def send_pending(batch_size=DEFAULT_BATCH_SIZE, transport=None):
+    """Send one batch of due messages and return counts by outcome"""
+    app = current_app._get_current_object()
+    transport = transport or get_transport(app)
+    max_attempts = app.config.get("EMAIL_MAX_ATTEMPTS", 5)
+    now = datetime.utcnow()
+
+    batch = _claim_batch(batch_size, now)
+    result = {"sent": 0, "retrying": 0, "failed": 0}
+    if not batch:
+        db.session.commit()
+        return result
+
+    workers = min(app.config.get("EMAIL_SEND_CONCURRENCY", 4), len(batch))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        errors = list(pool.map(lambda message: _attempt(transport, message), batch))
+
+    for message, error in zip(batch, errors):
+        message.attempts += 1
+        if error is None:
+            message.status = "sent"
+            message.sent_at = now
+            message.last_error = None
+            result["sent"] += 1
+            continue
+
+        message.last_error = str(error)[:1000]
+        if message.attempts >= max_attempts:
+            message.status = "failed"
+            result["failed"] += 1
+            app.logger.error(
+                f"Giving up on email {message.id} to {message.to_address}: {error}"
+            )
+        else:
+            message.next_attempt_at = now + backoff(message.attempts)
+            result["retrying"] += 1
+            app.logger.warning(f"Email {message.id} failed, will retry: {error}")
+
+    db.session.commit()
+    return result
+
+
+def drain(batch_size=DEFAULT_BATCH_SIZE, transport=None):
+    """Send batches until nothing is due; return the summed counts"""
+    totals = {"sent": 0, "retrying": 0, "failed": 0}
+    while True:
+        result = send_pending(batch_size, transport)
+        for key, count in result.items():
+            totals[key] += count
+        if sum(result.values()) < batch_size:
+            return totals
+
+
+def start_email_worker(app, interval_seconds=5, batch_size=DEFAULT_BATCH_SIZE):
+    """Drain the outbox every ``interval_seconds`` on a daemon thread"""
+
+    def run():
+        while True:
+            with app.app_context():
+                try:
+                    result = drain(batch_size)
+                    if any(result.values()):
+                        app.logger.info(f"Email outbox: {result}")
+                except Exception as e:
+                    db.session.rollback()
+                    app.logger.error(f"Email outbox run failed: {str(e)}")
+                finally:
+                    db.session.remove()
+            time.sleep(interval_seconds)
+
+    thread = threading.Thread(target=run, name="email-outbox", daemon=True)
+    thread.start()
+    return thread
@@ -1,173 +1,204 @@
-import os
+"""
+Account and lineup emails.
 
-import boto3
-from botocore.exceptions import ClientError
-from flask import current_app, url_for
+Bodies are Jinja templates in ``templates/email`` (``<name>.html`` and
+``<name>.txt``). ``init_email`` compiles every template once at startup
+and resolves branding and external URLs from the app config once,
+so building a message needs no ``url_for``, config or environment lookups
+and no request context; the background worker can render too.
 
+Messages are queued in the outbox (see email_outbox.py) as part of the
+caller's transaction and sent by the background worker. ``render_batch``
+renders one template for many recipients, with the parts every recipient
+shares (such as a lineup listing) rendered once up front.
+"""
 
-def send_verification_email(user):
-    """Send email verification to user using AWS SES"""
-    # Check for AWS credentials
-    if not (
-        os.environ.get("AWS_ACCESS_KEY_ID") and os.environ.get("AWS_SECRET_ACCESS_KEY")
-    ):
-        current_app.logger.warning(
-            "AWS credentials not set - email verification disabled"
+import os
+from dataclasses import dataclass
+
+from flask import current_app
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from markupsafe import Markup
+from sqlalchemy import select
+
+from app import db
+from email_outbox import enqueue_email, enqueue_emails
+from models import Signup, User
+from read_models import instance_detail, lineup_rows
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), "templates", "email")
+
+# Subjects are templates too, rendered with the same context as the body
+SUBJECTS = {
+    "verification": "Verify your email - {{ brand }}",
+    "welcome": "Welcome to {{ brand }}!",
+    "lineup_posted": "Lineup posted: {{ show_name }} on {{ show_date }}",
+}
+PARTIALS = ("_lineup",)
+
+
+@dataclass(slots=True, frozen=True)
+class RenderedEmail:
+    to_address: str
+    subject: str
+    text_body: str
+    html_body: str
+
+
+class EmailTemplates:
+    """Compiled subject/text/html templates plus settings fixed at startup"""
+
+    def __init__(self, config, url_adapter):
+        self.brand = config.get("EMAIL_BRAND", "Comedy Open Mic Manager")
+        self.urls = url_adapter
+        # Templates live for the whole process: no reload checks per render
+        self.environment = Environment(
+            loader=FileSystemLoader(TEMPLATE_DIR),
+            # Only .html bodies are escaped; subjects and .txt stay plain text
+            autoescape=select_autoescape(["html"], default_for_string=False),
+            auto_reload=False,
+            cache_size=-1,
         )
-        return False
-
-    try:
-        # Create SES client
-        ses_client = boto3.client(
-            "ses",
-            region_name=os.environ.get("AWS_REGION", "us-east-1"),
-            aws_access_key_id=os.environ.get("AWS_ACCESS_KEY_ID"),
-            aws_secret_access_key=os.environ.get("AWS_SECRET_ACCESS_KEY"),
+        self.templates = {
+            name: (
+                self.environment.from_string(subject),
+                self.environment.get_template(f"{name}.txt"),
+                self.environment.get_template(f"{name}.html"),
+            )
+            for name, subject in SUBJECTS.items()
+        }
+        self.partials = {
+            name: (
+                self.environment.get_template(f"{name}.txt"),
+                self.environment.get_template(f"{name}.html"),
+            )
+            for name in PARTIALS
+        }
+        self.dashboard_url = self.url("dashboard")
+
+    def url(self, endpoint, **values):
+        """External URL for ``endpoint`` without needing a request"""
+        return self.urls.build(endpoint, values, force_external=True)
+
+    def render(self, name, to_address, **context):
+        subject, text, html = self.templates[name]
+        context.setdefault("brand", self.brand)
+        return RenderedEmail(
+            to_address=to_address,
+            subject=subject.render(context),
+            text_body=text.render(context),
+            html_body=html.render(context),
         )
 
-        verification_url = url_for(
-            "verify_email", token=user.email_verification_token, _external=True
-        )
+    def render_partial(self, name, **context):
+        """(text, html) for a shared fragment, rendered once per batch"""
+        text, html = self.partials[name]
+        return text.render(context), Markup(html.render(context))
 
-        html_content = f"""
-        <div style="max-width: 600px; margin: 0 auto; font-family: Arial, sans-serif;">
-            <h2 style="color: #333;">Welcome to Comedy Open Mic Manager!</h2>
-            <p>Hi {user.first_name},</p>
-            <p>Thanks for signing up! Please verify your email address by clicking the button below:</p>
-            <div style="text-align: center; margin: 30px 0;">
-                <a href="{verification_url}" 
-                   style="background-color: #007bff; color: white; padding: 12px 24px; 
-                          text-decoration: none; border-radius: 5px; display: inline-block;">
-                    Verify Email Address
-                </a>
-            </div>
-            <p>If the button doesn't work, you can copy and paste this link into your browser:</p>
-            <p><a href="{verification_url}">{verification_url}</a></p>
-            <p>This link will expire in 24 hours for security reasons.</p>
-            <p>If you didn't sign up for this account, you can safely ignore this email.</p>
-            <hr style="margin: 30px 0; border: none; border-top: 1px solid #eee;">
-            <p style="color: #666; font-size: 12px;">
-                Comedy Open Mic Manager - Connecting comedians and hosts
-            </p>
-        </div>
-        """
-
-        text_content = f"""
-        Welcome to Comedy Open Mic Manager!
-        
-        Hi {user.first_name},
-        
-        Thanks for signing up! Please verify your email address by visiting this link:
-        {verification_url}
-        
-        This link will expire in 24 hours for security reasons.
-        
-        If you didn't sign up for this account, you can safely ignore this email.
-        
-        Comedy Open Mic Manager - Connecting comedians and hosts
-        """
-
-        # Send email using SES
-        response = ses_client.send_email(
-            Source=os.environ.get("SES_FROM_EMAIL", "noreply@comedyopenmic.com"),
-            Destination={"ToAddresses": [user.email]},
-            Message={
-                "Subject": {"Data": "Verify your email - Comedy Open Mic Manager"},
-                "Body": {
-                    "Text": {"Data": text_content},
-                    "Html": {"Data": html_content},
-                },
-            },
-        )
 
-        current_app.logger.info(f"Verification email sent to {user.email} via AWS SES")
-        return True
+def init_email(app):
+    """Compile the email templates and fix their settings for ``app``"""
+    base_url = app.config.get("EMAIL_BASE_URL", "http://localhost:5000")
+    scheme, _, host = base_url.partition("://")
+    url_adapter = app.url_map.bind(host.rstrip("/"), url_scheme=scheme)
+    app.extensions["email_templates"] = EmailTemplates(app.config, url_adapter)
 
-    except ClientError as e:
-        current_app.logger.error(f"AWS SES error: {e.response['Error']['Message']}")
-        return False
-    except Exception as e:
-        current_app.logger.error(f"Failed to send verification email: {str(e)}")
-        return False
 
+def get_templates(app=None):
+    app = app or current_app._get_current_object()
+    return app.extensions["email_templates"]
 
-def send_welcome_email(user):
-    """Send welcome email after verification using AWS SES"""
-    if not (
-        os.environ.get("AWS_ACCESS_KEY_ID") and os.environ.get("AWS_SECRET_ACCESS_KEY")
-    ):
-        return False
-
-    try:
-        # Create SES client
-        ses_client = boto3.client(
-            "ses",
-            region_name=os.environ.get("AWS_REGION", "us-east-1"),
-            aws_access_key_id=os.environ.get("AWS_ACCESS_KEY_ID"),
-            aws_secret_access_key=os.environ.get("AWS_SECRET_ACCESS_KEY"),
-        )
 
-        html_content = f"""
-        <div style="max-width: 600px; margin: 0 auto; font-family: Arial, sans-serif;">
-            <h2 style="color: #333;">Welcome to Comedy Open Mic Manager!</h2>
-            <p>Hi {user.first_name},</p>
-            <p>Your email has been verified successfully! You're now ready to:</p>
-            <ul>
-                <li>Sign up for comedy open mic events</li>
-                <li>View live lineups and track your spot</li>
-                <li>Create and manage your own open mic events</li>
-            </ul>
-            <div style="text-align: center; margin: 30px 0;">
-                <a href="{url_for('dashboard', _external=True)}" 
-                   style="background-color: #28a745; color: white; padding: 12px 24px; 
-                          text-decoration: none; border-radius: 5px; display: inline-block;">
-                    Go to Dashboard
-                </a>
-            </div>
-            <p>Happy performing!</p>
-            <hr style="margin: 30px 0; border: none; border-top: 1px solid #eee;">
-            <p style="color: #666; font-size: 12px;">
-                Comedy Open Mic Manager - Connecting comedians and hosts
-            </p>
-        </div>
-        """
-
-        text_content = f"""
-        Welcome to Comedy Open Mic Manager!
-        
-        Hi {user.first_name},
-        
-        Your email has been verified successfully! You're now ready to:
-        - Sign up for comedy open mic events
-        - View live lineups and track your spot
-        - Create and manage your own open mic events
-        
-        Visit your dashboard: {url_for('dashboard', _external=True)}
-        
-        Happy performing!
-        
-        Comedy Open Mic Manager - Connecting comedians and hosts
-        """
-
-        # Send email using SES
-        response = ses_client.send_email(
-            Source=os.environ.get("SES_FROM_EMAIL", "noreply@comedyopenmic.com"),
-            Destination={"ToAddresses": [user.email]},
-            Message={
-                "Subject": {"Data": "Welcome to Comedy Open Mic Manager!"},
-                "Body": {
-                    "Text": {"Data": text_content},
-                    "Html": {"Data": html_content},
-                },
-            },
-        )
+def render_email(name, to_address, **context):
+    """Render one message from the ``name`` templates"""
+    return get_templates().render(name, to_address, **context)
+
 
-        current_app.logger.info(f"Welcome email sent to {user.email} via AWS SES")
-        return True
+def render_batch(name, recipients, shared=None):
+    """Yield a message per ``(to_address, context)`` pair in ``recipients``
 
-    except ClientError as e:
-        current_app.logger.error(f"AWS SES error: {e.response['Error']['Message']}")
-        return False
-    except Exception as e:
-        current_app.logger.error(f"Failed to send welcome email: {str(e)}")
-        return False
+    ``shared`` context is merged into every message; render expensive
+    common fragments into it once with ``render_partial`` instead of
+    repeating them in each recipient's context.
+    """
+    templates = get_templates()
+    shared = dict(shared or {})
+    for to_address, context in recipients:
+        yield templates.render(name, to_address, **shared, **context)
+
+
+def _queue(message, kind):
+    return enqueue_email(
+        message.to_address,
+        message.subject,
+        message.text_body,
+        message.html_body,
+        kind=kind,
+    )
+
+
+def send_verification_email(user):
+    """Queue the email verification message for ``user``"""
+    templates = get_templates()
+    message = templates.render(
+        "verification",
+        user.email,
+        first_name=user.first_name,
+        verification_url=templates.url(
+            "verify_email", token=user.email_verification_token
+        ),
+    )
+    return _queue(message, "verification")
+
+
+def send_welcome_email(user):
+    """Queue the welcome message sent after verification"""
+    templates = get_templates()
+    message = templates.render(
+        "welcome",
+        user.email,
+        first_name=user.first_name,
+        dashboard_url=templates.dashboard_url,
+    )
+    return _queue(message, "welcome")
+
+
+def lineup_emails(instance_id):
+    """``(comedian_id, email)`` for everyone on an instance's lineup"""
+    return db.session.execute(
+        select(User.id, User.email)
+        .join(Signup, Signup.comedian_id == User.id)
+        .where(Signup.show_instance_id == instance_id)
+    ).all()
+
+
+def send_lineup_posted(instance_id):
+    """Queue a "lineup posted" email to every comedian on an instance
+
+    Returns how many messages were queued (the caller commits).
+    """
+    templates = get_templates()
+    instance = instance_detail(instance_id)
+    lineup = lineup_rows(instance_id)
+    lineup_text, lineup_html = templates.render_partial("_lineup", lineup=lineup)
+    shared = {
+        "show_name": instance.show.name,
+        "venue": instance.show.venue,
+        "show_date": instance.instance_date.strftime("%A, %B %d"),
+        "start_time": instance.start_time.strftime("%I:%M %p"),
+        "live_url": templates.url("live_lineup", event_id=instance_id),
+        "lineup_text": lineup_text,
+        "lineup_html": lineup_html,
+    }
+    emails = dict(lineup_emails(instance_id))
+    recipients = (
+        (
+            emails[row.comedian_id],
+            {"first_name": row.comedian.first_name, "position": row.position},
+        )
+        for row in lineup
+        if row.comedian_id in emails
+    )
+    return enqueue_emails(
+        render_batch("lineup_posted", recipients, shared), kind="lineup_posted"
+    )
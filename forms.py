@@ -22,7 +22,9 @@ from wtforms.validators import (
     ValidationError,
 )
 
-from models import Show, User
+from host_candidates import host_choices
+from models import Show
+from user_lookup import find_user_by_email, find_user_by_username
 
 
 class RegistrationForm(FlaskForm):
@@ -48,8 +50,10 @@ class RegistrationForm(FlaskForm):
     )
 
     def validate_username(self, username):
-        user = User.query.filter_by(username=username.data).first()
-        if user:
+        # "@" would make the login field ambiguous with email addresses
+        if "@" in username.data:
+            raise ValidationError("Usernames cannot contain @.")
+        if find_user_by_username(username.data):
             raise ValidationError("Please use a different username.")
 
     def validate_email(self, email):
@@ -65,13 +69,12 @@ class RegistrationForm(FlaskForm):
             raise ValidationError("Please enter a valid email address.")
 
         # Check if email already exists
-        user = User.query.filter_by(email=email_value).first()
-        if user:
+        if find_user_by_email(email_value):
             raise ValidationError("Please use a different email address.")
 
 
 class LoginForm(FlaskForm):
-    username = StringField("Username", validators=[DataRequired()])
+    username = StringField("Username or Email", validators=[DataRequired()])
     password = PasswordField("Password", validators=[DataRequired()])
 
 
@@ -125,15 +128,12 @@ class ShowSettingsForm(FlaskForm):
     def __init__(self, show=None, *args, **kwargs):
         super().__init__(*args, **kwargs)
         if show:
-            # Populate default host choices with users who can host this show
-            from models import User
-
-            potential_hosts = (
-                User.query.all()
-            )  # Could be filtered to show runners/hosts
-            self.default_host_id.choices = [(0, "No default host")] + [
-                (user.id, user.full_name) for user in potential_hosts
-            ]
+            # People connected to the show, plus anyone picked via typeahead
+            self.default_host_id.choices = host_choices(
+                show.id,
+                selected=self.default_host_id.data,
+                blank=(0, "No default host"),
+            )
 
 
 class InstanceHostForm(FlaskForm):
@@ -144,12 +144,5 @@ class InstanceHostForm(FlaskForm):
     def __init__(self, show=None, *args, **kwargs):
         super().__init__(*args, **kwargs)
         if show:
-            # Populate host choices with users who can host this show
-            from models import User
-
-            potential_hosts = (
-                User.query.all()
-            )  # Could be filtered to show runners/hosts
-            self.host_id.choices = [
-                (user.id, user.full_name) for user in potential_hosts
-            ]
+            # People connected to the show, plus anyone picked via typeahead
+            self.host_id.choices = host_choices(show.id, selected=self.host_id.data)
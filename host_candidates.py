@@ -0,0 +1,64 @@
+"""
+Who can be picked as a show's host.
+
+The host dropdowns only list the people already connected to the show: its
+owner, runners and hosts, the default host and anyone who has hosted one of
+its instances. ``show_host_candidates`` reads them with one projected query
+instead of loading every registered user.
+
+Anyone else is found through the typeahead, backed by
+``user_lookup.search_users``.
+"""
+
+from sqlalchemy import select, union
+
+from app import db
+from models import Show, ShowHost, ShowInstance, ShowInstanceHost, ShowRunner, User
+from user_lookup import UserSummary
+
+
+def _candidate_ids(show_id):
+    """Ids of everyone connected to the show, as one UNION"""
+    return union(
+        select(Show.owner_id).where(Show.id == show_id),
+        select(Show.default_host_id).where(
+            Show.id == show_id, Show.default_host_id.is_not(None)
+        ),
+        select(ShowRunner.user_id).where(ShowRunner.show_id == show_id),
+        select(ShowHost.user_id).where(ShowHost.show_id == show_id),
+        select(ShowInstanceHost.user_id)
+        .join(ShowInstance, ShowInstanceHost.show_instance_id == ShowInstance.id)
+        .where(ShowInstance.show_id == show_id),
+    )
+
+
+def show_host_candidates(show_id, include=()):
+    """Owner, runners, hosts and past hosts of a show, sorted by name
+
+    ``include`` adds specific users (such as one picked through the
+    typeahead) in the same query.
+    """
+    condition = User.id.in_(_candidate_ids(show_id))
+    include = [user_id for user_id in include if user_id]
+    if include:
+        condition = condition | User.id.in_(include)
+    rows = db.session.execute(
+        select(User.id, User.username, User.first_name, User.last_name)
+        .where(condition)
+        .order_by(User.first_name, User.last_name, User.id)
+    )
+    return [UserSummary(*row) for row in rows]
+
+
+def host_choices(show_id, selected=None, blank=None):
+    """``(id, full name)`` choices for a host SelectField
+
+    ``selected`` is kept as a valid choice even when it isn't connected to
+    the show yet; ``blank`` is an optional ``(0, label)`` first entry.
+    """
+    choices = [blank] if blank else []
+    choices.extend(
+        (candidate.id, candidate.full_name)
+        for candidate in show_host_candidates(show_id, include=[selected])
+    )
+    return choices
@@ -0,0 +1,211 @@
+"""
+Conditional GET support for the public event and lineup pages.
+
+Every ShowInstance carries a ``lineup_version`` counter and an ``updated_at``
+stamp. A session listener bumps both whenever a flush touches the instance's
+signups (including positions), hosts, cancellation state or parent Show, the
+show's runners and hosts (who see manage buttons), or the name of a user
+shown on the page, so the pair can drive strong ETags and Last-Modified
+headers. Passing the signup deadline changes the page without a write, so
+the validators also carry whether signups are closed, and Last-Modified
+moves to the deadline once it has passed.
+
+Last-Modified has one-second resolution, so a page changed during the
+current second is sent without it: a second write in that same second
+would otherwise look unchanged to If-Modified-Since clients. Those
+responses rely on the ETag alone.
+
+Unchanged polls are answered with 304 after a single primary-key lookup,
+without querying Signup or rendering Jinja.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import abort, make_response, request, session
+from flask_login import current_user
+from sqlalchemy import event, or_, select, union, update
+from sqlalchemy.orm import Session
+
+from app import db
+from models import (
+    Show,
+    ShowHost,
+    ShowInstance,
+    ShowInstanceHost,
+    ShowRunner,
+    Signup,
+    User,
+)
+from signup_service import deadline_for
+
+# User columns that appear on event and lineup pages
+DISPLAYED_USER_FIELDS = ("first_name", "last_name", "username")
+
+
+def bump_versions(connection, instance_ids=(), show_ids=()):
+    """Advance the version stamp of the given instances and shows' instances"""
+    now = datetime.utcnow()
+    values = {
+        "lineup_version": ShowInstance.lineup_version + 1,
+        "updated_at": now,
+    }
+    table = ShowInstance.__table__
+    if instance_ids:
+        connection.execute(
+            update(table).where(table.c.id.in_(instance_ids)).values(**values)
+        )
+    if show_ids:
+        connection.execute(
+            update(table).where(table.c.show_id.in_(show_ids)).values(**values)
+        )
+
+
+def _pages_showing_users(connection, user_ids):
+    """Instance and show ids whose pages name any of ``user_ids``"""
+    instance_ids = connection.scalars(
+        union(
+            select(Signup.show_instance_id).where(Signup.comedian_id.in_(user_ids)),
+            select(ShowInstanceHost.show_instance_id).where(
+                ShowInstanceHost.user_id.in_(user_ids)
+            ),
+        )
+    ).all()
+    show_ids = connection.scalars(
+        select(Show.id).where(
+            or_(Show.owner_id.in_(user_ids), Show.default_host_id.in_(user_ids))
+        )
+    ).all()
+    return instance_ids, show_ids
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_changed_instances(session, flush_context):
+    """Bump versions for every instance whose public pages just changed"""
+    instance_ids = set()
+    show_ids = set()
+    renamed_user_ids = set()
+
+    for obj in session.new | session.deleted:
+        if isinstance(obj, (Signup, ShowInstanceHost)):
+            instance_ids.add(obj.show_instance_id)
+        elif isinstance(obj, (ShowHost, ShowRunner)):
+            show_ids.add(obj.show_id)
+
+    for obj in session.dirty:
+        if not session.is_modified(obj, include_collections=False):
+            continue
+        if isinstance(obj, (Signup, ShowInstanceHost)):
+            instance_ids.add(obj.show_instance_id)
+        elif isinstance(obj, ShowInstance):
+            instance_ids.add(obj.id)
+        elif isinstance(obj, Show):
+            show_ids.add(obj.id)
+        elif isinstance(obj, (ShowHost, ShowRunner)):
+            show_ids.add(obj.show_id)
+            show_ids.update(db.inspect(obj).attrs.show_id.history.deleted or ())
+        elif isinstance(obj, User):
+            state = db.inspect(obj)
+            if any(
+                state.attrs[field].history.has_changes()
+                for field in DISPLAYED_USER_FIELDS
+            ):
+                renamed_user_ids.add(obj.id)
+
+    connection = session.connection()
+    if renamed_user_ids:
+        instances, shows = _pages_showing_users(connection, renamed_user_ids)
+        instance_ids.update(instances)
+        show_ids.update(shows)
+
+    instance_ids.discard(None)
+    show_ids.discard(None)
+    if instance_ids or show_ids:
+        bump_versions(connection, sorted(instance_ids), sorted(show_ids))
+
+
+def _instance_validators(instance_id):
+    """``(version, updated_at, deadline)`` for one instance, or None"""
+    row = (
+        db.session.query(
+            ShowInstance.lineup_version,
+            ShowInstance.updated_at,
+            ShowInstance.instance_date,
+            ShowInstance.start_time_override,
+            Show.start_time,
+            Show.signup_window_after_hours,
+        )
+        .join(Show, ShowInstance.show_id == Show.id)
+        .filter(ShowInstance.id == instance_id)
+        .first()
+    )
+    if row is None:
+        return None
+    deadline = deadline_for(
+        row.instance_date,
+        row.start_time_override or row.start_time,
+        row.signup_window_after_hours,
+    )
+    return row.lineup_version, row.updated_at, deadline
+
+
+def _make_etag(instance_id, version, closed):
+    # Pages differ per viewer (signup/manage buttons), so key on the user too
+    viewer = current_user.get_id() if current_user.is_authenticated else "anon"
+    raw = f"{request.endpoint}:{instance_id}:{version}:{closed}:{viewer}"
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def conditional_on_instance(view):
+    """Answer unchanged GETs of an instance page with 304 Not Modified"""
+
+    @wraps(view)
+    def wrapper(event_id, *args, **kwargs):
+        validators = _instance_validators(event_id)
+        if validators is None:
+            abort(404)
+        version, updated_at, deadline = validators
+        # Deadlines are local times, like signup_service compares them
+        closed = datetime.now() > deadline
+        etag = _make_etag(event_id, version, closed)
+
+        now = datetime.utcnow()
+        changed_at = updated_at or now
+        if closed:
+            deadline_utc = deadline.astimezone(timezone.utc).replace(tzinfo=None)
+            changed_at = max(changed_at, deadline_utc)
+        last_modified = changed_at.replace(microsecond=0)
+        if last_modified >= now.replace(microsecond=0):
+            last_modified = None  # Changed this second: ETag only
+
+        # Pending flash messages have to be rendered, so skip the shortcut
+        if "_flashes" not in session:
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains(etag)
+            else:
+                since = request.if_modified_since
+                not_modified = (
+                    since is not None
+                    and last_modified is not None
+                    and since.replace(tzinfo=None) >= last_modified
+                )
+            if not_modified:
+                response = make_response("", 304)
+                _set_validators(response, etag, last_modified)
+                return response
+
+        response = make_response(view(event_id, *args, **kwargs))
+        if response.status_code == 200:
+            _set_validators(response, etag, last_modified)
+        return response
+
+    return wrapper
+
+
+def _set_validators(response, etag, last_modified):
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.cache_control.no_cache = True
+    response.vary.add("Cookie")
@@ -0,0 +1,76 @@
+"""
+Secondary indexes for the hot ShowInstance, Signup and membership queries.
+
+models.py only declares the unique constraints. The indexes below follow
+the access paths the routes actually use:
+
+- active (not cancelled) instances by date range: calendar, dashboards,
+  calendar API
+- instances with open spots by date range, for the calendar API's
+  ``open`` filter
+- instances by date range including cancelled ones, with the id carried
+  along so signup joins never touch the table
+- a lineup's signups by instance in position / signup order, which also
+  covers per-instance signup counts
+- shows by owner, and runner/host memberships by user
+- users by lower(username) and lower(email), for login and registration;
+  these are unique, so no two accounts differ only by case
+
+They are attached to the model tables on import, so ``db.create_all()``
+builds them for new databases; ``migrations.add_hot_path_indexes`` and
+``migrations.add_user_lookup_indexes`` add them to existing ones.
+"""
+
+from app import db
+from models import Show, ShowHost, ShowInstance, ShowRunner, Signup, User
+
+not_cancelled = ShowInstance.is_cancelled == False  # noqa: E712
+has_open_spots = db.and_(not_cancelled, ShowInstance.is_full == False)  # noqa: E712
+
+HOT_PATH_INDEXES = [
+    db.Index(
+        "ix_show_instance_active_date",
+        ShowInstance.instance_date,
+        ShowInstance.show_id,
+        postgresql_where=not_cancelled,
+        sqlite_where=not_cancelled,
+    ),
+    db.Index(
+        "ix_show_instance_open_date",
+        ShowInstance.instance_date,
+        ShowInstance.id,
+        postgresql_where=has_open_spots,
+        sqlite_where=has_open_spots,
+    ),
+    db.Index("ix_show_instance_date_id", ShowInstance.instance_date, ShowInstance.id),
+    db.Index(
+        "ix_signup_instance_position",
+        Signup.show_instance_id,
+        Signup.position,
+        Signup.signup_time,
+    ),
+    db.Index("ix_show_owner", Show.owner_id, Show.is_deleted),
+    db.Index("ix_show_runner_user", ShowRunner.user_id, ShowRunner.show_id),
+    db.Index("ix_show_host_user", ShowHost.user_id, ShowHost.show_id),
+]
+
+# Case-insensitive username/email lookups (see user_lookup.py). Kept apart
+# from the plain indexes because existing rows can violate them.
+USER_LOOKUP_INDEXES = [
+    db.Index("ix_user_username_lower", db.func.lower(User.username), unique=True),
+    db.Index("ix_user_email_lower", db.func.lower(User.email), unique=True),
+]
+
+
+def explain(statement):
+    """Return the database's query plan for ``statement`` as text lines"""
+    connection = db.session.connection()
+    dialect = connection.dialect
+    compiled = statement.compile(dialect=dialect)
+    params = compiled.params
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+
+    prefix = "EXPLAIN QUERY PLAN " if dialect.name == "sqlite" else "EXPLAIN "
+    rows = connection.exec_driver_sql(prefix + str(compiled), params)
+    return [row[-1] for row in rows]
@@ -0,0 +1,270 @@
+"""
+Live lineup change feed.
+
+Routes that change a lineup publish small delta messages here, and the
+``/live/<event_id>/stream`` Server-Sent Events endpoint fans them out to every
+open live lineup page so phones patch the DOM instead of reloading.
+
+Two backends are available, chosen with the ``LINEUP_BROKER`` setting:
+
+- ``memory`` (default): in-process queues, fine for a single worker
+- ``postgres``: LISTEN/NOTIFY on the app database, so a delta published by
+  one gunicorn worker reaches subscribers connected to every other worker
+
+Each open stream holds a request thread for up to
+``LINEUP_STREAM_MAX_SECONDS``, so the app has to run under a threaded or
+gevent worker class (``gunicorn --worker-class gthread --threads 16``); a
+sync worker would spend its only thread on one viewer. Streams are also
+capped at ``LINEUP_STREAM_MAX_CLIENTS`` per process (8 by default, half of
+the threads above). Viewers over the cap get a 503 and the page falls back
+to polling, so the remaining threads keep serving everything else.
+"""
+
+import json
+import os
+import queue
+import select
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import text
+
+from app import db
+from read_models import lineup_rows
+
+NOTIFY_CHANNEL = "lineup_events"
+DEFAULT_MAX_STREAMS = 8
+
+
+class Subscription:
+    """A bounded queue of lineup messages for one connected client"""
+
+    def __init__(self, broker, instance_id, maxsize=100):
+        self.broker = broker
+        self.instance_id = instance_id
+        self.queue = queue.Queue(maxsize=maxsize)
+
+    def push(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except queue.Full:
+            # The client fell too far behind; have it reload a fresh snapshot
+            with self.queue.mutex:
+                self.queue.queue.clear()
+            self.queue.put_nowait({"type": "resync"})
+
+    def get(self, timeout=None):
+        """Return the next message, or None if nothing arrived in time"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    """Fan out lineup messages to subscribers in this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    def subscribe(self, instance_id):
+        subscription = Subscription(self, instance_id)
+        with self._lock:
+            self._subscribers.setdefault(instance_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.instance_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.instance_id]
+
+    def subscriber_count(self, instance_id):
+        with self._lock:
+            return len(self._subscribers.get(instance_id, ()))
+
+    def publish(self, instance_id, message):
+        self._deliver(instance_id, message)
+
+    def _deliver(self, instance_id, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(instance_id, ()))
+        for subscription in subscribers:
+            subscription.push(message)
+
+
+class PostgresBroker(InProcessBroker):
+    """Relay lineup messages between workers with Postgres LISTEN/NOTIFY"""
+
+    def __init__(self, engine, logger=None):
+        super().__init__()
+        self.engine = engine
+        self.logger = logger
+        self._listener = None
+        self._listener_lock = threading.Lock()
+
+    def publish(self, instance_id, message):
+        payload = json.dumps({"instance_id": instance_id, "message": message})
+        with self.engine.begin() as conn:
+            conn.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": NOTIFY_CHANNEL, "payload": payload},
+            )
+
+    def subscribe(self, instance_id):
+        self._ensure_listener()
+        return super().subscribe(instance_id)
+
+    def _ensure_listener(self):
+        with self._listener_lock:
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = threading.Thread(
+                    target=self._listen, name="lineup-listener", daemon=True
+                )
+                self._listener.start()
+
+    def _listen(self):
+        while True:
+            try:
+                raw = self.engine.raw_connection()
+                try:
+                    dbapi_conn = raw.driver_connection
+                    dbapi_conn.autocommit = True
+                    dbapi_conn.cursor().execute(f"LISTEN {NOTIFY_CHANNEL}")
+                    while True:
+                        if select.select([dbapi_conn], [], [], 15) == ([], [], []):
+                            continue
+                        dbapi_conn.poll()
+                        while dbapi_conn.notifies:
+                            notify = dbapi_conn.notifies.pop(0)
+                            payload = json.loads(notify.payload)
+                            self._deliver(payload["instance_id"], payload["message"])
+                finally:
+                    raw.invalidate()
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"Lineup listener failed, reconnecting: {e}")
+                time.sleep(1)
+
+
+def get_broker(app=None):
+    """Get the app's lineup broker, creating it on first use"""
+    app = app or current_app._get_current_object()
+    broker = app.extensions.get("lineup_broker")
+    if broker is None:
+        backend = app.config.get(
+            "LINEUP_BROKER", os.environ.get("LINEUP_BROKER", "memory")
+        )
+        if backend == "postgres":
+            broker = PostgresBroker(db.engine, app.logger)
+        elif backend == "memory":
+            broker = InProcessBroker()
+        else:
+            raise ValueError(f"Unknown LINEUP_BROKER backend: {backend}")
+        app.extensions["lineup_broker"] = broker
+    return broker
+
+
+def stream_slots(app=None):
+    """The per-process semaphore that caps concurrent lineup streams"""
+    app = app or current_app._get_current_object()
+    slots = app.extensions.get("lineup_stream_slots")
+    if slots is None:
+        limit = app.config.get("LINEUP_STREAM_MAX_CLIENTS", DEFAULT_MAX_STREAMS)
+        slots = app.extensions["lineup_stream_slots"] = threading.BoundedSemaphore(
+            limit
+        )
+    return slots
+
+
+def signup_payload(signup):
+    """Serialize one lineup row the way the live page displays it"""
+    return {
+        "id": signup.id,
+        "position": signup.position,
+        "name": signup.comedian.full_name if signup.comedian else "Guest Comedian",
+        "notes": signup.notes or "",
+        "performed": bool(signup.performed),
+    }
+
+
+def lineup_snapshot(instance_id):
+    """Full ordered lineup for an instance, sent when a client connects"""
+    signups = lineup_rows(instance_id)
+    return {"type": "snapshot", "signups": [signup_payload(s) for s in signups]}
+
+
+def _publish(instance_id, message):
+    # A lost delta only delays live pages, so never fail the request over it
+    try:
+        get_broker().publish(instance_id, message)
+    except Exception as e:
+        current_app.logger.error(f"Failed to publish lineup change: {str(e)}")
+
+
+def publish_positions(instance_id, positions):
+    """Announce new lineup positions as a {signup_id: position} map"""
+    _publish(
+        instance_id,
+        {
+            "type": "positions",
+            "positions": {str(signup_id): pos for signup_id, pos in positions.items()},
+        },
+    )
+
+
+def publish_added(instance_id, signup):
+    """Announce a signup joining the lineup"""
+    _publish(instance_id, {"type": "added", "signup": signup_payload(signup)})
+
+
+def publish_removed(instance_id, signup_id):
+    """Announce a signup leaving the lineup"""
+    _publish(instance_id, {"type": "removed", "signup_id": signup_id})
+
+
+def format_event(message, event_id=None):
+    """Encode a message as a Server-Sent Events frame"""
+    frame = ""
+    if event_id is not None:
+        frame += f"id: {event_id}\n"
+    return frame + f"data: {json.dumps(message)}\n\n"
+
+
+def stream_lineup(instance_id, keepalive=15, max_duration=None):
+    """Yield SSE frames for an instance until the client goes away.
+
+    Streams end after ``max_duration`` seconds so sync workers are released;
+    EventSource reconnects on its own and receives a fresh snapshot.
+    """
+    if max_duration is None:
+        max_duration = current_app.config.get("LINEUP_STREAM_MAX_SECONDS", 300)
+
+    subscription = get_broker().subscribe(instance_id)
+    try:
+        yield "retry: 3000\n\n"
+        yield format_event(lineup_snapshot(instance_id))
+        # Don't hold a pooled connection for the life of the stream
+        db.session.close()
+
+        deadline = time.monotonic() + max_duration
+        sequence = 0
+        while time.monotonic() < deadline:
+            message = subscription.get(timeout=keepalive)
+            if message is None:
+                yield ": keepalive\n\n"
+                continue
+            if message["type"] == "resync":
+                message = lineup_snapshot(instance_id)
+                db.session.close()
+            sequence += 1
+            yield format_event(message, sequence)
+    finally:
+        subscription.close()
@@ -0,0 +1,131 @@
+"""
+Bulk lineup ordering.
+
+A reorder checks the submitted signups against the instance with one query
+and writes every position with a single ``UPDATE ... SET position = CASE``,
+instead of a SELECT and an UPDATE per comedian.
+
+``ShowInstance.lineup_version`` doubles as an optimistic-concurrency token:
+callers pass the version their page was rendered with, and the write only
+goes ahead if it still matches, bumping it in the same statement. A second
+host saving an older view of the lineup gets a 409 with the current version
+instead of silently overwriting the first host's order.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import case, select, update
+
+from app import db
+from models import ShowInstance, Signup
+
+
+class LineupError(Exception):
+    """A lineup change that can't be applied, with the HTTP status to use"""
+
+    def __init__(self, message, status_code=400, version=None):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+        self.version = version
+
+
+def current_version(instance_id, session=None):
+    """The instance's lineup_version, or None if it doesn't exist"""
+    session = session or db.session
+    return session.scalar(
+        select(ShowInstance.lineup_version).where(ShowInstance.id == instance_id)
+    )
+
+
+def _unknown_error(unknown):
+    listed = ", ".join(map(str, sorted(unknown)))
+    return LineupError(f"Signups not on this lineup: {listed}")
+
+
+def _write_positions(session, instance_id, positions, expected_version):
+    """Claim the version token, then write every position in one statement"""
+    stmt = update(ShowInstance).where(ShowInstance.id == instance_id)
+    if expected_version is not None:
+        stmt = stmt.where(ShowInstance.lineup_version == expected_version)
+    version = session.execute(
+        stmt.values(
+            lineup_version=ShowInstance.lineup_version + 1,
+            updated_at=datetime.utcnow(),
+        ).returning(ShowInstance.lineup_version),
+        execution_options={"synchronize_session": False},
+    ).scalar()
+    if version is None:
+        session.rollback()
+        raise LineupError(
+            "The lineup was changed by someone else. Reload and try again.",
+            409,
+            current_version(instance_id, session),
+        )
+
+    session.execute(
+        update(Signup)
+        .where(Signup.show_instance_id == instance_id, Signup.id.in_(list(positions)))
+        .values(position=case(positions, value=Signup.id, else_=Signup.position)),
+        execution_options={"synchronize_session": False},
+    )
+    session.commit()
+    return version
+
+
+def set_positions(instance_id, positions, expected_version=None, session=None):
+    """Write ``{signup_id: position}`` for one instance in one UPDATE and commit
+
+    Positions may be None to clear them. Raises LineupError (400) when a
+    signup isn't on this instance's lineup, and (409) when
+    ``expected_version`` is stale. Returns the new lineup_version.
+    """
+    session = session or db.session
+    if not positions:
+        return current_version(instance_id, session)
+
+    found = set(
+        session.scalars(
+            select(Signup.id).where(
+                Signup.show_instance_id == instance_id,
+                Signup.id.in_(list(positions)),
+            )
+        )
+    )
+    if set(positions) - found:
+        raise _unknown_error(set(positions) - found)
+    return _write_positions(session, instance_id, positions, expected_version)
+
+
+def reorder(instance_id, signup_ids, expected_version=None, session=None):
+    """Number the instance's whole lineup 1..n in the order of ``signup_ids``
+
+    The list must name every signup on the lineup exactly once; a list
+    missing someone who signed up meanwhile is treated as stale (409).
+    Returns ``(positions, version)``.
+    """
+    session = session or db.session
+    try:
+        signup_ids = [int(signup_id) for signup_id in signup_ids]
+    except (TypeError, ValueError):
+        raise LineupError("signup_ids must be a list of integers.")
+    if len(set(signup_ids)) != len(signup_ids):
+        raise LineupError("signup_ids contains duplicates.")
+
+    lineup = set(
+        session.scalars(select(Signup.id).where(Signup.show_instance_id == instance_id))
+    )
+    if set(signup_ids) - lineup:
+        raise _unknown_error(set(signup_ids) - lineup)
+    if lineup - set(signup_ids):
+        raise LineupError(
+            "The lineup has signups missing from this order. Reload and try again.",
+            409,
+            current_version(instance_id, session),
+        )
+    if not signup_ids:
+        return {}, current_version(instance_id, session)
+
+    positions = {signup_id: n for n, signup_id in enumerate(signup_ids, 1)}
+    version = _write_positions(session, instance_id, positions, expected_version)
+    return positions, version
@@ -0,0 +1,67 @@
+"""
+Named eager-loading profiles for the dashboard and lineup views.
+
+Each profile is the bundle of loader options a view's query needs so its
+template can walk relationships (``signup.show_instance.show.name``,
+``instance.get_host_names()``, ``signup.comedian.full_name``) without lazy
+SQL per row. Profiles built on ``contains_eager`` expect the view's query to
+join the named entity already.
+
+With ``RAISE_ON_LAZY_LOAD`` set, any lazy load that has to hit the database
+raises ``LazyLoadError`` instead, so tests catch views that outgrow their
+profile. Many-to-one loads answered from the identity map are still allowed.
+"""
+
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session, contains_eager, joinedload, selectinload
+
+from models import Show, ShowInstance, ShowInstanceHost, Signup
+
+# Hosts shown by ShowInstance.get_host_names(), falling back to the default
+_INSTANCE_HOSTS = (
+    selectinload(ShowInstance.hosts).joinedload(ShowInstanceHost.user),
+    joinedload(ShowInstance.show).joinedload(Show.default_host),
+)
+
+PROFILES = {
+    # Signups listed with their instance date/time and show name/venue
+    "signup_cards": (
+        contains_eager(Signup.show_instance).joinedload(ShowInstance.show),
+    ),
+    # Instance cards where the query already joins Show
+    "instance_cards": (contains_eager(ShowInstance.show),),
+    # Instance list for dashboards that don't join Show
+    "instance_list": (joinedload(ShowInstance.show),),
+    # upcoming_lineups: hosts plus the first few comedians per instance
+    "instance_lineups": (
+        *_INSTANCE_HOSTS,
+        selectinload(ShowInstance.signups).joinedload(Signup.comedian),
+    ),
+    # manage_lineup / live views: the instance with its show
+    "lineup_instance": (joinedload(ShowInstance.show),),
+    # manage_lineup: each signup's comedian name
+    "lineup_signups": (joinedload(Signup.comedian),),
+}
+
+
+def profile(name):
+    """Loader options for the named profile"""
+    return PROFILES[name]
+
+
+class LazyLoadError(Exception):
+    """A relationship was lazy loaded while RAISE_ON_LAZY_LOAD was set"""
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _raise_on_lazy_load(orm_execute_state):
+    if not orm_execute_state.is_select or orm_execute_state.lazy_loaded_from is None:
+        return
+    if has_app_context() and current_app.config.get("RAISE_ON_LAZY_LOAD"):
+        state = orm_execute_state.lazy_loaded_from
+        raise LazyLoadError(
+            f"Lazy load from {state.class_.__name__} "
+            f"(id={state.identity[0] if state.identity else None}) "
+            f"issued SQL; add it to the view's loader profile"
+        )
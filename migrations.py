@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Idempotent schema upgrades for existing databases
+
+db.create_all() only creates missing tables, so columns added to existing
+models are applied here. Safe to run repeatedly: python migrations.py
+"""
+
+from sqlalchemy import func, inspect, select, text
+
+from app import app, db
+
+
+def _columns(table_name):
+    return {column["name"] for column in inspect(db.engine).get_columns(table_name)}
+
+
+def _index_names(table_name):
+    if db.engine.dialect.name != "sqlite":
+        return {ix["name"] for ix in inspect(db.engine).get_indexes(table_name)}
+    # SQLite reflection skips expression indexes such as lower(username)
+    with db.engine.connect() as conn:
+        return set(
+            conn.scalars(
+                text(
+                    "SELECT name FROM sqlite_master "
+                    "WHERE type = 'index' AND tbl_name = :table"
+                ),
+                {"table": table_name},
+            )
+        )
+
+
+def add_show_instance_signup_count():
+    """Add ShowInstance.signup_count and backfill it from the Signup table"""
+    if "signup_count" in _columns("show_instance"):
+        return False
+
+    with db.engine.begin() as conn:
+        conn.execute(
+            text(
+                "ALTER TABLE show_instance "
+                "ADD COLUMN signup_count INTEGER NOT NULL DEFAULT 0"
+            )
+        )
+        conn.execute(
+            text(
+                "UPDATE show_instance SET signup_count = ("
+                "SELECT COUNT(*) FROM signup "
+                "WHERE signup.show_instance_id = show_instance.id)"
+            )
+        )
+    return True
+
+
+def add_show_instance_version_stamp():
+    """Add ShowInstance.lineup_version and updated_at for conditional GETs"""
+    columns = _columns("show_instance")
+    if "lineup_version" in columns and "updated_at" in columns:
+        return False
+
+    with db.engine.begin() as conn:
+        if "lineup_version" not in columns:
+            conn.execute(
+                text(
+                    "ALTER TABLE show_instance "
+                    "ADD COLUMN lineup_version INTEGER NOT NULL DEFAULT 1"
+                )
+            )
+        if "updated_at" not in columns:
+            conn.execute(
+                text("ALTER TABLE show_instance ADD COLUMN updated_at TIMESTAMP")
+            )
+            conn.execute(
+                text("UPDATE show_instance SET updated_at = CURRENT_TIMESTAMP")
+            )
+    return True
+
+
+def add_show_instance_is_full():
+    """Add ShowInstance.is_full and backfill it from signup_count"""
+    if "is_full" in _columns("show_instance"):
+        return False
+
+    with db.engine.begin() as conn:
+        conn.execute(
+            text(
+                "ALTER TABLE show_instance "
+                "ADD COLUMN is_full BOOLEAN NOT NULL DEFAULT false"
+            )
+        )
+        conn.execute(
+            text(
+                "UPDATE show_instance SET is_full = (signup_count >= COALESCE("
+                "max_signups_override, (SELECT max_signups FROM show "
+                "WHERE show.id = show_instance.show_id)))"
+            )
+        )
+    return True
+
+
+def _duplicates(index, limit=5):
+    """Values that would break a unique single-expression ``index``"""
+    (expression,) = index.expressions
+    with db.engine.connect() as conn:
+        return list(
+            conn.scalars(
+                select(expression)
+                .group_by(expression)
+                .having(func.count() > 1)
+                .limit(limit)
+            )
+        )
+
+
+def _missing(indexes):
+    """The declared ``indexes`` the database does not have yet"""
+    existing = {
+        (index.table.name, name)
+        for index in indexes
+        for name in _index_names(index.table.name)
+    }
+    return [
+        index for index in indexes if (index.table.name, index.name) not in existing
+    ]
+
+
+def _create(indexes):
+    with db.engine.begin() as conn:
+        for index in indexes:
+            index.create(conn)
+
+
+def add_hot_path_indexes():
+    """Create the composite and partial indexes declared in indexes.py"""
+    from indexes import HOT_PATH_INDEXES
+
+    missing = _missing(HOT_PATH_INDEXES)
+    if not missing:
+        return False
+
+    _create(missing)
+    return True
+
+
+def add_user_lookup_indexes():
+    """Create the unique lower(username) and lower(email) indexes
+
+    Raises RuntimeError, creating nothing, if two accounts share a username
+    or email that differs only by case. Rename or merge those accounts (the
+    error lists the clashing values; find them with
+    ``SELECT * FROM "user" WHERE lower(username) = '<value>'``) and run the
+    upgrade again. Earlier steps are already applied and are not repeated.
+    """
+    from indexes import USER_LOOKUP_INDEXES
+
+    missing = _missing(USER_LOOKUP_INDEXES)
+    if not missing:
+        return False
+
+    for index in missing:
+        duplicates = _duplicates(index)
+        if duplicates:
+            raise RuntimeError(
+                f"Cannot create unique index {index.name}: duplicate values "
+                + ", ".join(repr(value) for value in duplicates)
+                + "; rename or merge those accounts and run the upgrade again"
+            )
+
+    _create(missing)
+    return True
+
+
+# Applied in order; each step checks whether it is still needed
+MIGRATIONS = [
+    add_show_instance_signup_count,
+    add_show_instance_version_stamp,
+    add_show_instance_is_full,
+    add_hot_path_indexes,
+    add_user_lookup_indexes,
+]
+
+
+def upgrade():
+    """Run every pending migration and return the names of those applied"""
+    db.create_all()
+    return [migration.__name__ for migration in MIGRATIONS if migration()]
+
+
+if __name__ == "__main__":
+    with app.app_context():
+        applied = upgrade()
+        if applied:
+            for name in applied:
+                print(f"✓ Applied {name}")
+        else:
+            print("Database schema is up to date")
@@ -2,9 +2,9 @@ import secrets
 from datetime import date, datetime, time, timedelta
 
 from flask_login import UserMixin
-from werkzeug.security import check_password_hash, generate_password_hash
 
 from app import db
+from recurrence import show_occurrences
 
 
 class User(UserMixin, db.Model):
@@ -32,12 +32,16 @@ class User(UserMixin, db.Model):
     instance_host_roles = db.relationship("ShowInstanceHost", backref="user", lazy=True)
 
     def set_password(self, password):
-        """Set password hash"""
-        self.password_hash = generate_password_hash(password)
+        """Set password hash using the configured parameters"""
+        from passwords import hash_password
+
+        self.password_hash = hash_password(password)
 
     def check_password(self, password):
         """Check password against hash"""
-        return check_password_hash(self.password_hash, password)
+        from passwords import check_password
+
+        return check_password(self.password_hash, password)
 
     def generate_verification_token(self):
         """Generate email verification token"""
@@ -56,26 +60,21 @@ class User(UserMixin, db.Model):
 
     def get_show_role(self, show):
         """Get user's highest role for a specific show"""
-        if show.owner_id == self.id:
-            return "owner"
-
-        runner = ShowRunner.query.filter_by(show_id=show.id, user_id=self.id).first()
-        if runner:
-            return "runner"
+        from permissions import get_show_role
 
-        host = ShowHost.query.filter_by(show_id=show.id, user_id=self.id).first()
-        if host:
-            return "host"
-
-        return "comedian"
+        return get_show_role(self, show)
 
     def can_edit_show(self, show):
         """Check if user can edit show settings"""
-        return self.get_show_role(show) in ["owner", "runner"]
+        from permissions import EDIT_ROLES
+
+        return self.get_show_role(show) in EDIT_ROLES
 
     def can_manage_lineup(self, show):
         """Check if user can manage show lineup"""
-        return self.get_show_role(show) in ["owner", "runner", "host"]
+        from permissions import LINEUP_ROLES
+
+        return self.get_show_role(show) in LINEUP_ROLES
 
 
 class Show(db.Model):
@@ -155,32 +154,14 @@ class Show(db.Model):
         if from_date is None:
             from_date = date.today()
 
-        # Find the next occurrence based on day of week and cadence
-        days_ahead = 0
-        while True:
-            check_date = from_date + timedelta(days=days_ahead)
-            if check_date.strftime("%A") == self.day_of_week:
-                if self.repeat_cadence == "weekly":
-                    return check_date
-                elif self.repeat_cadence == "bi-weekly":
-                    # Check if it's the right week
-                    weeks_since_start = (check_date - self.started_date).days // 7
-                    if weeks_since_start % 2 == 0:
-                        return check_date
-                elif self.repeat_cadence == "monthly":
-                    # Find the right week of the month
-                    start_week = (self.started_date.day - 1) // 7
-                    current_week = (check_date.day - 1) // 7
-                    if start_week == current_week:
-                        return check_date
-                elif self.repeat_cadence == "custom" and self.custom_repeat_days:
-                    days_since_start = (check_date - self.started_date).days
-                    if days_since_start % self.custom_repeat_days == 0:
-                        return check_date
-
-            days_ahead += 1
-            if days_ahead > 365:  # Safety check
-                return None
+        # Look up to a year ahead, matching the original day-by-day search
+        return next(
+            show_occurrences(self, from_date, from_date + timedelta(days=365)), None
+        )
+
+    def get_instance_dates(self, start, end):
+        """Lazily yield every instance date between start and end inclusive"""
+        return show_occurrences(self, start, end)
 
 
 class ShowRunner(db.Model):
@@ -228,6 +209,19 @@ class ShowInstance(db.Model):
     start_time_override = db.Column(db.Time, nullable=True)
     end_time_override = db.Column(db.Time, nullable=True)
 
+    # Denormalized number of Signup rows and whether it has reached
+    # max_signups, both maintained by signup_service
+    signup_count = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    is_full = db.Column(
+        db.Boolean, default=False, server_default=db.false(), nullable=False
+    )
+
+    # Version stamp for conditional GETs, bumped by http_cache on any change
+    lineup_version = db.Column(
+        db.Integer, default=1, server_default="1", nullable=False
+    )
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     # Relationships
@@ -336,3 +330,27 @@ class Signup(db.Model):
     def show(self):
         """Get the show this signup is for"""
         return self.show_instance.show
+
+
+class OutboundEmail(db.Model):
+    """An email queued for the background sender (see email_outbox.py)"""
+
+    __tablename__ = "email_outbox"
+
+    id = db.Column(db.Integer, primary_key=True)
+    to_address = db.Column(db.String(120), nullable=False)
+    subject = db.Column(db.String(200), nullable=False)
+    text_body = db.Column(db.Text, nullable=False)
+    html_body = db.Column(db.Text, nullable=True)
+    kind = db.Column(db.String(50), nullable=True)  # verification, welcome, etc.
+
+    # pending -> sent, or failed once attempts run out
+    status = db.Column(db.String(20), default="pending", nullable=False)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    last_error = db.Column(db.Text, nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (db.Index("ix_email_outbox_due", "status", "next_attempt_at"),)
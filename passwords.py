@@ -0,0 +1,118 @@
+"""
+Password hashing with configurable cost.
+
+``PASSWORD_HASH_METHOD`` and ``PASSWORD_SALT_LENGTH`` take werkzeug's
+``generate_password_hash`` arguments (for example ``scrypt:16384:8:1`` or
+``pbkdf2:sha256:600000``). Hashes made with other parameters keep working:
+``authenticate`` verifies them as stored and, when the password is right,
+replaces them with a hash using the current parameters, so changing the
+setting migrates users as they log in.
+
+Hashing is deliberately CPU-heavy. With ``PASSWORD_HASH_THREADS`` set, it
+runs on a bounded pool instead of the request thread, so at most that many
+hashes use CPU at once per process and lineup requests on the same worker
+keep getting scheduled during a login rush. Requests beyond the pool plus
+``PASSWORD_HASH_QUEUE`` waiting get a PasswordBusyError (503) rather than
+piling up. scrypt and pbkdf2 release the GIL, so the pool's threads hash in
+parallel.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+DEFAULT_METHOD = "scrypt"
+DEFAULT_SALT_LENGTH = 16
+
+
+class PasswordBusyError(Exception):
+    """Too many password hashes already running or waiting"""
+
+    def __init__(self, message="Too many sign-ins right now. Try again shortly."):
+        super().__init__(message)
+        self.message = message
+        self.status_code = 503
+
+
+class PasswordHasher:
+    """Hashes and verifies passwords with fixed parameters and optional pool"""
+
+    def __init__(
+        self, method=DEFAULT_METHOD, salt_length=DEFAULT_SALT_LENGTH, threads=0, queue=0
+    ):
+        self.method = method
+        self.salt_length = salt_length
+        # werkzeug fills in defaults ("scrypt" -> "scrypt:32768:8:1"); read
+        # them back once so stored hashes can be compared by prefix
+        self.scheme = generate_password_hash("", method, 1).split("$", 1)[0]
+        self.pool = None
+        if threads:
+            self.pool = ThreadPoolExecutor(threads, thread_name_prefix="password")
+            self.slots = threading.BoundedSemaphore(threads + queue)
+
+    def _run(self, fn, *args):
+        if self.pool is None:
+            return fn(*args)
+        if not self.slots.acquire(blocking=False):
+            raise PasswordBusyError()
+        try:
+            return self.pool.submit(fn, *args).result()
+        finally:
+            self.slots.release()
+
+    def hash(self, password):
+        return self._run(
+            generate_password_hash, password, self.method, self.salt_length
+        )
+
+    def verify(self, stored_hash, password):
+        return self._run(check_password_hash, stored_hash, password)
+
+    def needs_rehash(self, stored_hash):
+        """Whether ``stored_hash`` was made with other parameters"""
+        scheme, _, rest = stored_hash.partition("$")
+        salt = rest.partition("$")[0]
+        return scheme != self.scheme or len(salt) != self.salt_length
+
+
+def make_hasher(config):
+    """Build the hasher configured by the PASSWORD_* settings"""
+    return PasswordHasher(
+        config.get("PASSWORD_HASH_METHOD", DEFAULT_METHOD),
+        config.get("PASSWORD_SALT_LENGTH", DEFAULT_SALT_LENGTH),
+        threads=config.get("PASSWORD_HASH_THREADS", 0),
+        queue=config.get("PASSWORD_HASH_QUEUE", 0),
+    )
+
+
+def get_hasher(app=None):
+    """The app's hasher, created once"""
+    app = app or current_app._get_current_object()
+    if "password_hasher" not in app.extensions:
+        app.extensions["password_hasher"] = make_hasher(app.config)
+    return app.extensions["password_hasher"]
+
+
+def hash_password(password):
+    return get_hasher().hash(password)
+
+
+def check_password(stored_hash, password):
+    return get_hasher().verify(stored_hash, password)
+
+
+def authenticate(user, password):
+    """Check ``password`` for ``user``, upgrading an outdated hash
+
+    Returns whether the password matched. On a match with a hash made
+    under older parameters, ``user.password_hash`` is replaced; the caller
+    commits. May raise PasswordBusyError.
+    """
+    hasher = get_hasher()
+    if not hasher.verify(user.password_hash, password):
+        return False
+    if hasher.needs_rehash(user.password_hash):
+        user.password_hash = hasher.hash(password)
+    return True
@@ -0,0 +1,128 @@
+"""
+Show role resolution with a per-request cache.
+
+A user's owner/runner/host memberships are loaded with a single UNION query
+the first time a permission is checked during a request and kept on
+``flask.g``, so repeated ``can_manage_lineup``/``can_edit_show`` calls from
+routes and templates don't go back to the database.
+"""
+
+from flask import g, has_app_context
+from sqlalchemy import event, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from app import db
+from models import Show, ShowHost, ShowRunner
+
+ROLE_RANK = {"comedian": 0, "host": 1, "runner": 2, "owner": 3}
+LINEUP_ROLES = ("owner", "runner", "host")
+EDIT_ROLES = ("owner", "runner")
+
+
+def membership_query(user_id, show_ids=None):
+    """UNION of the shows a user owns, runs and hosts, tagged with the role"""
+    owned = select(Show.id.label("show_id"), literal("owner").label("role")).where(
+        Show.owner_id == user_id
+    )
+    running = select(ShowRunner.show_id, literal("runner")).where(
+        ShowRunner.user_id == user_id
+    )
+    hosting = select(ShowHost.show_id, literal("host")).where(
+        ShowHost.user_id == user_id
+    )
+    if show_ids is not None:
+        owned = owned.where(Show.id.in_(show_ids))
+        running = running.where(ShowRunner.show_id.in_(show_ids))
+        hosting = hosting.where(ShowHost.show_id.in_(show_ids))
+    return union_all(owned, running, hosting)
+
+
+def _highest_roles(rows):
+    roles = {}
+    for show_id, role in rows:
+        if ROLE_RANK[role] > ROLE_RANK[roles.get(show_id, "comedian")]:
+            roles[show_id] = role
+    return roles
+
+
+def load_role_map(user_id):
+    """Map show_id -> highest role for every show the user has a role on"""
+    return _highest_roles(db.session.execute(membership_query(user_id)).all())
+
+
+def _request_cache():
+    if not has_app_context():
+        return None
+    if "show_roles" not in g:
+        g.show_roles = {}
+    return g.show_roles
+
+
+def get_role_map(user_id):
+    """Get the user's role map, loading it at most once per request"""
+    cache = _request_cache()
+    if cache is None:
+        return load_role_map(user_id)
+    if user_id not in cache:
+        cache[user_id] = load_role_map(user_id)
+    return cache[user_id]
+
+
+def prime_role_map(user_id, roles):
+    """Seed the request cache with a role map loaded elsewhere"""
+    cache = _request_cache()
+    if cache is not None:
+        cache.setdefault(user_id, dict(roles))
+
+
+def get_show_role(user, show):
+    """Get user's highest role for a specific show"""
+    if show.owner_id == user.id:
+        return "owner"
+    return get_role_map(user.id).get(show.id, "comedian")
+
+
+def get_show_roles(user, show_ids):
+    """Map each of ``show_ids`` to the user's role in at most one query"""
+    show_ids = list(show_ids)
+    cache = _request_cache()
+    if cache is not None and user.id in cache:
+        roles = cache[user.id]
+    elif show_ids:
+        roles = _highest_roles(
+            db.session.execute(membership_query(user.id, show_ids)).all()
+        )
+    else:
+        roles = {}
+    return {show_id: roles.get(show_id, "comedian") for show_id in show_ids}
+
+
+def get_managed_show_ids(user):
+    """IDs of shows the user runs or hosts without owning them"""
+    return [
+        show_id
+        for show_id, role in get_role_map(user.id).items()
+        if role in ("runner", "host")
+    ]
+
+
+def invalidate_roles(user_id=None):
+    """Drop cached role maps for one user, or for everyone when omitted"""
+    cache = _request_cache()
+    if cache is None:
+        return
+    if user_id is None:
+        cache.clear()
+    else:
+        cache.pop(user_id, None)
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_on_membership_change(session, flush_context):
+    """Forget cached roles when ownership or runner/host rows change"""
+    changed = list(session.new) + list(session.deleted) + list(session.dirty)
+    for obj in changed:
+        if isinstance(obj, (ShowRunner, ShowHost)):
+            invalidate_roles(obj.user_id)
+        elif isinstance(obj, Show):
+            invalidate_roles()
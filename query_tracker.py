@@ -0,0 +1,145 @@
+"""
+Per-request SQL instrumentation and N+1 detection.
+
+When ``SQL_INSTRUMENTATION`` is on, every request gets a tracker that counts
+the statements it issues, their total time and how often each identical
+(parameterized) statement repeats. Repeats at or above
+``N_PLUS_ONE_THRESHOLD`` are reported as likely N+1 patterns. Results are
+added as ``X-Query-*`` response headers, logged, and kept in a short history
+shown at ``/debug/queries`` to logged-in users, in debug mode or when listed
+in ``SQL_DEBUG_USERS``.
+
+``QUERY_BUDGETS`` maps endpoints to a maximum statement count. Going over
+logs a warning, or raises ``QueryBudgetExceeded`` when
+``SQL_QUERY_BUDGET_STRICT`` is set, so tests fail on query regressions.
+"""
+
+import time
+from collections import Counter, deque
+
+from flask import g, has_app_context, request
+from sqlalchemy import event
+
+DEFAULT_N_PLUS_ONE_THRESHOLD = 5
+HISTORY_SIZE = 200
+
+
+class QueryBudgetExceeded(Exception):
+    """A request issued more statements than its endpoint's budget"""
+
+
+class QueryTracker:
+    """Statements issued while handling one request"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = Counter()
+
+    def record(self, statement, seconds):
+        self.count += 1
+        self.seconds += seconds
+        self.statements[statement] += 1
+
+    def repeated(self, threshold):
+        """Statements issued at least ``threshold`` times, most frequent first"""
+        return [
+            (statement, times)
+            for statement, times in self.statements.most_common()
+            if times >= threshold
+        ]
+
+    def summary(self, threshold):
+        max_repeat = max(self.statements.values(), default=0)
+        return {
+            "endpoint": request.endpoint,
+            "method": request.method,
+            "path": request.full_path.rstrip("?"),
+            "queries": self.count,
+            "distinct": len(self.statements),
+            "max_repeat": max_repeat,
+            "db_ms": round(self.seconds * 1000, 2),
+            "n_plus_one": [
+                {"statement": statement, "times": times}
+                for statement, times in self.repeated(threshold)
+            ],
+        }
+
+
+def current_tracker():
+    """The tracker for the request being handled, if any"""
+    if not has_app_context():
+        return None
+    return g.get("query_tracker")
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, many):
+    # Kept on the execution context, so a statement that raises leaves nothing
+    context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, many):
+    tracker = current_tracker()
+    if tracker is not None:
+        tracker.record(statement, time.perf_counter() - context._query_started)
+
+
+def _listen(engine):
+    """Attach the timing listeners to ``engine`` unless already attached"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def query_history(app):
+    """Summaries of recent instrumented requests, oldest first"""
+    return list(app.extensions["query_history"])
+
+
+def init_query_tracking(app, db):
+    """Register the request hooks on ``app``"""
+    app.config.setdefault("SQL_INSTRUMENTATION", False)
+    app.config.setdefault("SQL_QUERY_BUDGET_STRICT", False)
+    app.config.setdefault("QUERY_BUDGETS", {})
+    app.config.setdefault("N_PLUS_ONE_THRESHOLD", DEFAULT_N_PLUS_ONE_THRESHOLD)
+    app.extensions["query_history"] = deque(maxlen=HISTORY_SIZE)
+
+    @app.before_request
+    def start_query_tracking():
+        # Listeners are only attached once instrumentation is first used, so
+        # statements pay nothing while it is off
+        if app.config["SQL_INSTRUMENTATION"]:
+            _listen(db.engine)
+            g.query_tracker = QueryTracker()
+
+    @app.after_request
+    def report_queries(response):
+        tracker = g.pop("query_tracker", None)
+        if tracker is None:
+            return response
+
+        summary = tracker.summary(app.config["N_PLUS_ONE_THRESHOLD"])
+        response.headers["X-Query-Count"] = str(summary["queries"])
+        response.headers["X-Query-Time-Ms"] = str(summary["db_ms"])
+        response.headers["X-Query-Max-Repeat"] = str(summary["max_repeat"])
+        if summary["n_plus_one"]:
+            response.headers["X-Query-N-Plus-One"] = str(len(summary["n_plus_one"]))
+            worst = summary["n_plus_one"][0]
+            app.logger.warning(
+                f"Possible N+1 in {summary['endpoint']}: {worst['times']} x "
+                f"{worst['statement'][:200]}"
+            )
+        if request.endpoint != "debug_queries":
+            app.extensions["query_history"].append(summary)
+
+        budget = app.config["QUERY_BUDGETS"].get(request.endpoint)
+        if budget is not None and summary["queries"] > budget:
+            message = (
+                f"{request.endpoint} issued {summary['queries']} queries "
+                f"(budget {budget})"
+            )
+            if app.config["SQL_QUERY_BUDGET_STRICT"]:
+                raise QueryBudgetExceeded(message)
+            app.logger.warning(message)
+
+        return response
@@ -0,0 +1,278 @@
+"""
+Read-only projections for calendar and lineup rendering.
+
+The public calendar and lineup pages only display a handful of columns, so
+instead of hydrating tracked ORM entities (and lazy loading Show and User
+per row) they read plain column tuples with Core ``select()`` into slotted,
+frozen dataclasses. The attribute names mirror the models (``event.show.name``,
+``signup.comedian.full_name``, ``event.get_host_names()``), so templates work
+with either.
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime, time
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import aliased
+
+from app import db
+from models import Show, ShowInstance, ShowInstanceHost, Signup, User
+
+
+@dataclass(slots=True, frozen=True)
+class Person:
+    id: int
+    first_name: str
+    last_name: str
+
+    @property
+    def full_name(self):
+        return f"{self.first_name} {self.last_name}"
+
+
+@dataclass(slots=True, frozen=True)
+class ShowCard:
+    id: int
+    name: str
+    venue: str
+    owner_id: int
+    address: str | None = None
+    description: str | None = None
+    show_host_info: bool = True
+    show_owner_info: bool = False
+    signup_window_after_hours: int | None = None
+    owner: Person | None = None
+
+
+@dataclass(slots=True, frozen=True)
+class InstanceCard:
+    id: int
+    show_id: int
+    instance_date: date
+    start_time: time
+    end_time: time
+    max_signups: int
+    is_cancelled: bool
+    signup_count: int
+    is_full: bool
+    show: ShowCard
+    cancellation_reason: str | None = None
+    created_at: datetime | None = None
+    host_names: str = "TBD"
+
+    def get_host_names(self):
+        return self.host_names
+
+
+@dataclass(slots=True, frozen=True)
+class LineupRow:
+    id: int
+    comedian_id: int
+    position: int
+    notes: str
+    performed: bool
+    signup_time: datetime
+    comedian: Person | None = None
+
+
+def card_columns():
+    """Columns ``instance_card`` reads: the instance and its show"""
+    return (
+        ShowInstance.id,
+        ShowInstance.show_id,
+        ShowInstance.instance_date,
+        ShowInstance.start_time_override,
+        ShowInstance.end_time_override,
+        ShowInstance.max_signups_override,
+        ShowInstance.is_cancelled,
+        ShowInstance.signup_count,
+        ShowInstance.is_full,
+        Show.start_time,
+        Show.end_time,
+        Show.max_signups,
+        Show.name,
+        Show.venue,
+        Show.owner_id,
+    )
+
+
+def instance_card(row, **extra):
+    """An InstanceCard from a row selected with ``card_columns``"""
+    # Same fallbacks as the ShowInstance override properties
+    show = extra.pop("show", None) or ShowCard(
+        id=row.show_id, name=row.name, venue=row.venue, owner_id=row.owner_id
+    )
+    return InstanceCard(
+        id=row.id,
+        show_id=row.show_id,
+        instance_date=row.instance_date,
+        start_time=row.start_time_override or row.start_time,
+        end_time=row.end_time_override or row.end_time,
+        max_signups=row.max_signups_override or row.max_signups,
+        is_cancelled=bool(row.is_cancelled),
+        signup_count=row.signup_count,
+        is_full=bool(row.is_full),
+        show=show,
+        **extra,
+    )
+
+
+def instance_cards(
+    start,
+    end,
+    include_cancelled=False,
+    show_id=None,
+    venue=None,
+    open_only=False,
+    after=None,
+    limit=None,
+):
+    """Cards for instances of non-deleted shows dated start <= date < end
+
+    ``open_only`` keeps instances with spots left (via the is_full flag).
+    ``after`` is an ``(instance_date, id)`` keyset cursor: only cards
+    ordered after it are returned, at most ``limit`` of them.
+    """
+    query = (
+        select(*card_columns())
+        .join(Show, ShowInstance.show_id == Show.id)
+        .where(
+            Show.is_deleted == False,
+            ShowInstance.instance_date >= start,
+            ShowInstance.instance_date < end,
+        )
+        .order_by(ShowInstance.instance_date, ShowInstance.id)
+    )
+    if not include_cancelled:
+        query = query.where(ShowInstance.is_cancelled == False)
+    if show_id is not None:
+        query = query.where(ShowInstance.show_id == show_id)
+    if venue:
+        query = query.where(func.lower(Show.venue) == venue.lower())
+    if open_only:
+        query = query.where(ShowInstance.is_full == False)
+    if after is not None:
+        after_date, after_id = after
+        query = query.where(
+            or_(
+                ShowInstance.instance_date > after_date,
+                and_(
+                    ShowInstance.instance_date == after_date,
+                    ShowInstance.id > after_id,
+                ),
+            )
+        )
+    if limit is not None:
+        query = query.limit(limit)
+    return [instance_card(row) for row in db.session.execute(query)]
+
+
+def host_names(instance_id, default_host=None):
+    """Instance-specific host names, else the show's default host, else TBD"""
+    rows = db.session.execute(
+        select(User.first_name, User.last_name)
+        .join(ShowInstanceHost, ShowInstanceHost.user_id == User.id)
+        .where(ShowInstanceHost.show_instance_id == instance_id)
+        .order_by(ShowInstanceHost.id)
+    ).all()
+    names = [f"{first} {last}" for first, last in rows]
+    if not names and default_host is not None:
+        names = [default_host.full_name]
+    return ", ".join(names) if names else "TBD"
+
+
+def instance_detail(instance_id, with_hosts=False):
+    """Full card for one instance, including show and owner details"""
+    owner = aliased(User)
+    default_host = aliased(User)
+    row = db.session.execute(
+        select(
+            *card_columns(),
+            ShowInstance.cancellation_reason,
+            ShowInstance.created_at,
+            Show.address,
+            Show.description,
+            Show.show_host_info,
+            Show.show_owner_info,
+            Show.signup_window_after_hours,
+            owner.first_name.label("owner_first_name"),
+            owner.last_name.label("owner_last_name"),
+            Show.default_host_id,
+            default_host.first_name.label("host_first_name"),
+            default_host.last_name.label("host_last_name"),
+        )
+        .join(Show, ShowInstance.show_id == Show.id)
+        .join(owner, Show.owner_id == owner.id)
+        .outerjoin(default_host, Show.default_host_id == default_host.id)
+        .where(ShowInstance.id == instance_id)
+    ).first()
+    if row is None:
+        return None
+
+    show = ShowCard(
+        id=row.show_id,
+        name=row.name,
+        venue=row.venue,
+        owner_id=row.owner_id,
+        address=row.address,
+        description=row.description,
+        show_host_info=row.show_host_info,
+        show_owner_info=row.show_owner_info,
+        signup_window_after_hours=row.signup_window_after_hours,
+        owner=Person(row.owner_id, row.owner_first_name, row.owner_last_name),
+    )
+    extra = {}
+    if with_hosts:
+        fallback = None
+        if row.default_host_id is not None:
+            fallback = Person(
+                row.default_host_id, row.host_first_name, row.host_last_name
+            )
+        extra["host_names"] = host_names(row.id, fallback)
+    return instance_card(
+        row,
+        show=show,
+        cancellation_reason=row.cancellation_reason,
+        created_at=row.created_at,
+        **extra,
+    )
+
+
+def lineup_rows(instance_id, order="lineup"):
+    """Signups for an instance in lineup order (or ``order="signup"``)"""
+    if order == "signup":
+        ordering = (Signup.signup_time, Signup.id)
+    else:
+        ordering = (Signup.position.asc().nullslast(), Signup.signup_time, Signup.id)
+
+    rows = db.session.execute(
+        select(
+            Signup.id,
+            Signup.comedian_id,
+            Signup.position,
+            Signup.notes,
+            Signup.performed,
+            Signup.signup_time,
+            User.first_name,
+            User.last_name,
+        )
+        .outerjoin(User, Signup.comedian_id == User.id)
+        .where(Signup.show_instance_id == instance_id)
+        .order_by(*ordering)
+    )
+    return [
+        LineupRow(
+            id=row.id,
+            comedian_id=row.comedian_id,
+            position=row.position,
+            notes=row.notes,
+            performed=row.performed,
+            signup_time=row.signup_time,
+            comedian=(
+                Person(row.comedian_id, row.first_name, row.last_name)
+                if row.first_name is not None
+                else None
+            ),
+        )
+        for row in rows
+    ]
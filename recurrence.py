@@ -0,0 +1,115 @@
+"""
+Recurrence expansion for shows.
+
+Computes every occurrence date of a show's cadence inside a date range with
+plain date arithmetic instead of testing one calendar day at a time. The
+rules match the original ``Show.get_next_instance_date`` loop:
+
+- weekly: every ``day_of_week``
+- bi-weekly: every other ``day_of_week``, counting whole weeks from
+  ``started_date``
+- monthly: the ``day_of_week`` falling in the same week of the month
+  (days 1-7, 8-14, ...) as ``started_date``
+- custom: a ``day_of_week`` that is a multiple of ``custom_repeat_days``
+  days after ``started_date``
+"""
+
+import calendar
+from datetime import date, timedelta
+from math import gcd
+
+WEEKDAYS = {name: index for index, name in enumerate(calendar.day_name)}
+
+ONE_WEEK = timedelta(days=7)
+
+
+def _first_weekday_on_or_after(day, weekday):
+    """Return the first date >= ``day`` that falls on ``weekday`` (0=Monday)"""
+    return day + timedelta(days=(weekday - day.weekday()) % 7)
+
+
+def _weekly(weekday, start, end, step_weeks=1, parity_from=None):
+    current = _first_weekday_on_or_after(start, weekday)
+    if parity_from is not None:
+        # Skip to a week that is an even number of weeks from started_date
+        if ((current - parity_from).days // 7) % 2:
+            current += ONE_WEEK
+    step = ONE_WEEK * step_weeks
+    while current <= end:
+        yield current
+        current += step
+
+
+def _monthly(weekday, week_of_month, start, end):
+    year, month = start.year, start.month
+    while date(year, month, 1) <= end:
+        first_weekday, days_in_month = calendar.monthrange(year, month)
+        day_number = 1 + (weekday - first_weekday) % 7 + 7 * week_of_month
+        if day_number <= days_in_month:
+            current = date(year, month, day_number)
+            if start <= current <= end:
+                yield current
+        month += 1
+        if month > 12:
+            year, month = year + 1, 1
+
+
+def _custom(weekday, started_date, repeat_days, start, end):
+    # Occurrences are started_date + k * repeat_days; find the first one in
+    # range that lands on the weekday, then step by lcm(repeat_days, 7).
+    k = max(0, -(-(start - started_date).days // repeat_days))
+    cycle = 7 // gcd(repeat_days, 7)
+    for offset in range(cycle):
+        candidate = started_date + timedelta(days=(k + offset) * repeat_days)
+        if candidate.weekday() == weekday:
+            break
+    else:
+        return
+
+    step = timedelta(days=repeat_days * cycle)
+    while candidate <= end:
+        yield candidate
+        candidate += step
+
+
+def iter_occurrences(
+    day_of_week,
+    repeat_cadence,
+    started_date,
+    start,
+    end,
+    custom_repeat_days=None,
+):
+    """Lazily yield occurrence dates between ``start`` and ``end`` inclusive"""
+    weekday = WEEKDAYS.get(day_of_week)
+    if weekday is None or start > end:
+        return iter(())
+
+    if repeat_cadence == "weekly":
+        return _weekly(weekday, start, end)
+    elif repeat_cadence == "bi-weekly":
+        return _weekly(weekday, start, end, step_weeks=2, parity_from=started_date)
+    elif repeat_cadence == "monthly":
+        return _monthly(weekday, (started_date.day - 1) // 7, start, end)
+    elif repeat_cadence == "custom" and custom_repeat_days:
+        # Dates before started_date still count backwards in the original
+        # loop, so anchor the progression at or before ``start``.
+        anchor = started_date
+        if anchor > start:
+            periods = -(-(anchor - start).days // custom_repeat_days)
+            anchor -= timedelta(days=periods * custom_repeat_days)
+        return _custom(weekday, anchor, custom_repeat_days, start, end)
+
+    return iter(())
+
+
+def show_occurrences(show, start, end):
+    """Lazily yield a show's occurrence dates between ``start`` and ``end``"""
+    return iter_occurrences(
+        show.day_of_week,
+        show.repeat_cadence or "weekly",
+        show.started_date or date.today(),
+        start,
+        end,
+        show.custom_repeat_days,
+    )
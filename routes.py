@@ -1,10 +1,34 @@
 from datetime import date, datetime, timedelta
 from urllib.parse import urljoin, urlparse
 
-from flask import flash, jsonify, redirect, render_template, request, url_for
+from flask import (
+    Response,
+    abort,
+    flash,
+    jsonify,
+    redirect,
+    render_template,
+    request,
+    stream_with_context,
+    url_for,
+)
 from flask_login import current_user, login_required, login_user, logout_user
-
-from app import app, db
+from sqlalchemy import select
+
+from app import app, db, login_manager
+from calendar_data import (
+    DEFAULT_COLOR,
+    FEED_DEFAULT_DAYS,
+    FEED_MAX_PAGE_SIZE,
+    FEED_PAGE_SIZE,
+    OWNED_COLOR,
+    SIGNED_UP_COLOR,
+    build_events_by_date,
+    feed_page,
+    get_user_signup_ids,
+)
+from dashboard import build_dashboard
+from email_service import send_lineup_posted
 from forms import (
     CancellationForm,
     EventForm,
@@ -14,6 +38,16 @@ from forms import (
     ShowSettingsForm,
     SignupForm,
 )
+from http_cache import conditional_on_instance
+from lineup_events import (
+    publish_added,
+    publish_positions,
+    publish_removed,
+    stream_lineup,
+    stream_slots,
+)
+from lineup_service import LineupError, reorder, set_positions
+from loader_profiles import profile
 from models import (
     Show,
     ShowHost,
@@ -23,6 +57,24 @@ from models import (
     Signup,
     User,
 )
+from passwords import PasswordBusyError, authenticate
+from query_tracker import query_history
+from read_models import instance_detail, lineup_rows
+from scheduler import materialize_show
+from signup_service import SignupError, remove_signup, sign_up
+from streaming import iter_rows, json_array_response
+from user_lookup import (
+    SEARCH_LIMIT,
+    SEARCH_MAX_LIMIT,
+    normalize,
+    resolve_user,
+    search_users,
+)
+
+
+def instance_horizon_end():
+    """Last date show instances are kept materialized up to"""
+    return date.today() + timedelta(weeks=app.config["INSTANCE_HORIZON_WEEKS"])
 
 
 def is_safe_url(target):
@@ -45,12 +97,16 @@ def register():
     form = RegistrationForm()
     if form.validate_on_submit():
         user = User(
-            username=form.username.data,
-            email=form.email.data.lower(),
+            username=form.username.data.strip(),
+            email=normalize(form.email.data),
             first_name=form.first_name.data,
             last_name=form.last_name.data,
         )
-        user.set_password(form.password.data)
+        try:
+            user.set_password(form.password.data)
+        except PasswordBusyError as e:
+            flash(e.message)
+            return render_template("auth/register.html", form=form), e.status_code
         db.session.add(user)
         db.session.commit()
         flash("Registration successful! You can now log in.")
@@ -66,8 +122,14 @@ def login():
 
     form = LoginForm()
     if form.validate_on_submit():
-        user = User.query.filter_by(username=form.username.data).first()
-        if user and user.check_password(form.password.data):
+        user = resolve_user(form.username.data)
+        try:
+            authenticated = user is not None and authenticate(user, form.password.data)
+        except PasswordBusyError as e:
+            flash(e.message)
+            return render_template("auth/login.html", form=form), e.status_code
+        if authenticated:
+            db.session.commit()  # Saves a hash upgraded to current settings
             login_user(user)
             next_page = request.args.get("next")
             if not next_page or not is_safe_url(next_page):
@@ -88,51 +150,15 @@ def logout():
 @login_required
 def dashboard():
     """Combined dashboard that shows relevant content based on user's roles"""
-    # Get all shows where user has any role
-    owned_shows = Show.query.filter_by(owner_id=current_user.id, is_deleted=False).all()
-
-    # Get shows where user is a runner or host
-    runner_show_ids = [sr.show_id for sr in current_user.show_runner_roles]
-    host_show_ids = [sh.show_id for sh in current_user.show_host_roles]
-
-    managed_shows = []
-    if runner_show_ids or host_show_ids:
-        all_managed_ids = list(set(runner_show_ids + host_show_ids))
-        managed_shows = Show.query.filter(
-            Show.id.in_(all_managed_ids), Show.is_deleted == False
-        ).all()
-
-    # Get upcoming show instances for shows user can manage
-    all_show_ids = [s.id for s in owned_shows + managed_shows]
-    upcoming_instances = []
-    if all_show_ids:
-        upcoming_instances = (
-            ShowInstance.query.filter(
-                ShowInstance.show_id.in_(all_show_ids),
-                ShowInstance.instance_date >= date.today(),
-                ShowInstance.is_cancelled == False,
-            )
-            .order_by(ShowInstance.instance_date)
-            .limit(10)
-            .all()
-        )
-
-    # Get user's recent signups
-    recent_signups = (
-        Signup.query.filter_by(comedian_id=current_user.id)
-        .join(ShowInstance)
-        .filter(ShowInstance.instance_date >= date.today())
-        .order_by(ShowInstance.instance_date)
-        .limit(5)
-        .all()
-    )
+    # The template only shows the shows and counts, so skip the instance query
+    data = build_dashboard(current_user.id, instances=False)
 
     return render_template(
         "combined_dashboard.html",
-        owned_shows=owned_shows,
-        managed_shows=managed_shows,
-        upcoming_instances=upcoming_instances,
-        recent_signups=recent_signups,
+        owned_shows=data.owned_shows,
+        managed_shows=data.managed_shows,
+        signup_count=data.signup_count,
+        show_count=len(data.all_shows),
     )
 
 
@@ -144,6 +170,7 @@ def comedian_dashboard():
     one_month_from_now = date.today() + timedelta(days=30)
     upcoming_instances = (
         ShowInstance.query.join(Show)
+        .options(*profile("instance_cards"))
         .filter(
             Show.is_deleted == False,
             ShowInstance.instance_date >= date.today(),
@@ -158,6 +185,7 @@ def comedian_dashboard():
     upcoming_signups = (
         Signup.query.filter_by(comedian_id=current_user.id)
         .join(ShowInstance)
+        .options(*profile("signup_cards"))
         .filter(ShowInstance.instance_date >= date.today())
         .order_by(ShowInstance.instance_date)
         .all()
@@ -177,27 +205,15 @@ def comedian_dashboard():
 @login_required
 def host_dashboard():
     """Host-specific dashboard for managing shows and lineups"""
-    # Get shows user can manage
-    owned_shows = Show.query.filter_by(owner_id=current_user.id, is_deleted=False).all()
-
-    # Get shows where user is a runner or host
-    runner_show_ids = [sr.show_id for sr in current_user.show_runner_roles]
-    host_show_ids = [sh.show_id for sh in current_user.show_host_roles]
-
-    managed_shows = []
-    if runner_show_ids or host_show_ids:
-        all_managed_ids = list(set(runner_show_ids + host_show_ids))
-        managed_shows = Show.query.filter(
-            Show.id.in_(all_managed_ids), Show.is_deleted == False
-        ).all()
-
-    all_shows = owned_shows + managed_shows
+    # Shows the user owns, runs or hosts, with their roles, in one query
+    data = build_dashboard(current_user.id, instances=False)
+    all_shows = data.all_shows
 
     return render_template(
         "host/dashboard.html",
         events=all_shows,  # Use 'events' to match template expectations
-        owned_shows=owned_shows,
-        managed_shows=managed_shows,
+        owned_shows=data.owned_shows,
+        managed_shows=data.managed_shows,
         all_shows=all_shows,
     )
 
@@ -217,7 +233,8 @@ def upcoming_lineups(show_id):
     from datetime import date, timedelta
 
     upcoming_instances = (
-        ShowInstance.query.filter(ShowInstance.show_id == show_id)
+        ShowInstance.query.options(*profile("instance_lineups"))
+        .filter(ShowInstance.show_id == show_id)
         .filter(ShowInstance.instance_date >= date.today())
         .order_by(ShowInstance.instance_date.asc())
         .limit(10)
@@ -339,17 +356,8 @@ def create_show_api():
         db.session.add(show)
         db.session.flush()  # Get the show ID
 
-        # Create show instances for the next 3 months
-        from datetime import timedelta
-
-        start_date = show.get_next_instance_date()
-        end_date = start_date + timedelta(days=90)
-
-        current_date = start_date
-        while current_date <= end_date:
-            instance = ShowInstance(show_id=show.id, instance_date=current_date)
-            db.session.add(instance)
-            current_date = show.get_next_instance_date(current_date)
+        # Create show instances up to the rolling horizon in one bulk insert
+        materialize_show(show, date.today(), instance_horizon_end())
 
         db.session.commit()
 
@@ -448,27 +456,8 @@ def create_event():
         db.session.add(show)
         db.session.flush()  # Get the show ID
 
-        # Create show instances for the next 3 months
-        from datetime import timedelta
-
-        current_date = date.today()
-        end_date = current_date + timedelta(days=90)  # 3 months ahead
-
-        # Find the next occurrence of this day of week
-        target_date = show.get_next_instance_date(current_date)
-
-        while target_date and target_date <= end_date:
-            # Check if instance already exists
-            existing_instance = ShowInstance.query.filter_by(
-                show_id=show.id, instance_date=target_date
-            ).first()
-
-            if not existing_instance:
-                instance = ShowInstance(show_id=show.id, instance_date=target_date)
-                db.session.add(instance)
-
-            # Get next occurrence based on repeat cadence
-            target_date = show.get_next_instance_date(target_date + timedelta(days=1))
+        # Create show instances up to the rolling horizon in one bulk insert
+        materialize_show(show, date.today(), instance_horizon_end())
 
         db.session.commit()
 
@@ -587,56 +576,8 @@ def calendar_view():
     else:
         next_month_start = date(current_year, current_month + 1, 1)
 
-    instances = (
-        ShowInstance.query.join(Show)
-        .filter(
-            Show.is_deleted == False,
-            ShowInstance.instance_date >= month_start,
-            ShowInstance.instance_date < next_month_start,
-            ShowInstance.is_cancelled == False,
-        )
-        .order_by(ShowInstance.instance_date)
-        .all()
-    )
-
-    # Group events by date for template
-    events_by_date = {}
-    for instance in instances:
-        instance_date = instance.instance_date
-        if instance_date not in events_by_date:
-            events_by_date[instance_date] = []
-
-        # Get signup count
-        signup_count = Signup.query.filter_by(show_instance_id=instance.id).count()
-
-        # Determine color based on user's relationship to event
-        background_color = "#6c757d"  # Default dull gray
-        color_class = "default-event"
-
-        if current_user.is_authenticated:
-            # Check if user owns the event
-            if instance.show.owner_id == current_user.id:
-                background_color = "#dc3545"  # Red for owned events
-                color_class = "owned-event"
-            else:
-                # Check if user has signed up for this event
-                user_signup = Signup.query.filter_by(
-                    comedian_id=current_user.id, show_instance_id=instance.id
-                ).first()
-
-                if user_signup:
-                    background_color = "#28a745"  # Green for signed up events
-                    color_class = "signed-up-event"
-
-        events_by_date[instance_date].append(
-            {
-                "event": instance,
-                "date": instance_date,
-                "signup_count": signup_count,
-                "background_color": background_color,
-                "color_class": color_class,
-            }
-        )
+    # Group events by date for template (constant number of queries)
+    events_by_date = build_events_by_date(month_start, next_month_start, current_user)
 
     # Generate calendar days for the requested month
     import calendar
@@ -655,86 +596,163 @@ def calendar_view():
     )
 
 
+def _feed_date(value):
+    """Date from a ``YYYY-MM-DD`` (or longer ISO datetime) query value"""
+    return date.fromisoformat(value[:10]) if value else None
+
+
 @app.route("/api/calendar/events")
 @login_required
 def calendar_events_api():
-    """API endpoint to get calendar events for the calendar view"""
+    """API endpoint to get calendar events for the calendar view
+
+    Accepts ``start``/``end`` (end exclusive, defaulting to the next 90
+    days), ``show_id``, ``venue`` and ``open=1`` (only instances with spots
+    left) filters, and keyset pagination through
+    ``limit`` and ``cursor``. Without either, every event in the range is
+    returned, as before paging existed; a ``cursor`` alone pages by
+    ``FEED_PAGE_SIZE``. The next page's cursor is sent in the
+    ``X-Next-Cursor`` and ``Link`` headers; the body is a JSON array.
+    """
     try:
-        # Get upcoming show instances (next 3 months)
-        start_date = date.today()
-        end_date = start_date + timedelta(days=90)
-
-        instances = (
-            ShowInstance.query.join(Show)
-            .filter(
-                Show.is_deleted == False,
-                ShowInstance.instance_date >= start_date,
-                ShowInstance.instance_date <= end_date,
-                ShowInstance.is_cancelled == False,
-            )
-            .order_by(ShowInstance.instance_date)
-            .all()
+        start_date = _feed_date(request.args.get("start")) or date.today()
+        end_date = _feed_date(request.args.get("end")) or start_date + timedelta(
+            days=FEED_DEFAULT_DAYS + 1
         )
+    except ValueError:
+        return jsonify({"success": False, "error": "Invalid start or end date"}), 400
+    if end_date <= start_date:
+        return jsonify({"success": False, "error": "end must be after start"}), 400
 
-        events = []
-        for instance in instances:
-            # Determine color based on user's relationship to event
-            background_color = "#6c757d"  # Default dull blue/gray
-            border_color = "#6c757d"
-
-            if current_user.is_authenticated:
-                # Check if user owns the event
-                if instance.show.owner_id == current_user.id:
-                    background_color = "#dc3545"  # Red for owned events
-                    border_color = "#dc3545"
-                else:
-                    # Check if user has signed up for this event
-                    user_signup = Signup.query.filter_by(
-                        comedian_id=current_user.id, show_instance_id=instance.id
-                    ).first()
-
-                    if user_signup:
-                        background_color = "#28a745"  # Green for signed up events
-                        border_color = "#28a745"
-
-            events.append(
-                {
-                    "id": instance.id,
-                    "title": f"{instance.show.name} @ {instance.show.venue}",
-                    "date": instance.instance_date.isoformat(),
-                    "url": url_for("event_info", event_id=instance.id),
-                    "backgroundColor": background_color,
-                    "borderColor": border_color,
-                }
-            )
+    limit = request.args.get("limit", type=int)
+    if limit is not None:
+        limit = max(1, min(limit, FEED_MAX_PAGE_SIZE))
+    elif request.args.get("cursor"):
+        limit = FEED_PAGE_SIZE
 
-        return jsonify(events)
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    try:
+        instances, next_cursor = feed_page(
+            start_date,
+            end_date,
+            show_id=request.args.get("show_id", type=int),
+            venue=request.args.get("venue"),
+            open_only=request.args.get("open") in ("1", "true"),
+            cursor=request.args.get("cursor"),
+            limit=limit,
+        )
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    signed_up_ids = set()
+    if instances:
+        signed_up_ids = get_user_signup_ids(
+            current_user.id,
+            instances[0].instance_date,
+            instances[-1].instance_date + timedelta(days=1),
+        )
+    # Built once rather than calling url_for for every event
+    event_url = url_for("event_info", event_id=0)[:-1]
+    user_id = current_user.id
+
+    def serialize(instance):
+        # Determine color based on user's relationship to event
+        if instance.show.owner_id == user_id:
+            color = OWNED_COLOR  # Red for owned events
+        elif instance.id in signed_up_ids:
+            color = SIGNED_UP_COLOR  # Green for signed up events
+        else:
+            color = DEFAULT_COLOR  # Default dull blue/gray
+
+        return {
+            "id": instance.id,
+            "title": f"{instance.show.name} @ {instance.show.venue}",
+            "date": instance.instance_date,
+            "url": f"{event_url}{instance.id}",
+            "backgroundColor": color,
+            "borderColor": color,
+        }
+
+    headers = {}
+    if next_cursor:
+        next_url = url_for(
+            "calendar_events_api", **{**request.args.to_dict(), "cursor": next_cursor}
+        )
+        headers["X-Next-Cursor"] = next_cursor
+        headers["Link"] = f'<{next_url}>; rel="next"'
+    return json_array_response(instances, serialize, headers=headers)
+
+
+@app.route("/api/show/<int:show_id>/signups/export")
+@login_required
+def export_show_signups(show_id):
+    """Every signup for a show's instances, oldest first, as a JSON array"""
+    show = Show.query.get_or_404(show_id)
+
+    if not current_user.can_manage_lineup(show):
+        return jsonify({"success": False, "error": "Permission denied"}), 403
+
+    rows = iter_rows(
+        select(
+            Signup.id,
+            Signup.show_instance_id,
+            ShowInstance.instance_date,
+            Signup.comedian_id,
+            User.first_name,
+            User.last_name,
+            Signup.position,
+            Signup.performed,
+            Signup.signup_time,
+            Signup.notes,
+        )
+        .join(ShowInstance, Signup.show_instance_id == ShowInstance.id)
+        .outerjoin(User, Signup.comedian_id == User.id)
+        .where(ShowInstance.show_id == show.id)
+        .order_by(ShowInstance.instance_date, Signup.position, Signup.signup_time)
+    )
+    return json_array_response(rows, lambda row: row._asdict())
+
+
+@app.route("/api/users/search")
+@login_required
+def search_users_api():
+    """Typeahead for host pickers: users whose names start with or resemble ``q``
+
+    Only people who manage the lineup of ``show_id`` may search, so the
+    user list isn't open to every account.
+    """
+    show_id = request.args.get("show_id", type=int)
+    if show_id is None:
+        return jsonify({"success": False, "error": "show_id is required"}), 400
+    show = Show.query.get_or_404(show_id)
+    if not current_user.can_manage_lineup(show):
+        return jsonify({"success": False, "error": "Permission denied"}), 403
+
+    limit = request.args.get("limit", SEARCH_LIMIT, type=int)
+    limit = max(1, min(limit, SEARCH_MAX_LIMIT))
+    users = search_users(request.args.get("q", ""), limit)
+    return jsonify({"success": True, "users": [user.to_dict() for user in users]})
 
 
 @app.route("/event/<int:event_id>")
+@conditional_on_instance
 def event_info(event_id):
     """Show information about a specific show instance"""
-    instance = ShowInstance.query.get_or_404(event_id)
-    signups = (
-        Signup.query.filter_by(show_instance_id=instance.id)
-        .order_by(Signup.signup_time)
-        .all()
-    )
+    instance = instance_detail(event_id, with_hosts=True)
+    if instance is None:
+        abort(404)
+    signups = lineup_rows(instance.id, order="signup")
 
     return render_template("public/event_info.html", event=instance, signups=signups)
 
 
 @app.route("/live/<int:event_id>")
+@conditional_on_instance
 def live_lineup(event_id):
     """Live lineup view for show instances"""
-    instance = ShowInstance.query.get_or_404(event_id)
-    signups = (
-        Signup.query.filter_by(show_instance_id=instance.id)
-        .order_by(Signup.position.asc().nullslast(), Signup.signup_time)
-        .all()
-    )
+    instance = instance_detail(event_id)
+    if instance is None:
+        abort(404)
+    signups = lineup_rows(instance.id)
 
     from datetime import datetime
 
@@ -746,6 +764,29 @@ def live_lineup(event_id):
     )
 
 
+@app.route("/live/<int:event_id>/stream")
+def live_lineup_stream(event_id):
+    """Server-Sent Events feed of lineup changes for the live lineup page"""
+    instance = ShowInstance.query.get_or_404(event_id)
+
+    # Each stream holds a thread; over the cap the page polls instead
+    slots = stream_slots()
+    if not slots.acquire(blocking=False):
+        return Response(
+            "Too many live viewers, polling instead",
+            status=503,
+            headers={"Retry-After": "30", "Cache-Control": "no-cache"},
+        )
+
+    response = Response(
+        stream_with_context(stream_lineup(instance.id)),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    response.call_on_close(slots.release)
+    return response
+
+
 @app.route("/signup/<int:event_id>", methods=["GET", "POST"])
 @login_required
 def signup_for_event(event_id):
@@ -781,46 +822,13 @@ def signup_for_event(event_id):
     form = SignupForm()
 
     if form.validate_on_submit():
-        # Check if signups are still open
-        from datetime import datetime, timedelta
-
-        show_datetime = datetime.combine(instance.instance_date, instance.start_time)
-        signup_deadline = show_datetime - timedelta(
-            hours=instance.show.signup_window_after_hours
-        )
-
-        if datetime.now() > signup_deadline:
-            flash("Signup deadline has passed for this show.", "error")
-            referrer = request.referrer
-            if referrer and "calendar" in referrer:
-                return redirect(url_for("calendar_view"))
-            elif referrer and "comedian" in referrer:
-                return redirect(url_for("comedian_dashboard"))
-            else:
-                return redirect(url_for("comedian_dashboard"))
-
-        # Check if show is full
-        current_signups = Signup.query.filter_by(show_instance_id=instance.id).count()
-        if current_signups >= instance.max_signups:
-            flash("This show is full.", "error")
-            referrer = request.referrer
-            if referrer and "calendar" in referrer:
-                return redirect(url_for("calendar_view"))
-            elif referrer and "comedian" in referrer:
-                return redirect(url_for("comedian_dashboard"))
-            else:
-                return redirect(url_for("comedian_dashboard"))
-
-        # Create signup
-        signup = Signup(
-            comedian_id=current_user.id,
-            show_instance_id=instance.id,
-            notes=form.notes.data,
-        )
-        db.session.add(signup)
-        db.session.commit()
-
-        flash(f"Successfully signed up for {instance.show.name}!", "success")
+        try:
+            signup = sign_up(instance, current_user.id, notes=form.notes.data)
+        except SignupError as e:
+            flash(e.message, "error")
+        else:
+            publish_added(instance.id, signup)
+            flash(f"Successfully signed up for {instance.show.name}!", "success")
 
         # Redirect based on referrer
         referrer = request.referrer
@@ -839,7 +847,7 @@ def signup_for_event(event_id):
                 "event_date": instance.instance_date.strftime("%A, %B %d, %Y"),
                 "event_time": instance.start_time.strftime("%I:%M %p"),
                 "venue": instance.show.venue,
-                "signups": Signup.query.filter_by(show_instance_id=instance.id).count(),
+                "signups": instance.signup_count,
                 "max_signups": instance.max_signups,
             }
         )
@@ -853,59 +861,21 @@ def api_signup_for_event(event_id):
     """AJAX endpoint for signing up for events"""
     instance = ShowInstance.query.get_or_404(event_id)
 
-    # Check if show instance is cancelled
-    if instance.is_cancelled:
-        return jsonify({"success": False, "error": "This show is cancelled."}), 400
-
-    # Check if user is already signed up
-    existing_signup = Signup.query.filter_by(
-        comedian_id=current_user.id, show_instance_id=instance.id
-    ).first()
-
-    if existing_signup:
-        return (
-            jsonify(
-                {"success": False, "error": "You are already signed up for this show."}
-            ),
-            400,
-        )
-
-    # Check if signups are still open
-    from datetime import datetime, timedelta
-
-    show_datetime = datetime.combine(instance.instance_date, instance.start_time)
-    signup_deadline = show_datetime - timedelta(
-        hours=instance.show.signup_window_after_hours
-    )
-
-    if datetime.now() > signup_deadline:
-        return (
-            jsonify(
-                {"success": False, "error": "Signup deadline has passed for this show."}
-            ),
-            400,
-        )
-
-    # Check if show is full
-    current_signups = Signup.query.filter_by(show_instance_id=instance.id).count()
-    if current_signups >= instance.max_signups:
-        return jsonify({"success": False, "error": "This show is full."}), 400
-
     # Get notes from request
     notes = request.json.get("notes", "") if request.is_json else ""
 
-    # Create signup
-    signup = Signup(
-        comedian_id=current_user.id, show_instance_id=instance.id, notes=notes
-    )
-    db.session.add(signup)
-    db.session.commit()
+    # Capacity, duplicates and deadlines are enforced atomically by the service
+    try:
+        signup = sign_up(instance, current_user.id, notes=notes)
+    except SignupError as e:
+        return jsonify({"success": False, "error": e.message}), e.status_code
+    publish_added(instance.id, signup)
 
     return jsonify(
         {
             "success": True,
             "message": f"Successfully signed up for {instance.show.name}!",
-            "signup_count": current_signups + 1,
+            "signup_count": instance.signup_count,
         }
     )
 
@@ -929,8 +899,9 @@ def cancel_signup(signup_id):
     show_name = signup.show_instance.show.name
     comedian_name = signup.comedian.full_name if signup.comedian else "Guest"
 
-    db.session.delete(signup)
-    db.session.commit()
+    signup_id, instance_id = signup.id, signup.show_instance_id
+    remove_signup(signup)
+    publish_removed(instance_id, signup_id)
 
     if signup.comedian_id == current_user.id:
         flash(f"Cancelled your signup for {show_name}.", "success")
@@ -944,7 +915,11 @@ def cancel_signup(signup_id):
 @login_required
 def manage_lineup(event_id):
     """Allow hosts to manage show lineup and manually add comedians"""
-    instance = ShowInstance.query.get_or_404(event_id)
+    instance = (
+        ShowInstance.query.options(*profile("lineup_instance"))
+        .filter_by(id=event_id)
+        .first_or_404()
+    )
 
     # Check if user can manage this show
     if not current_user.can_manage_lineup(instance.show):
@@ -953,7 +928,8 @@ def manage_lineup(event_id):
 
     # Get signups ordered by position then signup time
     signups = (
-        Signup.query.filter_by(show_instance_id=instance.id)
+        Signup.query.options(*profile("lineup_signups"))
+        .filter_by(show_instance_id=instance.id)
         .order_by(Signup.position.asc().nullslast(), Signup.signup_time)
         .all()
     )
@@ -962,14 +938,24 @@ def manage_lineup(event_id):
     if request.method == "POST":
         if "update_positions" in request.form:
             # Update positions from form data
+            positions = {}
             for signup in signups:
                 position_key = f"position_{signup.id}"
                 if position_key in request.form:
                     new_position = request.form[position_key]
-                    signup.position = int(new_position) if new_position else None
-
-            db.session.commit()
-            flash("Lineup positions updated.", "success")
+                    positions[signup.id] = int(new_position) if new_position else None
+
+            try:
+                set_positions(
+                    instance.id,
+                    positions,
+                    request.form.get("lineup_version", type=int),
+                )
+            except LineupError as e:
+                flash(e.message, "error")
+            else:
+                publish_positions(instance.id, positions)
+                flash("Lineup positions updated.", "success")
             return redirect(url_for("manage_lineup", event_id=event_id))
 
         elif "add_comedian" in request.form:
@@ -977,7 +963,7 @@ def manage_lineup(event_id):
             comedian_name = request.form.get("comedian_name", "").strip()
             if comedian_name:
                 # Try to find existing user first
-                comedian = User.query.filter_by(username=comedian_name).first()
+                comedian = resolve_user(comedian_name)
                 if not comedian:
                     # Create a note-based signup for non-registered comedian
                     signup = Signup(
@@ -989,20 +975,21 @@ def manage_lineup(event_id):
                     db.session.commit()
                     flash(f"Added {comedian_name} to the lineup.", "success")
                 else:
-                    # Check if already signed up
-                    existing = Signup.query.filter_by(
-                        comedian_id=comedian.id, show_instance_id=instance.id
-                    ).first()
-                    if existing:
-                        flash(f"{comedian_name} is already signed up.", "warning")
-                    else:
-                        signup = Signup(
-                            comedian_id=comedian.id,
-                            show_instance_id=instance.id,
+                    # Hosts may add past the signup limit and deadline
+                    try:
+                        signup = sign_up(
+                            instance,
+                            comedian.id,
                             notes="Added by host",
+                            enforce_limits=False,
                         )
-                        db.session.add(signup)
-                        db.session.commit()
+                    except SignupError as e:
+                        if e.status_code == 409:
+                            flash(f"{comedian_name} is already signed up.", "warning")
+                        else:
+                            flash(e.message, "error")
+                    else:
+                        publish_added(instance.id, signup)
                         flash(f"Added {comedian_name} to the lineup.", "success")
 
             return redirect(url_for("manage_lineup", event_id=event_id))
@@ -1010,6 +997,22 @@ def manage_lineup(event_id):
     return render_template("host/manage_lineup.html", event=instance, signups=signups)
 
 
+@app.route("/host/notify_lineup/<int:event_id>", methods=["POST"])
+@login_required
+def notify_lineup(event_id):
+    """Email everyone on the lineup that it has been posted"""
+    instance = ShowInstance.query.get_or_404(event_id)
+
+    if not current_user.can_manage_lineup(instance.show):
+        flash("You don't have permission to manage this show's lineup.", "error")
+        return redirect(url_for("dashboard"))
+
+    queued = send_lineup_posted(instance.id)
+    db.session.commit()
+    flash(f"Lineup emailed to {queued} comedians.", "success")
+    return redirect(url_for("manage_lineup", event_id=event_id))
+
+
 @app.route("/host/reorder_lineup/<int:event_id>", methods=["POST"])
 @login_required
 def reorder_lineup(event_id):
@@ -1020,19 +1023,73 @@ def reorder_lineup(event_id):
     if not current_user.can_manage_lineup(instance.show):
         return jsonify({"success": False, "error": "Permission denied"}), 403
 
+    data = request.get_json(silent=True) or {}
+    signup_ids = data.get("signup_ids")
+    if not isinstance(signup_ids, list):
+        return jsonify({"success": False, "error": "signup_ids is required"}), 400
+
+    # The version token is optional for scripted clients: without it the write
+    # is last-writer-wins, though reorder() still rejects an order that misses
+    # a signup made meanwhile. The lineup page always sends it.
+    version = data.get("version")
+    if version is not None:
+        try:
+            version = int(version)
+        except (TypeError, ValueError):
+            return (
+                jsonify({"success": False, "error": "version must be an integer"}),
+                400,
+            )
+
+    # Whole lineup validated in one query and written in one UPDATE
     try:
-        data = request.get_json()
-        signup_ids = data.get("signup_ids", [])
+        positions, version = reorder(instance.id, signup_ids, version)
+    except LineupError as e:
+        return (
+            jsonify({"success": False, "error": e.message, "version": e.version}),
+            e.status_code,
+        )
 
-        # Update positions based on order
-        for position, signup_id in enumerate(signup_ids, 1):
-            signup = Signup.query.get(signup_id)
-            if signup and signup.show_instance_id == instance.id:
-                signup.position = position
+    publish_positions(instance.id, positions)
+    return jsonify({"success": True, "version": version})
+
+
+@app.route("/debug/queries")
+def debug_queries():
+    """Summary of SQL issued by recent requests (instrumentation only)
+
+    Request paths and SQL text can carry private data, so only logged-in
+    users in debug mode or listed in ``SQL_DEBUG_USERS`` may see it.
+    """
+    if not app.config["SQL_INSTRUMENTATION"]:
+        abort(404)
+    if not current_user.is_authenticated:
+        return login_manager.unauthorized()
+    if not (
+        app.debug or normalize(current_user.username) in app.config["SQL_DEBUG_USERS"]
+    ):
+        abort(403)
+
+    history = list(reversed(query_history(app)))
+    endpoints = {}
+    for summary in history:
+        stats = endpoints.setdefault(
+            summary["endpoint"],
+            {"requests": 0, "max_queries": 0, "total_ms": 0.0, "n_plus_one": 0},
+        )
+        stats["requests"] += 1
+        stats["max_queries"] = max(stats["max_queries"], summary["queries"])
+        stats["total_ms"] += summary["db_ms"]
+        stats["n_plus_one"] += bool(summary["n_plus_one"])
 
-        db.session.commit()
-        return jsonify({"success": True})
+    if request.accept_mimetypes.best == "application/json":
+        return jsonify({"endpoints": endpoints, "requests": history})
 
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({"success": False, "error": str(e)}), 500
+    return render_template(
+        "debug/queries.html",
+        endpoints=sorted(
+            endpoints.items(), key=lambda item: item[1]["max_queries"], reverse=True
+        ),
+        history=history,
+        budgets=app.config["QUERY_BUDGETS"],
+    )
@@ -0,0 +1,172 @@
+"""
+Rolling materialization of ShowInstance rows.
+
+Keeps every active show's instances created a fixed number of weeks ahead.
+Shows are processed in batches; for each batch the candidate dates from the
+recurrence engine are compared against existing rows with an EXCEPT query
+(split into chunks that stay under the database's bind parameter limit), and
+only the missing ones are inserted in bulk with ON CONFLICT DO NOTHING,
+so concurrent sweeps (several workers, or a sweep racing show creation) are
+harmless.
+
+Run a sweep with ``flask materialize-instances`` or start the background
+thread with ``start_background_materializer``.
+"""
+
+import threading
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import Date, Integer, column, except_, insert, select, values
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app import db
+from calendar_data import mark_dates_changed
+from models import Show, ShowInstance
+
+DEFAULT_HORIZON_WEEKS = 13  # About the 90 days shows used to be created with
+DEFAULT_BATCH_SIZE = 200
+# Candidate rows per EXCEPT query. Each takes two bind parameters plus one
+# for its show id, keeping a statement well under SQLite's 32,766 limit
+# however many shows are in the batch or how far the horizon reaches.
+MAX_CANDIDATES_PER_QUERY = 5000
+
+
+def _upsert(table):
+    """INSERT that skips rows already present, for dialects that support it"""
+    dialect = db.engine.dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(table).on_conflict_do_nothing(
+            index_elements=["show_id", "instance_date"]
+        )
+    if dialect == "sqlite":
+        return sqlite.insert(table).on_conflict_do_nothing(
+            index_elements=["show_id", "instance_date"]
+        )
+    return insert(table)
+
+
+def _missing_from(candidates, start, end):
+    """Run the EXCEPT query for one chunk of (show_id, date) candidates"""
+    candidate_rows = (
+        values(
+            column("show_id", Integer),
+            column("instance_date", Date),
+            name="candidates",
+        )
+        .data(candidates)
+        .cte("candidates")
+    )
+    existing = select(ShowInstance.show_id, ShowInstance.instance_date).where(
+        ShowInstance.show_id.in_({show_id for show_id, _ in candidates}),
+        ShowInstance.instance_date >= start,
+        ShowInstance.instance_date <= end,
+    )
+    missing = except_(
+        select(candidate_rows.c.show_id, candidate_rows.c.instance_date), existing
+    )
+    return [(row[0], row[1]) for row in db.session.execute(missing)]
+
+
+def missing_instance_dates(shows, start, end):
+    """Return (show_id, date) pairs in range that have no ShowInstance yet"""
+    candidates = [
+        (show.id, instance_date)
+        for show in shows
+        for instance_date in show.get_instance_dates(start, end)
+    ]
+    missing = []
+    for offset in range(0, len(candidates), MAX_CANDIDATES_PER_QUERY):
+        chunk = candidates[offset : offset + MAX_CANDIDATES_PER_QUERY]
+        missing.extend(_missing_from(chunk, start, end))
+    return missing
+
+
+def materialize_shows(shows, start=None, end=None):
+    """Create any missing instances for ``shows`` and return how many"""
+    start = start or date.today()
+    end = end or start + timedelta(weeks=DEFAULT_HORIZON_WEEKS)
+
+    missing = missing_instance_dates(shows, start, end)
+    if missing:
+        db.session.execute(
+            _upsert(ShowInstance.__table__),
+            [
+                {"show_id": show_id, "instance_date": instance_date}
+                for show_id, instance_date in missing
+            ],
+        )
+        # Core inserts skip the flush hooks that invalidate cached months
+        mark_dates_changed(db.session(), {day for _, day in missing})
+    return len(missing)
+
+
+def materialize_show(show, start=None, end=None):
+    """Create a single show's missing instances (caller commits)"""
+    return materialize_shows([show], start, end)
+
+
+def sweep(weeks_ahead=DEFAULT_HORIZON_WEEKS, batch_size=DEFAULT_BATCH_SIZE):
+    """Materialize every active show ``weeks_ahead`` weeks out.
+
+    Returns a summary dict with the number of shows and instances processed
+    and how long the sweep took.
+    """
+    began = time.perf_counter()
+    start = date.today()
+    end = start + timedelta(weeks=weeks_ahead)
+    shows_seen = created = 0
+    last_id = 0
+
+    while True:
+        batch = (
+            Show.query.filter(
+                Show.id > last_id,
+                Show.is_deleted == False,
+                Show.ended_date.is_(None),
+            )
+            .order_by(Show.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not batch:
+            break
+
+        created += materialize_shows(batch, start, end)
+        db.session.commit()
+        shows_seen += len(batch)
+        last_id = batch[-1].id
+
+    return {
+        "shows": shows_seen,
+        "created": created,
+        "horizon": end.isoformat(),
+        "seconds": round(time.perf_counter() - began, 3),
+    }
+
+
+def start_background_materializer(app, interval_seconds, weeks_ahead=None):
+    """Run ``sweep`` every ``interval_seconds`` on a daemon thread"""
+    weeks_ahead = weeks_ahead or app.config.get(
+        "INSTANCE_HORIZON_WEEKS", DEFAULT_HORIZON_WEEKS
+    )
+
+    def run():
+        while True:
+            with app.app_context():
+                try:
+                    result = sweep(weeks_ahead)
+                    app.logger.info(
+                        f"Materialized {result['created']} instances for "
+                        f"{result['shows']} shows in {result['seconds']}s"
+                    )
+                except Exception as e:
+                    db.session.rollback()
+                    app.logger.error(f"Instance materialization failed: {str(e)}")
+                finally:
+                    db.session.remove()
+            time.sleep(interval_seconds)
+
+    thread = threading.Thread(target=run, name="instance-materializer", daemon=True)
+    thread.start()
+    return thread
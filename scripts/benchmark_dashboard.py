@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Dashboard benchmark: per-list ORM queries vs. the two-query aggregation
+
+Seeds a year of history so the busiest comedians have thousands of past
+signups, then builds the combined dashboard for the busiest show owner
+both ways and reports SQL statements and median wall time. The "ORM"
+variant is the previous route code plus the ``user.signups|length`` the
+template used to count signups.
+
+Usage: python scripts/benchmark_dashboard.py [--users 40] [--shows 150]
+       [--history-weeks 52] [--repeat 20]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def measure(label, build, session, engine, repeat):
+    from sqlalchemy import event
+
+    statements = []
+
+    def count(*args):
+        statements.append(args[2])
+
+    timings = []
+    for _ in range(repeat):
+        session.remove()
+        statements.clear()
+        event.listen(engine, "before_cursor_execute", count)
+        began = time.perf_counter()
+        build()
+        timings.append(time.perf_counter() - began)
+        event.remove(engine, "before_cursor_execute", count)
+    print(
+        f"{label:14} {len(statements):4} queries "
+        f"{statistics.median(timings) * 1000:9.2f} ms median"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=40)
+    parser.add_argument("--shows", type=int, default=150)
+    parser.add_argument("--history-weeks", type=int, default=52)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(
+        tempfile.gettempdir(), "benchmark_dashboard.db"
+    )
+    os.environ.setdefault("SESSION_SECRET", "benchmark")
+
+    import logging
+    from datetime import date
+
+    from sqlalchemy import func, select
+
+    from app import app, db
+    from dashboard import build_dashboard
+    from loader_profiles import profile
+    from models import Show, ShowInstance, Signup, User
+    from permissions import load_role_map
+    from seed_data import clear_database, seed_database
+
+    logging.disable(logging.INFO)
+
+    with app.app_context():
+        clear_database()
+        seed_database(
+            users=args.users,
+            shows=args.shows,
+            history_weeks=args.history_weeks,
+            weeks_ahead=4,
+            min_signups=8,
+            max_signups=12,
+        )
+        # The show owner with the most signups
+        user_id = db.session.scalar(
+            select(Signup.comedian_id)
+            .where(Signup.comedian_id.in_(select(Show.owner_id)))
+            .group_by(Signup.comedian_id)
+            .order_by(func.count(Signup.id).desc())
+            .limit(1)
+        )
+        signups = db.session.scalar(
+            select(func.count(Signup.id)).where(Signup.comedian_id == user_id)
+        )
+        print(f"User {user_id}: {signups} signups")
+
+        def orm_dashboard():
+            today = date.today()
+            owned = Show.query.filter_by(owner_id=user_id, is_deleted=False).all()
+            managed_ids = [
+                show_id
+                for show_id, role in load_role_map(user_id).items()
+                if role in ("runner", "host")
+            ]
+            managed = []
+            if managed_ids:
+                managed = Show.query.filter(
+                    Show.id.in_(managed_ids), Show.is_deleted == False  # noqa: E712
+                ).all()
+            show_ids = [s.id for s in owned + managed]
+            (
+                ShowInstance.query.options(*profile("instance_list"))
+                .filter(
+                    ShowInstance.show_id.in_(show_ids),
+                    ShowInstance.instance_date >= today,
+                    ShowInstance.is_cancelled == False,  # noqa: E712
+                )
+                .order_by(ShowInstance.instance_date)
+                .limit(10)
+                .all()
+            )
+            (
+                Signup.query.filter_by(comedian_id=user_id)
+                .join(ShowInstance)
+                .options(*profile("signup_cards"))
+                .filter(ShowInstance.instance_date >= today)
+                .order_by(ShowInstance.instance_date)
+                .limit(5)
+                .all()
+            )
+            return len(db.session.get(User, user_id).signups)
+
+        def aggregated():
+            return build_dashboard(user_id).signup_count
+
+        measure("ORM", orm_dashboard, db.session, db.engine, args.repeat)
+        measure("aggregated", aggregated, db.session, db.engine, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
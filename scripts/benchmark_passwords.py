@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Login throughput benchmark for the password hash settings
+
+For each hash method, verifies a stored password repeatedly for a few
+seconds, inline and through the bounded pool at each thread count, and
+reports logins per second in total and per CPU core in use. Use it to
+pick PASSWORD_HASH_METHOD and PASSWORD_HASH_THREADS for the worker size.
+
+Usage: python scripts/benchmark_passwords.py [--methods scrypt pbkdf2:sha256:600000]
+       [--threads 1 2 4] [--seconds 3]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DEFAULT_METHODS = [
+    "scrypt:32768:8:1",
+    "scrypt:16384:8:1",
+    "pbkdf2:sha256:1000000",
+    "pbkdf2:sha256:600000",
+]
+
+
+def run(hasher, stored, callers, seconds):
+    """Logins completed by ``callers`` request threads in ``seconds``"""
+    deadline = time.perf_counter() + seconds
+    counts = [0] * callers
+
+    def login(slot):
+        while time.perf_counter() < deadline:
+            hasher.verify(stored, "correct horse")
+            counts[slot] += 1
+
+    threads = [threading.Thread(target=login, args=(n,)) for n in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(counts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--methods", nargs="+", default=DEFAULT_METHODS)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    from passwords import PasswordHasher
+
+    cores = os.cpu_count() or 1
+    print(f"{cores} CPU cores available")
+    print(f"{'method':24} {'mode':10} {'logins/s':>10} {'per core':>10}")
+    for method in args.methods:
+        inline = PasswordHasher(method)
+        stored = inline.hash("correct horse")
+        # (label, hasher, request threads, cores hashing at once)
+        modes = [("inline", inline, 1, 1)] + [
+            # Twice as many callers as pool threads, like a login rush
+            (f"pool {n}", PasswordHasher(method, threads=n, queue=n), 2 * n, n)
+            for n in args.threads
+        ]
+        for label, hasher, callers, hashing in modes:
+            rate = run(hasher, stored, callers, args.seconds) / args.seconds
+            per_core = rate / min(hashing, cores)
+            print(f"{method:24} {label:10} {rate:10.1f} {per_core:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Memory/time benchmark: ORM entities vs. slotted read models
+
+Loads a month of calendar instances and a batch of lineups both ways and
+reports tracemalloc peak memory and wall time for each.
+
+Usage: python scripts/benchmark_read_models.py [--users 10000] [--shows 1000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def measure(label, load, session):
+    session.remove()
+    tracemalloc.start()
+    began = time.perf_counter()
+    rows = load()
+    elapsed = time.perf_counter() - began
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(
+        f"{label:28} {len(rows):8} rows {elapsed * 1000:9.1f} ms {peak / 1024:10.1f} KB"
+    )
+    del rows
+    session.remove()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--shows", type=int, default=1_000)
+    parser.add_argument("--lineups", type=int, default=500)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(
+        tempfile.gettempdir(), "benchmark_read_models.db"
+    )
+    os.environ.setdefault("SESSION_SECRET", "benchmark")
+
+    import logging
+
+    from sqlalchemy.orm import contains_eager, joinedload
+
+    from app import app, db
+    from models import Show, ShowInstance, Signup
+    from read_models import instance_cards, lineup_rows
+    from seed_data import clear_database, seed_database
+
+    logging.disable(logging.INFO)
+
+    with app.app_context():
+        clear_database()
+        seed_database(
+            users=args.users,
+            shows=args.shows,
+            history_weeks=1,
+            weeks_ahead=5,
+            min_signups=5,
+            max_signups=15,
+        )
+        start = date.today()
+        end = start + timedelta(days=31)
+        lineup_ids = [
+            row[0]
+            for row in db.session.query(ShowInstance.id)
+            .filter(ShowInstance.instance_date >= start)
+            .limit(args.lineups)
+        ]
+
+        def orm_month():
+            instances = (
+                ShowInstance.query.join(Show)
+                .options(contains_eager(ShowInstance.show))
+                .filter(
+                    Show.is_deleted == False,
+                    ShowInstance.instance_date >= start,
+                    ShowInstance.instance_date < end,
+                    ShowInstance.is_cancelled == False,
+                )
+                .order_by(ShowInstance.instance_date)
+                .all()
+            )
+            # What the template reads from each row
+            return [
+                (i.show.name, i.show.venue, i.start_time, i.max_signups)
+                for i in instances
+            ]
+
+        def dto_month():
+            return [
+                (c.show.name, c.show.venue, c.start_time, c.max_signups)
+                for c in instance_cards(start, end)
+            ]
+
+        def orm_lineups():
+            names = []
+            for instance_id in lineup_ids:
+                signups = (
+                    Signup.query.options(joinedload(Signup.comedian))
+                    .filter_by(show_instance_id=instance_id)
+                    .order_by(Signup.position.asc().nullslast(), Signup.signup_time)
+                    .all()
+                )
+                names.extend(s.comedian.full_name for s in signups)
+            return names
+
+        def dto_lineups():
+            names = []
+            for instance_id in lineup_ids:
+                names.extend(r.comedian.full_name for r in lineup_rows(instance_id))
+            return names
+
+        print(f"{'load':28} {'':>8}      {'time':>12} {'peak':>13}")
+        measure("calendar month (ORM)", orm_month, db.session)
+        measure("calendar month (read model)", dto_month, db.session)
+        measure(f"{len(lineup_ids)} lineups (ORM)", orm_lineups, db.session)
+        measure(f"{len(lineup_ids)} lineups (read model)", dto_lineups, db.session)
+
+
+if __name__ == "__main__":
+    main()
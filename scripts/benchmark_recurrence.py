@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: recurrence expansion vs. the original day-by-day loop
+
+Usage: python scripts/benchmark_recurrence.py [--shows 2000] [--years 3]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recurrence import WEEKDAYS, show_occurrences  # noqa: E402
+
+CADENCES = ["weekly", "bi-weekly", "monthly", "custom"]
+
+
+def legacy_next_instance_date(show, from_date):
+    """The original Show.get_next_instance_date loop"""
+    days_ahead = 0
+    while True:
+        check_date = from_date + timedelta(days=days_ahead)
+        if check_date.strftime("%A") == show.day_of_week:
+            if show.repeat_cadence == "weekly":
+                return check_date
+            elif show.repeat_cadence == "bi-weekly":
+                weeks_since_start = (check_date - show.started_date).days // 7
+                if weeks_since_start % 2 == 0:
+                    return check_date
+            elif show.repeat_cadence == "monthly":
+                start_week = (show.started_date.day - 1) // 7
+                current_week = (check_date.day - 1) // 7
+                if start_week == current_week:
+                    return check_date
+            elif show.repeat_cadence == "custom" and show.custom_repeat_days:
+                days_since_start = (check_date - show.started_date).days
+                if days_since_start % show.custom_repeat_days == 0:
+                    return check_date
+
+        days_ahead += 1
+        if days_ahead > 365:
+            return None
+
+
+def legacy_expand(show, start, end):
+    """Expand a range the way create_event used to"""
+    occurrences = []
+    current = legacy_next_instance_date(show, start)
+    while current and current <= end:
+        occurrences.append(current)
+        current = legacy_next_instance_date(show, current + timedelta(days=1))
+    return occurrences
+
+
+def generate_shows(count, seed=42):
+    """Generate synthetic shows spread across every cadence"""
+    rng = random.Random(seed)
+    shows = []
+    for i in range(count):
+        cadence = CADENCES[i % len(CADENCES)]
+        shows.append(
+            SimpleNamespace(
+                day_of_week=rng.choice(list(WEEKDAYS)),
+                repeat_cadence=cadence,
+                started_date=date(2024, 1, 1) + timedelta(days=rng.randrange(365)),
+                custom_repeat_days=(
+                    rng.choice([7, 10, 14, 21, 28]) if cadence == "custom" else None
+                ),
+            )
+        )
+    return shows
+
+
+def time_expansion(expand, shows, start, end):
+    """Return (seconds, occurrence count) for expanding every show"""
+    began = time.perf_counter()
+    total = 0
+    for show in shows:
+        total += len(expand(show, start, end))
+    return time.perf_counter() - began, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--shows", type=int, default=2000)
+    parser.add_argument("--years", type=int, default=3)
+    args = parser.parse_args()
+
+    shows = generate_shows(args.shows)
+    start = date(2025, 1, 1)
+    end = start + timedelta(days=365 * args.years)
+
+    print(f"Expanding {len(shows)} shows over {args.years} year(s)...")
+    legacy_seconds, legacy_total = time_expansion(legacy_expand, shows, start, end)
+    new_seconds, new_total = time_expansion(
+        lambda show, s, e: list(show_occurrences(show, s, e)), shows, start, end
+    )
+
+    if legacy_total != new_total:
+        print(f"✗ Occurrence counts differ: {legacy_total} vs {new_total}")
+        sys.exit(1)
+
+    print(f"Occurrences generated: {new_total}")
+    print(f"Day-by-day loop:       {legacy_seconds * 1000:10.1f} ms")
+    print(f"Recurrence expansion:  {new_seconds * 1000:10.1f} ms")
+    print(f"Speedup:               {legacy_seconds / new_seconds:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,491 @@
+#!/usr/bin/env python3
+"""
+Route benchmark: p50/p95 latency, SQL statement count and peak memory per route
+
+Seeds a dataset with seed_data.py, then drives every route in routes.py
+through the Flask test client and writes the results to a JSON baseline.
+
+Usage:
+    python scripts/benchmark_routes.py --scale small --output baseline.json
+    python scripts/benchmark_routes.py --scale full --compare baseline.json
+
+``--scale full`` is 10k users, 1k shows, ~100k instances and ~1M signups.
+Pass ``--database`` to benchmark against PostgreSQL; the default is a
+throwaway SQLite file. ``--reuse`` skips seeding an already seeded database.
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SCALES = {
+    "tiny": dict(users=60, shows=8, history_weeks=2, weeks_ahead=6),
+    "small": dict(users=1_000, shows=100, history_weeks=20, weeks_ahead=13),
+    "full": dict(
+        users=10_000,
+        shows=1_000,
+        history_weeks=87,
+        weeks_ahead=13,
+        min_signups=5,
+        max_signups=15,
+    ),
+}
+
+PASSWORD = "password123"  # What seed_data.py gives every user
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(samples)
+    rank = max(1, round(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def prepare_fixtures(db):
+    """Pick the show, instances and users each route is exercised with"""
+    from sqlalchemy import select
+
+    from models import Show, ShowInstance, Signup, User
+
+    today = date.today()
+    show = Show.query.filter_by(is_deleted=False).order_by(Show.id).first()
+    upcoming = (
+        ShowInstance.query.filter(
+            ShowInstance.show_id == show.id,
+            ShowInstance.instance_date >= today + timedelta(days=2),
+            ShowInstance.is_cancelled == False,
+        )
+        .order_by(ShowInstance.instance_date)
+        .limit(2)
+        .all()
+    )
+    instance, spare = upcoming[0], upcoming[-1]
+
+    comedian_id = db.session.scalar(
+        select(Signup.comedian_id)
+        .where(Signup.show_instance_id == instance.id)
+        .where(Signup.comedian_id != show.owner_id)
+        .limit(1)
+    )
+
+    # A fresh user with no signups to drive signup/cancel, and room to sign up
+    suffix = datetime.utcnow().strftime("%Y%m%d%H%M%S%f")
+    newcomer = User(
+        username=f"bench{suffix}",
+        email=f"bench{suffix}@example.com",
+        first_name="Bench",
+        last_name="Mark",
+    )
+    newcomer.set_password(PASSWORD)
+    db.session.add(newcomer)
+    if instance.max_signups_override is None:
+        instance.max_signups_override = show.max_signups
+    instance.max_signups_override += 1
+    db.session.commit()
+
+    owner = db.session.get(User, show.owner_id)
+    return {
+        "show_id": show.id,
+        "instance_id": instance.id,
+        "spare_instance_id": spare.id,
+        "owner_id": owner.id,
+        "comedian_id": comedian_id,
+        "newcomer_id": newcomer.id,
+        "newcomer_username": newcomer.username,
+    }
+
+
+def build_cases(fx):
+    """Every route, as (name, client, method, url, kwargs) in run order.
+
+    ``url`` and ``kwargs`` may be callables of the iteration number for
+    requests that need fresh data each round. Cases run round-robin so that
+    paired mutations (signup then cancel) stay balanced.
+    """
+    from models import Signup
+
+    instance_id = fx["instance_id"]
+    show_id = fx["show_id"]
+    spare_id = fx["spare_instance_id"]
+
+    def newcomer_signup_url(_):
+        signup = Signup.query.filter_by(
+            comedian_id=fx["newcomer_id"], show_instance_id=instance_id
+        ).first()
+        return f"/cancel_signup/{signup.id if signup else 0}"
+
+    def registration(i):
+        name = f"reg{fx['newcomer_id']}x{i}"
+        return {
+            "data": {
+                "username": name,
+                "email": f"{name}@example.com",
+                "first_name": "Reg",
+                "last_name": "Istered",
+                "password": PASSWORD,
+                "password2": PASSWORD,
+            }
+        }
+
+    def new_show(i):
+        return {
+            "json": {
+                "name": f"Benchmark Show {i}",
+                "venue": "Benchmark Hall",
+                "address": "1 Benchmark Way",
+                "day_of_week": "Sunday",
+                "start_time": "20:00",
+                "max_signups": 20,
+                "signup_deadline_hours": 2,
+            }
+        }
+
+    def lineup_order(_):
+        ids = [
+            s.id
+            for s in Signup.query.filter_by(show_instance_id=instance_id).order_by(
+                Signup.id
+            )
+        ]
+        return {"json": {"signup_ids": ids}}
+
+    return [
+        ("index", "anon", "GET", "/", {}),
+        ("register", "anon", "GET", "/register", {}),
+        ("register [POST]", "anon", "POST", "/register", registration),
+        ("login", "anon", "GET", "/login", {}),
+        (
+            "login [POST]",
+            "anon",
+            "POST",
+            "/login",
+            {"data": {"username": fx["newcomer_username"], "password": PASSWORD}},
+        ),
+        ("logout", "anon", "GET", "/logout", {}),
+        ("dashboard", "owner", "GET", "/dashboard", {}),
+        ("comedian_dashboard", "comedian", "GET", "/comedian/dashboard", {}),
+        ("host_dashboard", "owner", "GET", "/host/dashboard", {}),
+        (
+            "upcoming_lineups",
+            "owner",
+            "GET",
+            f"/host/upcoming_lineups/{show_id}",
+            {},
+        ),
+        ("get_show_data", "owner", "GET", f"/api/show/{show_id}", {}),
+        (
+            "export_show_signups",
+            "owner",
+            "GET",
+            f"/api/show/{show_id}/signups/export",
+            {},
+        ),
+        (
+            "update_show_api",
+            "owner",
+            "PUT",
+            f"/api/show/{show_id}",
+            {"json": {"description": "Updated by the benchmark"}},
+        ),
+        ("create_event", "owner", "GET", "/host/create-event", {}),
+        ("show_settings", "owner", "GET", f"/host/show/{show_id}/settings", {}),
+        (
+            "manage_instance_host",
+            "owner",
+            "GET",
+            f"/host/instance/{instance_id}/host",
+            {},
+        ),
+        (
+            "cancel_show_instance",
+            "owner",
+            "POST",
+            f"/cancel_show_instance/{spare_id}",
+            {"data": {"reason": "Benchmark"}},
+        ),
+        (
+            "restore_show_instance",
+            "owner",
+            "POST",
+            f"/restore_show_instance/{spare_id}",
+            {},
+        ),
+        ("calendar_view", "comedian", "GET", "/calendar", {}),
+        ("calendar_events_api", "comedian", "GET", "/api/calendar/events", {}),
+        ("event_info", "comedian", "GET", f"/event/{instance_id}", {}),
+        ("live_lineup", "anon", "GET", f"/live/{instance_id}", {}),
+        ("live_lineup_stream", "anon", "STREAM", f"/live/{instance_id}/stream", {}),
+        ("signup_for_event", "newcomer", "GET", f"/signup/{instance_id}", {}),
+        (
+            "api_signup_for_event",
+            "newcomer",
+            "POST",
+            f"/api/signup/{instance_id}",
+            {"json": {"notes": "Benchmark set"}},
+        ),
+        ("cancel_signup", "newcomer", "POST", newcomer_signup_url, {}),
+        ("manage_lineup", "owner", "GET", f"/manage_lineup/{instance_id}", {}),
+        (
+            "reorder_lineup",
+            "owner",
+            "POST",
+            f"/host/reorder_lineup/{instance_id}",
+            lineup_order,
+        ),
+        ("notify_lineup", "owner", "POST", f"/host/notify_lineup/{instance_id}", {}),
+        (
+            "search_users_api",
+            "owner",
+            "GET",
+            "/api/users/search",
+            {"query_string": {"q": "bench"}},
+        ),
+        ("create_show_api", "owner", "POST", "/api/show", new_show),
+    ]
+
+
+def make_clients(app, fx):
+    clients = {"anon": app.test_client()}
+    for role in ("owner", "comedian", "newcomer"):
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session["_user_id"] = str(fx[f"{role}_id"])
+            session["_fresh"] = True
+        clients[role] = client
+    return clients
+
+
+def perform(client, method, url, kwargs):
+    """Issue one request and return its status code"""
+    if method == "STREAM":
+        # The feed never ends; time the retry hint plus the lineup snapshot
+        response = client.get(url, buffered=False)
+        frames = iter(response.response)
+        next(frames), next(frames)
+        response.close()
+        return response.status_code
+    return client.open(url, method=method, **kwargs).status_code
+
+
+def run_benchmarks(app, db, fx, iterations=20, warmup=1):
+    """Run every case ``warmup + iterations`` rounds, then one traced round.
+
+    Must be called outside an app context: requests reuse an already pushed
+    context, which would leak ``g`` (the logged-in user, cached roles)
+    between clients.
+    """
+    from sqlalchemy import event
+
+    with app.app_context():
+        cases = build_cases(fx)
+        engine = db.engine
+    clients = make_clients(app, fx)
+    timings = {name: [] for name, *_ in cases}
+    queries = {name: [] for name, *_ in cases}
+    statuses = {}
+    statement_count = [0]
+
+    def count(*args):
+        statement_count[0] += 1
+
+    def resolve(value, i):
+        return value(i) if callable(value) else value
+
+    def run_round(i, record=True, trace=False):
+        peaks = {}
+        for name, role, method, url, kwargs in cases:
+            with app.app_context():
+                url, kwargs = resolve(url, i), resolve(kwargs, i)
+            statement_count[0] = 0
+            if trace:
+                tracemalloc.reset_peak()
+            began = time.perf_counter()
+            statuses[name] = perform(clients[role], method, url, kwargs)
+            elapsed = time.perf_counter() - began
+            if trace:
+                peaks[name] = tracemalloc.get_traced_memory()[1]
+            elif record:
+                timings[name].append(elapsed * 1000)
+                queries[name].append(statement_count[0])
+        return peaks
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        for i in range(warmup):
+            run_round(i, record=False)
+        for i in range(warmup, warmup + iterations):
+            run_round(i)
+        tracemalloc.start()
+        try:
+            peaks = run_round(warmup + iterations, trace=True)
+        finally:
+            tracemalloc.stop()
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    return {
+        name: {
+            "status": statuses[name],
+            "p50_ms": round(percentile(timings[name], 50), 3),
+            "p95_ms": round(percentile(timings[name], 95), 3),
+            "mean_ms": round(sum(timings[name]) / len(timings[name]), 3),
+            "queries": max(queries[name]),
+            "peak_kb": round(peaks[name] / 1024, 1),
+        }
+        for name in timings
+    }
+
+
+def uncovered_endpoints(app, fx):
+    """Endpoints in the URL map that no benchmark case exercises"""
+    adapter = app.url_map.bind("localhost")
+    covered = set()
+    for _, _, method, url, _ in build_cases(fx):
+        path = url(0) if callable(url) else url
+        method = "GET" if method == "STREAM" else method
+        covered.add(adapter.match(path, method=method)[0])
+    # Static files and debug-only pages are not part of the app's surface
+    return sorted(
+        rule.endpoint
+        for rule in app.url_map.iter_rules()
+        if rule.endpoint != "static"
+        and not rule.endpoint.startswith("debug_")
+        and rule.endpoint not in covered
+    )
+
+
+def compare(results, baseline, max_regression):
+    """Print deltas against a baseline and return the routes over budget"""
+    regressions = []
+    print(f"{'route':28} {'p95 ms':>10} {'base':>10} {'delta':>8} {'queries':>9}")
+    for name, row in results["routes"].items():
+        base = baseline["routes"].get(name)
+        if not base:
+            print(f"{name:28} {row['p95_ms']:10.2f} {'-':>10} {'new':>8}")
+            continue
+        delta = (row["p95_ms"] - base["p95_ms"]) / max(base["p95_ms"], 0.001) * 100
+        print(
+            f"{name:28} {row['p95_ms']:10.2f} {base['p95_ms']:10.2f} "
+            f"{delta:+7.1f}% {row['queries']:4} ({base['queries']})"
+        )
+        if max_regression is not None and (
+            delta > max_regression or row["queries"] > base["queries"]
+        ):
+            regressions.append(name)
+    return regressions
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument("--database", help="Database URL (default: temp SQLite)")
+    parser.add_argument("--reuse", action="store_true", help="Skip seeding")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON file to compare against")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        help="Exit non-zero if any p95 grows by more than this percent "
+        "or any route issues more queries than the baseline",
+    )
+    parser.add_argument("--random-seed", type=int, default=42)
+    args = parser.parse_args()
+
+    # The engine is bound when app is imported, so configure it first
+    database = args.database or "sqlite:///" + os.path.join(
+        tempfile.gettempdir(), f"benchmark_{args.scale}.db"
+    )
+    os.environ["DATABASE_URL"] = database
+    os.environ.setdefault("SESSION_SECRET", "benchmark")
+
+    import logging
+
+    from app import app, db
+    from models import Show, ShowInstance, Signup, User
+    from seed_data import clear_database, seed_database
+
+    logging.disable(logging.INFO)
+    app.config["WTF_CSRF_ENABLED"] = False
+    random.seed(args.random_seed)
+
+    with app.app_context():
+        if not args.reuse:
+            clear_database()
+            seed_database(**SCALES[args.scale])
+        fx = prepare_fixtures(db)
+        missing = uncovered_endpoints(app, fx)
+        if missing:
+            print(f"Warning: no benchmark case for {', '.join(missing)}")
+
+        dataset = {
+            "users": User.query.count(),
+            "shows": Show.query.count(),
+            "instances": ShowInstance.query.count(),
+            "signups": Signup.query.count(),
+        }
+        print(f"Dataset: {dataset}")
+
+    routes = run_benchmarks(app, db, fx, iterations=args.iterations)
+
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+            "scale": args.scale,
+            "dialect": database.split(":", 1)[0],
+            "iterations": args.iterations,
+            "python": sys.version.split()[0],
+            "dataset": dataset,
+        },
+        "routes": routes,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"Wrote {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.max_regression)
+        if regressions:
+            print(f"Regressed: {', '.join(regressions)}")
+            sys.exit(1)
+    else:
+        print(
+            f"{'route':28} {'status':>6} {'p50 ms':>9} {'p95 ms':>9} "
+            f"{'queries':>8} {'peak KB':>9}"
+        )
+        for name, row in routes.items():
+            print(
+                f"{name:28} {row['status']:6} {row['p50_ms']:9.2f} "
+                f"{row['p95_ms']:9.2f} {row['queries']:8} {row['peak_kb']:9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
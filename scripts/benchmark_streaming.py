@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark: jsonify vs. streamed JSON for a large export
+
+Encodes the same signup export both ways for increasing row counts and
+reports tracemalloc peak memory and wall time. The streamed peak should stay
+flat as rows grow; the jsonify peak grows with them.
+
+Usage: python scripts/benchmark_streaming.py [--rows 10000 100000 500000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def measure(label, encode, session):
+    session.remove()
+    tracemalloc.start()
+    began = time.perf_counter()
+    size = encode()
+    elapsed = time.perf_counter() - began
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(
+        f"{label:28} {size / 1024:10.0f} KB {elapsed * 1000:9.1f} ms "
+        f"{peak / 1024:10.1f} KB peak"
+    )
+    session.remove()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[10_000, 100_000, 500_000]
+    )
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(
+        tempfile.gettempdir(), "benchmark_streaming.db"
+    )
+    os.environ.setdefault("SESSION_SECRET", "benchmark")
+
+    import logging
+
+    from flask import jsonify
+    from sqlalchemy import select
+
+    from app import app, db
+    from models import ShowInstance, Signup, User
+    from seed_data import clear_database, seed_database
+    from streaming import iter_json_array, iter_rows
+
+    logging.disable(logging.INFO)
+
+    with app.app_context():
+        clear_database()
+        seed_database(
+            users=5_000,
+            shows=max(args.rows) // 200 + 1,
+            history_weeks=10,
+            weeks_ahead=10,
+            min_signups=10,
+            max_signups=10,
+        )
+
+    def export(limit):
+        return (
+            select(
+                Signup.id,
+                Signup.show_instance_id,
+                ShowInstance.instance_date,
+                Signup.comedian_id,
+                User.first_name,
+                User.last_name,
+                Signup.position,
+                Signup.performed,
+                Signup.signup_time,
+                Signup.notes,
+            )
+            .join(ShowInstance, Signup.show_instance_id == ShowInstance.id)
+            .outerjoin(User, Signup.comedian_id == User.id)
+            .order_by(Signup.id)
+            .limit(limit)
+        )
+
+    with app.test_request_context():
+        for rows in args.rows:
+
+            def listed():
+                data = [row._asdict() for row in db.session.execute(export(rows))]
+                return len(jsonify(data).get_data())
+
+            def streamed():
+                chunks = iter_json_array(
+                    iter_rows(export(rows)), lambda row: row._asdict()
+                )
+                return sum(len(chunk) for chunk in chunks)
+
+            measure(f"{rows} rows (jsonify)", listed, db.session)
+            measure(f"{rows} rows (streamed)", streamed, db.session)
+
+
+if __name__ == "__main__":
+    main()
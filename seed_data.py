@@ -1,12 +1,28 @@
 #!/usr/bin/env python3
 """
 Seed script to populate the database with dummy data for testing
+
+The defaults give a small, realistic Boston dataset. Pass larger numbers to
+build load-testing datasets, e.g.
+
+    python seed_data.py --users 10000 --shows 1000 --history-weeks 87 \
+        --min-signups 5 --max-signups 15
+
+Users, instances and signups go through the bulk writers in ``bulk.py``
+(COPY on PostgreSQL), so millions of signups take seconds, not hours.
 """
+
+import argparse
 import random
-from datetime import datetime, time, timedelta
+import time as timer
+from datetime import date, time, timedelta
+
+from sqlalchemy import func, select
 
+import bulk
 from app import app, db
-from models import Event, Signup, User
+from models import Show, ShowInstance, Signup, User
+from passwords import hash_password
 
 # Realistic comedian names and Boston venues
 COMEDIAN_NAMES = [
@@ -124,158 +140,184 @@ BOSTON_VENUES = [
 ]
 
 
-def create_users():
-    """Create 36 realistic users"""
-    users = []
-
-    for i, (first_name, last_name) in enumerate(COMEDIAN_NAMES):
-        # Create email from name
-        email = f"{first_name.lower()}.{last_name.lower()}@email.com"
-        username = f"{first_name.lower()}{last_name.lower()}"
-
-        user = User(
-            username=username,
-            email=email,
-            first_name=first_name,
-            last_name=last_name,
-            is_comedian=True,
-            is_host=False,
-            email_verified=True,
-        )
-        user.set_password("password123")  # Simple password for testing
-        users.append(user)
-
-    return users
-
-
-def create_events(users):
-    """Create events for some users (max 8)"""
-    # Select 8 random users to be hosts
-    host_users = random.sample(users, 8)
-    events = []
-
-    for i, venue_data in enumerate(BOSTON_VENUES):
-        if i >= len(host_users):
-            break
-
-        host = host_users[i]
-        host.is_host = True  # Make them a host
-
-        event = Event(
-            name=venue_data["name"],
-            venue=venue_data["venue"],
-            address=venue_data["address"],
-            day_of_week=venue_data["day"],
-            start_time=venue_data["start_time"],
-            end_time=venue_data["end_time"],
-            description=venue_data["description"],
-            max_signups=random.randint(15, 25),
-            signup_deadline_hours=random.randint(1, 4),
-            host_id=host.id,
-            is_active=True,
-        )
-        events.append(event)
-
-    return events
-
-
-def create_signups(users, events):
-    """Create some random signups for events"""
-    signups = []
+SIGNUP_NOTES = [
+    None,
+    "Working on new material",
+    "First time here!",
+    "Trying out crowd work",
+    "New 5-minute set",
+]
 
-    # Get current date and next few weeks
-    today = datetime.now().date()
 
-    for event in events:
-        # Find next occurrence of this day of week
-        days_ahead = {
-            "Monday": 0,
-            "Tuesday": 1,
-            "Wednesday": 2,
-            "Thursday": 3,
-            "Friday": 4,
-            "Saturday": 5,
-            "Sunday": 6,
+def user_rows(count, offset=0):
+    """Yield ``count`` user rows, numbering repeated names to keep them unique"""
+    password_hash = hash_password("password123")  # Hash once, reuse
+    for i in range(offset, offset + count):
+        first_name, last_name = COMEDIAN_NAMES[i % len(COMEDIAN_NAMES)]
+        suffix = str(i // len(COMEDIAN_NAMES)) if i >= len(COMEDIAN_NAMES) else ""
+        handle = f"{first_name.lower()}{last_name.lower()}{suffix}"
+        yield {
+            "username": handle,
+            "email": f"{first_name.lower()}.{last_name.lower()}{suffix}@email.com",
+            "password_hash": password_hash,
+            "first_name": first_name,
+            "last_name": last_name,
+            "email_verified": True,
         }
 
-        target_weekday = days_ahead[event.day_of_week]
-        days_until_target = (target_weekday - today.weekday()) % 7
-        if days_until_target == 0:  # If it's today, move to next week
-            days_until_target = 7
-
-        event_date = today + timedelta(days=days_until_target)
-
-        # Create signups for 3-8 random comedians for each event
-        num_signups = random.randint(3, min(8, event.max_signups))
-        selected_comedians = random.sample(
-            [u for u in users if not u.is_host], num_signups
-        )
 
-        for position, comedian in enumerate(selected_comedians, 1):
-            signup = Signup(
-                comedian_id=comedian.id,
-                event_id=event.id,
-                event_date=event_date,
-                position=position,
-                performed=False,
-                notes=random.choice(
-                    [
-                        None,
-                        "Working on new material",
-                        "First time here!",
-                        "Trying out crowd work",
-                        "New 5-minute set",
-                    ]
-                ),
+def create_shows(count, owner_ids, started_date):
+    """Create ``count`` shows cycling through the Boston venues"""
+    shows = []
+    for i in range(count):
+        venue_data = BOSTON_VENUES[i % len(BOSTON_VENUES)]
+        suffix = f" #{i // len(BOSTON_VENUES) + 1}" if i >= len(BOSTON_VENUES) else ""
+        shows.append(
+            Show(
+                name=venue_data["name"] + suffix,
+                venue=venue_data["venue"],
+                address=venue_data["address"],
+                day_of_week=venue_data["day"],
+                start_time=venue_data["start_time"],
+                end_time=venue_data["end_time"],
+                description=venue_data["description"],
+                started_date=started_date,
+                max_signups=random.randint(15, 25),
+                signup_window_before_days=random.randint(1, 7),
+                owner_id=random.choice(owner_ids),
             )
-            signups.append(signup)
-
-    return signups
-
-
-def seed_database():
-    """Main function to seed the database"""
+        )
+    db.session.add_all(shows)
+    db.session.flush()
+    return shows
+
+
+def instance_rows(shows, start, end):
+    for show in shows:
+        for instance_date in show.get_instance_dates(start, end):
+            yield {"show_id": show.id, "instance_date": instance_date}
+
+
+def signup_rows(instances, comedian_ids, min_signups, max_signups):
+    """Yield signups for each (instance_id, date, capacity) with a full lineup"""
+    today = date.today()
+    for instance_id, instance_date, capacity in instances:
+        upper = min(max_signups, capacity, len(comedian_ids))
+        count = random.randint(min(min_signups, upper), upper)
+        for position, comedian_id in enumerate(random.sample(comedian_ids, count), 1):
+            yield {
+                "comedian_id": comedian_id,
+                "show_instance_id": instance_id,
+                "position": position,
+                "performed": instance_date < today,
+                "notes": random.choice(SIGNUP_NOTES),
+            }
+
+
+def clear_database():
+    """Delete every row, children first"""
+    for table in reversed(db.metadata.sorted_tables):
+        db.session.execute(table.delete())
+    db.session.commit()
+
+
+def seed_database(
+    users=len(COMEDIAN_NAMES),
+    shows=len(BOSTON_VENUES),
+    history_weeks=4,
+    weeks_ahead=13,
+    min_signups=3,
+    max_signups=8,
+    use_copy=None,
+):
+    """Generate a dataset with the bulk writers and return row counts"""
+    today = date.today()
+    start = today - timedelta(weeks=history_weeks)
+    end = today + timedelta(weeks=weeks_ahead)
+    began = timer.perf_counter()
+
+    def log(message):
+        print(f"[{timer.perf_counter() - began:7.2f}s] {message}")
+
+    offset = db.session.scalar(select(func.count(User.id)))
+    first_id = db.session.scalar(select(func.max(User.id))) or 0
+    created_users = bulk.bulk_insert_users(user_rows(users, offset), use_copy=use_copy)
+    user_ids = list(db.session.scalars(select(User.id).where(User.id > first_id)))
+    log(f"Created {created_users} users")
+
+    owner_ids = random.sample(user_ids, max(1, min(len(user_ids), shows // 4 or 1)))
+    created_shows = create_shows(shows, owner_ids, start)
+    log(f"Created {len(created_shows)} shows")
+
+    created_instances = bulk.bulk_insert_instances(
+        instance_rows(created_shows, start, end), use_copy=use_copy
+    )
+    log(f"Created {created_instances} show instances")
+
+    capacities = {show.id: show.max_signups for show in created_shows}
+    instances = [
+        (instance_id, instance_date, capacities[show_id])
+        for instance_id, show_id, instance_date in db.session.execute(
+            select(
+                ShowInstance.id, ShowInstance.show_id, ShowInstance.instance_date
+            ).where(ShowInstance.show_id.in_(capacities))
+        )
+    ]
+    created_signups = bulk.bulk_insert_signups(
+        signup_rows(instances, user_ids, min_signups, max_signups), use_copy=use_copy
+    )
+    log(f"Created {created_signups} signups")
+
+    bulk.refresh_signup_counts()
+    db.session.commit()
+    log("Database seeded successfully!")
+
+    return {
+        "users": created_users,
+        "shows": len(created_shows),
+        "instances": created_instances,
+        "signups": created_signups,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=len(COMEDIAN_NAMES))
+    parser.add_argument("--shows", type=int, default=len(BOSTON_VENUES))
+    parser.add_argument("--history-weeks", type=int, default=4)
+    parser.add_argument("--weeks-ahead", type=int, default=13)
+    parser.add_argument("--min-signups", type=int, default=3)
+    parser.add_argument("--max-signups", type=int, default=8)
+    parser.add_argument("--random-seed", type=int, default=None)
+    parser.add_argument(
+        "--keep", action="store_true", help="Add to existing data instead of clearing"
+    )
+    parser.add_argument(
+        "--no-copy", action="store_true", help="Use INSERT even on PostgreSQL"
+    )
+    args = parser.parse_args()
+
+    random.seed(args.random_seed)
     with app.app_context():
-        print("Creating users...")
-        users = create_users()
-
-        # Add users to session first so they get IDs
-        for user in users:
-            db.session.add(user)
-        db.session.commit()
-        print(f"Created {len(users)} users")
-
-        print("Creating events...")
-        events = create_events(users)
-
-        # Add events to session
-        for event in events:
-            db.session.add(event)
-        db.session.commit()
-        print(f"Created {len(events)} events")
-
-        print("Creating signups...")
-        signups = create_signups(users, events)
-
-        # Add signups to session
-        for signup in signups:
-            db.session.add(signup)
-        db.session.commit()
-        print(f"Created {len(signups)} signups")
-
-        print("Database seeded successfully!")
+        db.create_all()
+        if not args.keep:
+            print("Clearing existing data...")
+            clear_database()
+
+        seed_database(
+            users=args.users,
+            shows=args.shows,
+            history_weeks=args.history_weeks,
+            weeks_ahead=args.weeks_ahead,
+            min_signups=args.min_signups,
+            max_signups=args.max_signups,
+            use_copy=False if args.no_copy else None,
+        )
         print(f"Total users: {User.query.count()}")
-        print(f"Total events: {Event.query.count()}")
+        print(f"Total shows: {Show.query.count()}")
+        print(f"Total show instances: {ShowInstance.query.count()}")
         print(f"Total signups: {Signup.query.count()}")
 
 
 if __name__ == "__main__":
-    # Clear existing data (optional - comment out to keep existing data)
-    with app.app_context():
-        print("Clearing existing data...")
-        Signup.query.delete()
-        Event.query.delete()
-        User.query.delete()
-        db.session.commit()
-
-    seed_database()
+    main()
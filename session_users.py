@@ -0,0 +1,181 @@
+"""
+Cached users for Flask-Login.
+
+``load_user`` runs on every authenticated request. Instead of loading the
+User row and then lazy loading its runner/host roles, it reads a compact
+record (profile columns plus the show role map from permissions.py) from
+the ``session_users`` cache and returns a SessionUser built from it, so a
+cache hit costs no queries at all. The role map also seeds the per-request
+permission cache on safe (GET/HEAD/OPTIONS) requests, so
+``can_manage_lineup`` and friends don't query either.
+
+Entries expire after ``SESSION_USERS_CACHE_TTL`` seconds (60 by default)
+and are dropped as soon as a transaction that changes the user, their
+runner/host memberships or a show's owner commits. That invalidation only
+reaches the committing process's ``memory`` cache, so other workers may
+render a revoked role until the TTL runs out; requests that change data
+therefore never trust the cached roles and check permissions against a
+fresh ``get_role_map``. SessionUser is read-only; load the User model for
+anything that writes.
+"""
+
+import threading
+
+from flask import has_app_context, has_request_context, request
+from flask_login import UserMixin
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app import db
+from cache import get_cache
+from models import Show, ShowHost, ShowRunner, User
+from permissions import (
+    EDIT_ROLES,
+    LINEUP_ROLES,
+    get_show_role,
+    load_role_map,
+    prime_role_map,
+)
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+PROFILE_COLUMNS = (
+    "id",
+    "username",
+    "email",
+    "first_name",
+    "last_name",
+    "email_verified",
+    "created_at",
+)
+
+
+class SessionUser(UserMixin):
+    """The logged-in user's profile and show roles, detached from the session"""
+
+    __slots__ = PROFILE_COLUMNS + ("roles",)
+
+    def __init__(self, record):
+        for name in PROFILE_COLUMNS:
+            setattr(self, name, record[name])
+        self.roles = record["roles"]
+
+    @property
+    def full_name(self):
+        return f"{self.first_name} {self.last_name}"
+
+    def get_show_role(self, show):
+        return get_show_role(self, show)
+
+    def can_edit_show(self, show):
+        return self.get_show_role(show) in EDIT_ROLES
+
+    def can_manage_lineup(self, show):
+        return self.get_show_role(show) in LINEUP_ROLES
+
+    def __repr__(self):
+        return f"<SessionUser {self.id} {self.username}>"
+
+
+def _key(user_id):
+    return f"user:{user_id}"
+
+
+# Bumped on every invalidation, so a record read before a concurrent
+# commit invalidated it isn't stored afterwards
+_generation = 0
+_generation_lock = threading.Lock()
+
+
+def _trust_cached_roles():
+    return not has_request_context() or request.method in SAFE_METHODS
+
+
+def load_record(user_id):
+    """Profile columns and role map for ``user_id`` in two queries, or None"""
+    row = db.session.execute(
+        select(*(getattr(User, name) for name in PROFILE_COLUMNS)).where(
+            User.id == user_id
+        )
+    ).first()
+    if row is None:
+        return None
+    record = row._asdict()
+    record["roles"] = load_role_map(user_id)
+    return record
+
+
+def load_session_user(user_id):
+    """The SessionUser for ``user_id``, from the cache when possible"""
+    cache = get_cache("session_users")
+    record = cache.get(_key(user_id))
+    if record is None:
+        generation = _generation
+        record = load_record(user_id)
+        if record is None:
+            return None
+        with _generation_lock:
+            if generation == _generation:
+                cache.set(_key(user_id), record)
+    if _trust_cached_roles():
+        prime_role_map(user_id, record["roles"])
+    return SessionUser(record)
+
+
+def invalidate_session_users(user_ids=(), everyone=False):
+    """Drop cached records now"""
+    global _generation
+    with _generation_lock:
+        _generation += 1
+    cache = get_cache("session_users")
+    if everyone:
+        cache.clear()
+        return
+    for user_id in user_ids:
+        cache.delete(_key(user_id))
+
+
+def _pending(session):
+    return session.info.setdefault(
+        "session_user_changes", {"users": set(), "all": False}
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session, flush_context):
+    """Note users whose profile or show roles this flush changed"""
+    users = set()
+    everyone = False
+    for obj in session.new | session.deleted | session.dirty:
+        if isinstance(obj, (ShowRunner, ShowHost)):
+            users.add(obj.user_id)
+            users.update(db.inspect(obj).attrs.user_id.history.deleted or ())
+        elif isinstance(obj, User) and obj not in session.new:
+            users.add(obj.id)
+        elif isinstance(obj, Show):
+            history = db.inspect(obj).attrs.owner_id.history
+            if obj in session.new or obj in session.deleted:
+                users.add(obj.owner_id)
+            elif history.added:
+                users.update(history.added)
+                users.update(history.deleted or ())
+                # Ownership moved from an owner that was never loaded
+                everyone = everyone or not history.deleted
+
+    users.discard(None)
+    if users or everyone:
+        pending = _pending(session)
+        pending["users"].update(users)
+        pending["all"] = pending["all"] or everyone
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session):
+    pending = session.info.pop("session_user_changes", None)
+    if pending and has_app_context():
+        invalidate_session_users(pending["users"], pending["all"])
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session):
+    session.info.pop("session_user_changes", None)
@@ -0,0 +1,230 @@
+"""
+Transactional signup service.
+
+Capacity is enforced with a single conditional UPDATE on the denormalized
+``ShowInstance.signup_count`` counter: the row is only incremented while it
+is below the instance's capacity, so concurrent requests can never overbook.
+The UPDATE takes the row lock (Postgres) or the write lock (SQLite) and the
+Signup insert happens in the same transaction, so a duplicate signup rolls
+the reserved spot back again.
+
+The same statement maintains ``ShowInstance.is_full``; capacity changes
+refresh it on flush. Signups added or deleted through the ORM anywhere else
+(hosts adding walk-ins, cascades) are counted by a flush hook, and
+``reconcile_signup_counts`` repairs drift left by bulk or raw SQL writes.
+"""
+
+from collections import Counter
+from datetime import datetime, timedelta
+
+from sqlalchemy import bindparam, event, func, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app import db
+from models import Show, ShowInstance, Signup
+
+
+class SignupError(Exception):
+    """A signup request that can't be honoured, with the HTTP status to use"""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def deadline_for(instance_date, start_time, window_hours):
+    """Local time signups close for a show starting at ``start_time``"""
+    return datetime.combine(instance_date, start_time) - timedelta(hours=window_hours)
+
+
+def signup_deadline(instance):
+    """Latest moment comedians can sign up for an instance"""
+    return deadline_for(
+        instance.instance_date,
+        instance.start_time,
+        instance.show.signup_window_after_hours,
+    )
+
+
+def _capacity():
+    """SQL expression for an instance's max signups (override or show default)"""
+    show_max = (
+        select(Show.max_signups)
+        .where(Show.id == ShowInstance.show_id)
+        .scalar_subquery()
+    )
+    return func.coalesce(ShowInstance.max_signups_override, show_max)
+
+
+def _adjust_count(session, instance_id, delta, enforce_capacity=False):
+    """Atomically move signup_count by ``delta``; return False if refused"""
+    stmt = update(ShowInstance).where(ShowInstance.id == instance_id)
+    if enforce_capacity:
+        stmt = stmt.where(
+            ShowInstance.is_cancelled == False,
+            ShowInstance.signup_count < _capacity(),
+        )
+    # SET expressions see the pre-update count on every backend
+    stmt = stmt.values(
+        signup_count=ShowInstance.signup_count + delta,
+        is_full=ShowInstance.signup_count + delta >= _capacity(),
+    )
+    result = session.execute(stmt, execution_options={"synchronize_session": False})
+    return result.rowcount == 1
+
+
+def _reserved(session):
+    """Pending signups whose spot sign_up has already counted"""
+    return session.info.setdefault("reserved_signups", set())
+
+
+def sign_up(instance, comedian_id, notes=None, session=None, enforce_limits=True):
+    """Reserve a spot on ``instance`` for ``comedian_id`` and commit.
+
+    Raises SignupError with status 400 when the show is cancelled or the
+    deadline has passed, and 409 when it is full or the comedian is already
+    on the lineup. Hosts adding comedians by hand pass
+    ``enforce_limits=False`` to skip the capacity and deadline checks.
+    """
+    session = session or db.session
+
+    if instance.is_cancelled:
+        raise SignupError("This show is cancelled.")
+    if enforce_limits and datetime.now() > signup_deadline(instance):
+        raise SignupError("Signup deadline has passed for this show.")
+
+    try:
+        if not _adjust_count(session, instance.id, 1, enforce_limits):
+            session.rollback()
+            raise SignupError("This show is full.", 409)
+
+        signup = Signup(
+            comedian_id=comedian_id, show_instance_id=instance.id, notes=notes
+        )
+        session.add(signup)
+        # The spot is already reserved; keep the flush hook from counting it
+        _reserved(session).add(signup)
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        raise SignupError("You are already signed up for this show.", 409)
+
+    return signup
+
+
+def remove_signup(signup, session=None):
+    """Delete a signup and release its spot in one transaction"""
+    session = session or db.session
+    session.delete(signup)
+    session.commit()
+
+
+def refresh_fill_flags(session=None, instance_ids=None, show_ids=None):
+    """Recompute is_full for the given instances and/or shows' instances
+
+    With neither given, every instance is refreshed.
+    """
+    session = session or db.session
+    stmt = update(ShowInstance).values(is_full=ShowInstance.signup_count >= _capacity())
+    if instance_ids is not None or show_ids is not None:
+        stmt = stmt.where(
+            or_(
+                ShowInstance.id.in_(instance_ids or ()),
+                ShowInstance.show_id.in_(show_ids or ()),
+            )
+        )
+    session.execute(stmt, execution_options={"synchronize_session": False})
+
+
+def find_count_drift(session=None):
+    """Instances whose signup_count or is_full disagree with the Signup table
+
+    Returns ``(instance_id, stored_count, actual_count, is_full)`` tuples,
+    where ``is_full`` is the corrected flag.
+    """
+    session = session or db.session
+    actual = (
+        select(Signup.show_instance_id, func.count().label("actual"))
+        .group_by(Signup.show_instance_id)
+        .subquery()
+    )
+    actual_count = func.coalesce(actual.c.actual, 0)
+    should_be_full = actual_count >= _capacity()
+    rows = session.execute(
+        select(
+            ShowInstance.id,
+            ShowInstance.signup_count,
+            actual_count,
+            should_be_full,
+        )
+        .outerjoin(actual, actual.c.show_instance_id == ShowInstance.id)
+        .where(
+            or_(
+                ShowInstance.signup_count != actual_count,
+                ShowInstance.is_full != should_be_full,
+            )
+        )
+        .order_by(ShowInstance.id)
+    )
+    return [(row[0], row[1], row[2], bool(row[3])) for row in rows]
+
+
+def reconcile_signup_counts(session=None, fix=True):
+    """Find counter drift and, unless ``fix`` is False, correct and commit it"""
+    session = session or db.session
+    drift = find_count_drift(session)
+    if drift and fix:
+        table = ShowInstance.__table__
+        session.execute(
+            update(table)
+            .where(table.c.id == bindparam("instance_id"))
+            .values(signup_count=bindparam("count"), is_full=bindparam("full")),
+            [
+                {"instance_id": instance_id, "count": actual, "full": full}
+                for instance_id, _, actual, full in drift
+            ],
+        )
+        session.commit()
+    return drift
+
+
+@event.listens_for(Session, "after_flush")
+def _count_flushed_signups(session, flush_context):
+    """Apply counter changes for signups added or deleted outside sign_up"""
+    reserved = session.info.get("reserved_signups", set())
+    deltas = Counter()
+    for obj in session.new:
+        if isinstance(obj, Signup) and obj not in reserved:
+            deltas[obj.show_instance_id] += 1
+    for obj in session.deleted:
+        if isinstance(obj, Signup):
+            deltas[obj.show_instance_id] -= 1
+    reserved.difference_update(session.new)
+
+    for instance_id, delta in deltas.items():
+        if delta:
+            _adjust_count(session, instance_id, delta)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_reserved_signups(session):
+    session.info.pop("reserved_signups", None)
+
+
+@event.listens_for(Session, "after_flush")
+def _refresh_fill_on_capacity_change(session, flush_context):
+    """Keep is_full right when a show's or instance's capacity changes"""
+    instance_ids = set()
+    show_ids = set()
+    for obj in session.dirty:
+        if isinstance(obj, ShowInstance):
+            history = db.inspect(obj).attrs.max_signups_override.history
+            if history.has_changes():
+                instance_ids.add(obj.id)
+        elif isinstance(obj, Show):
+            if db.inspect(obj).attrs.max_signups.history.has_changes():
+                show_ids.add(obj.id)
+    if instance_ids or show_ids:
+        refresh_fill_flags(session, instance_ids, show_ids)
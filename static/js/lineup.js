@@ -6,11 +6,20 @@ document.addEventListener('DOMContentLoaded', function() {
         initializeAutoRefresh();
     }
     
+    // Live lineup updates pushed over Server-Sent Events
+    const liveLineup = document.getElementById('live-lineup');
+    if (liveLineup && liveLineup.dataset.streamUrl) {
+        initializeLiveLineup(liveLineup);
+    }
+    
     // Initialize drag and drop for lineup management
     if (document.getElementById('lineup-container')) {
         initializeDragAndDrop();
     }
     
+    // Typeahead for picking hosts outside the show's own people
+    document.querySelectorAll('[data-user-search]').forEach(initializeUserSearch);
+    
     // Initialize tooltips
     initializeTooltips();
     
@@ -55,6 +64,169 @@ function initializeAutoRefresh() {
     }
 }
 
+function initializeLiveLineup(container) {
+    const itemsContainer = document.getElementById('lineup-items');
+    const emptyState = document.getElementById('lineup-empty');
+    const countElement = document.getElementById('signup-count');
+    const lastUpdated = document.getElementById('last-updated');
+    const refreshButton = document.getElementById('refresh-lineup');
+    let lineup = [];
+    
+    if (refreshButton) {
+        refreshButton.addEventListener('click', function() {
+            location.reload();
+        });
+    }
+    
+    // Browsers without EventSource, and viewers turned away because too
+    // many streams are open, fall back to reloading the page
+    const poll = function() {
+        setInterval(function() {
+            location.reload();
+        }, 30000);
+    };
+    if (typeof EventSource === 'undefined') {
+        poll();
+        return;
+    }
+    
+    const source = new EventSource(container.dataset.streamUrl);
+    source.onerror = function() {
+        // A 503 closes the stream for good; network errors reconnect on their own
+        if (source.readyState === EventSource.CLOSED) {
+            poll();
+        }
+    };
+    source.onmessage = function(e) {
+        const message = JSON.parse(e.data);
+        
+        if (message.type === 'snapshot') {
+            lineup = message.signups;
+        } else if (message.type === 'added') {
+            lineup = lineup.filter(s => s.id !== message.signup.id);
+            lineup.push(message.signup);
+        } else if (message.type === 'removed') {
+            lineup = lineup.filter(s => s.id !== message.signup_id);
+        } else if (message.type === 'positions') {
+            lineup.forEach(s => {
+                if (String(s.id) in message.positions) {
+                    s.position = message.positions[String(s.id)];
+                }
+            });
+        } else {
+            return;
+        }
+        
+        // Positioned comedians first in order, then the waiting list
+        lineup.sort((a, b) => {
+            if (a.position === b.position) return 0;
+            if (a.position === null) return 1;
+            if (b.position === null) return -1;
+            return a.position - b.position;
+        });
+        
+        patchLineup(itemsContainer, lineup);
+        container.classList.toggle('d-none', lineup.length === 0);
+        if (emptyState) {
+            emptyState.classList.toggle('d-none', lineup.length > 0);
+        }
+        if (countElement) {
+            countElement.textContent = lineup.length;
+        }
+        if (lastUpdated) {
+            lastUpdated.textContent = new Date().toLocaleTimeString([], {hour: '2-digit', minute: '2-digit'});
+        }
+    };
+}
+
+function patchLineup(itemsContainer, lineup) {
+    // Reuse existing rows by signup id so only changed rows are touched
+    const existing = {};
+    itemsContainer.querySelectorAll('.lineup-item[data-signup-id]').forEach(item => {
+        existing[item.dataset.signupId] = item;
+    });
+    
+    lineup.forEach(signup => {
+        let item = existing[String(signup.id)];
+        if (item) {
+            delete existing[String(signup.id)];
+        } else {
+            item = buildLineupItem(signup);
+        }
+        updateLineupItem(item, signup);
+        itemsContainer.appendChild(item);
+    });
+    
+    Object.values(existing).forEach(item => item.remove());
+}
+
+function buildLineupItem(signup) {
+    const item = document.createElement('div');
+    item.className = 'lineup-item border rounded p-3 mb-2';
+    item.dataset.signupId = signup.id;
+    
+    const row = document.createElement('div');
+    row.className = 'd-flex justify-content-between align-items-center';
+    
+    const left = document.createElement('div');
+    left.className = 'd-flex align-items-center';
+    const badgeHolder = document.createElement('div');
+    badgeHolder.className = 'position-badge me-3';
+    const details = document.createElement('div');
+    const name = document.createElement('h6');
+    name.className = 'mb-1 fw-bold';
+    name.textContent = signup.name;
+    details.appendChild(name);
+    if (signup.notes) {
+        const notes = document.createElement('small');
+        notes.className = 'text-muted';
+        notes.textContent = signup.notes;
+        details.appendChild(notes);
+    }
+    left.appendChild(badgeHolder);
+    left.appendChild(details);
+    
+    const right = document.createElement('div');
+    right.className = 'text-end';
+    
+    row.appendChild(left);
+    row.appendChild(right);
+    item.appendChild(row);
+    return item;
+}
+
+function updateLineupItem(item, signup) {
+    item.classList.toggle('positioned', signup.position !== null);
+    item.classList.toggle('waiting', signup.position === null);
+    
+    const badge = document.createElement('span');
+    if (signup.position !== null) {
+        badge.className = 'badge bg-primary fs-6';
+        badge.textContent = `#${signup.position}`;
+    } else {
+        badge.className = 'badge bg-secondary fs-6';
+        badge.textContent = 'TBD';
+    }
+    item.querySelector('.position-badge').replaceChildren(badge);
+    
+    const status = item.querySelector('.text-end');
+    status.replaceChildren();
+    if (signup.performed || signup.position === 1) {
+        const statusBadge = document.createElement('span');
+        const icon = document.createElement('i');
+        if (signup.performed) {
+            statusBadge.className = 'badge bg-success';
+            icon.className = 'fas fa-check me-1';
+            statusBadge.append(icon, 'Performed');
+        } else {
+            statusBadge.className = 'badge bg-warning text-dark';
+            icon.className = 'fas fa-star me-1';
+            statusBadge.append(icon, 'Up Next!');
+        }
+        status.appendChild(statusBadge);
+    }
+}
+
 function initializeDragAndDrop() {
     const container = document.getElementById('lineup-container');
     if (!container) return;
@@ -121,6 +293,53 @@ function initializeDragAndDrop() {
     });
 }
 
+function initializeUserSearch(input) {
+    const select = document.getElementById(input.dataset.target || input.id);
+    const results = document.getElementById(input.dataset.results);
+    let timer = null;
+    
+    input.addEventListener('input', function() {
+        clearTimeout(timer);
+        const query = input.value.trim();
+        if (query.length < 2) {
+            results.replaceChildren();
+            return;
+        }
+        timer = setTimeout(() => {
+            const url = new URL(input.dataset.userSearch, window.location.origin);
+            url.searchParams.set('q', query);
+            makeRequest(url.toString())
+                .then(data => {
+                    results.replaceChildren(...data.users.map(user => {
+                        const item = document.createElement('button');
+                        item.type = 'button';
+                        item.className = 'list-group-item list-group-item-action';
+                        item.textContent = `${user.name} (@${user.username})`;
+                        item.addEventListener('click', () => chooseUser(user));
+                        return item;
+                    }));
+                })
+                .catch(error => console.error('User search failed:', error));
+        }, 200);
+    });
+    
+    function chooseUser(user) {
+        if (select.tagName === 'SELECT') {
+            let option = select.querySelector(`option[value="${user.id}"]`);
+            if (!option) {
+                option = new Option(user.name, user.id);
+                select.add(option);
+            }
+            select.value = String(user.id);
+            input.value = '';
+        } else {
+            // Text inputs take the username, which the server resolves
+            select.value = `@${user.username}`;
+        }
+        results.replaceChildren();
+    }
+}
+
 function initializeTooltips() {
     // Initialize Bootstrap tooltips if available
     if (typeof bootstrap !== 'undefined' && bootstrap.Tooltip) {
@@ -205,6 +424,7 @@ window.ComedyMicApp = {
     makeRequest,
     showNotification,
     initializeAutoRefresh,
+    initializeLiveLineup,
     initializeDragAndDrop,
     initializeTooltips,
     initializeConfirmations
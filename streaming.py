@@ -0,0 +1,81 @@
+"""
+Streaming JSON responses for feeds and exports.
+
+``jsonify`` builds the full list of dicts and then one string holding the
+whole document before anything is sent. For large results that costs
+memory in proportion to the row count. These helpers instead encode one
+item at a time into small chunks, and ``iter_rows`` pulls query results
+from the database in batches (``yield_per``), so peak memory stays flat
+however many rows a response has.
+
+orjson is used for encoding when it is installed (``pip install
+.[fast-json]``); otherwise the standard library encoder is used.
+"""
+
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from flask import Response, stream_with_context
+
+from app import db
+
+try:
+    import orjson
+except ImportError:  # Optional speedup
+    orjson = None
+
+CHUNK_SIZE = 64 * 1024
+BATCH_SIZE = 1000
+
+
+def _default(obj):
+    if isinstance(obj, (date, datetime, time)):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj):
+    """Compact JSON bytes for ``obj``, with dates as ISO strings"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default)
+    return json.dumps(obj, default=_default, separators=(",", ":")).encode()
+
+
+def iter_json_array(items, serialize=None, chunk_size=CHUNK_SIZE):
+    """Encode ``items`` as a JSON array, yielding chunks of about chunk_size"""
+    buffer = bytearray(b"[")
+    for index, item in enumerate(items):
+        if index:
+            buffer += b","
+        buffer += dumps(serialize(item) if serialize else item)
+        if len(buffer) >= chunk_size:
+            yield bytes(buffer)
+            buffer.clear()
+    buffer += b"]"
+    yield bytes(buffer)
+
+
+def iter_rows(statement, batch_size=BATCH_SIZE):
+    """Rows of ``statement`` fetched ``batch_size`` at a time"""
+    result = db.session.execute(statement, execution_options={"yield_per": batch_size})
+    try:
+        yield from result
+    finally:
+        result.close()
+
+
+def json_array_response(items, serialize=None, status=200, headers=None):
+    """Response streaming ``items`` as a JSON array
+
+    ``items`` may be a lazy iterable such as ``iter_rows(...)``; it is
+    consumed inside the request context while the body is sent.
+    """
+    return Response(
+        stream_with_context(iter_json_array(items, serialize)),
+        status=status,
+        mimetype="application/json",
+        headers=headers,
+    )
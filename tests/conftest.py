@@ -0,0 +1,73 @@
+"""
+Shared fixtures for the model/service level tests
+"""
+
+from contextlib import contextmanager
+from datetime import time
+
+import pytest
+from sqlalchemy import event
+
+from app import app, db
+from models import Show, User
+
+
+@pytest.fixture
+def app_ctx():
+    """Application context with a fresh schema, dropped afterwards."""
+    app.config["TESTING"] = True
+    app.config["WTF_CSRF_ENABLED"] = False
+    with app.app_context():
+        db.create_all()
+        yield app
+        for cache in app.extensions.get("caches", {}).values():
+            cache.clear()
+        db.session.remove()
+        db.drop_all()
+
+
+@contextmanager
+def count_queries():
+    """Count SQL statements executed on the app engine inside the block."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+
+
+def make_user(username, **kwargs):
+    """Create and flush a user with a throwaway password."""
+    user = User(
+        username=username,
+        email=kwargs.pop("email", f"{username}@test.com"),
+        first_name=kwargs.pop("first_name", username.title()),
+        last_name=kwargs.pop("last_name", "Test"),
+        password_hash="x",
+        **kwargs,
+    )
+    db.session.add(user)
+    db.session.flush()
+    return user
+
+
+def make_show(owner, **kwargs):
+    """Create and flush a weekly show owned by ``owner``."""
+    fields = {
+        "name": "Test Show",
+        "venue": "Test Venue",
+        "address": "1 Test St, Boston, MA",
+        "day_of_week": "Wednesday",
+        "start_time": time(20, 0),
+        "max_signups": 20,
+    }
+    fields.update(kwargs)
+    show = Show(owner_id=owner.id, **fields)
+    db.session.add(show)
+    db.session.flush()
+    return show
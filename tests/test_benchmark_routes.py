@@ -0,0 +1,30 @@
+"""
+Tests for the route benchmark harness
+"""
+
+import importlib.util
+import os
+
+from app import app, db
+from seed_data import seed_database
+
+spec = importlib.util.spec_from_file_location(
+    "benchmark_routes",
+    os.path.join(os.path.dirname(__file__), "..", "scripts", "benchmark_routes.py"),
+)
+benchmark_routes = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(benchmark_routes)
+
+
+def test_percentile_uses_nearest_rank():
+    samples = list(range(1, 101))
+    assert benchmark_routes.percentile(samples, 50) == 50
+    assert benchmark_routes.percentile(samples, 95) == 95
+    assert benchmark_routes.percentile([7.0], 95) == 7.0
+
+
+def test_every_route_has_a_benchmark_case(app_ctx):
+    seed_database(**benchmark_routes.SCALES["tiny"])
+    fx = benchmark_routes.prepare_fixtures(db)
+
+    assert benchmark_routes.uncovered_endpoints(app, fx) == []
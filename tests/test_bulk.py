@@ -0,0 +1,112 @@
+"""
+Tests for the bulk writers and the seed script built on them
+"""
+
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+import bulk
+from app import db
+from models import Show, ShowInstance, Signup, User
+from seed_data import seed_database, user_rows
+from tests.conftest import count_queries, make_show, make_user
+
+
+def test_bulk_insert_batches_rows_and_applies_defaults(app_ctx):
+    owner = make_user("bulkowner")
+    show = make_show(owner)
+    db.session.commit()
+
+    with count_queries() as statements:
+        created = bulk.bulk_insert_users(user_rows(25), batch_size=10)
+    assert created == 25
+    assert len(statements) == 3
+
+    start = date.today()
+    instances = bulk.bulk_insert_instances(
+        {"show_id": show.id, "instance_date": start + timedelta(weeks=n)}
+        for n in range(4)
+    )
+    db.session.commit()
+
+    assert instances == 4
+    instance = ShowInstance.query.filter_by(show_id=show.id).first()
+    assert instance.signup_count == 0
+    assert instance.lineup_version == 1
+    assert instance.is_cancelled is False
+    assert User.query.filter_by(username="alexmitchell").one().email_verified
+
+
+def test_refresh_signup_counts_after_bulk_signups(app_ctx):
+    owner = make_user("countowner")
+    show = make_show(owner)
+    comics = [make_user(f"countcomic{n}") for n in range(3)]
+    busy, empty = (
+        ShowInstance(show_id=show.id, instance_date=date.today() + timedelta(days=d))
+        for d in (1, 8)
+    )
+    empty.signup_count = 5  # Stale counter should be reset
+    db.session.add_all([busy, empty])
+    db.session.commit()
+
+    bulk.bulk_insert_signups(
+        {"comedian_id": comic.id, "show_instance_id": busy.id} for comic in comics
+    )
+    assert bulk.refresh_signup_counts([busy.id, empty.id]) == 1
+    db.session.commit()
+
+    assert db.session.get(ShowInstance, busy.id).signup_count == 3
+    assert db.session.get(ShowInstance, empty.id).signup_count == 0
+
+
+def test_bulk_insert_rejects_other_models(app_ctx):
+    with pytest.raises(ValueError):
+        bulk.bulk_insert(Show, [])
+
+
+def test_rows_with_different_columns_stay_aligned(app_ctx):
+    show = make_show(make_user("alignowner"))
+    db.session.commit()
+    rows = [
+        {"show_id": show.id, "instance_date": date(2030, 1, 1)},
+        {
+            "show_id": show.id,
+            "instance_date": date(2030, 1, 8),
+            "cancellation_reason": "Holiday",
+        },
+    ]
+    columns = bulk.copy_columns(ShowInstance.__table__)
+
+    lines = bulk.copy_csv(columns, rows).read().splitlines()
+    bulk.bulk_insert_instances(rows, use_copy=False)
+    db.session.commit()
+
+    assert "id" not in columns
+    reason = columns.index("cancellation_reason")
+    assert [line.split(",")[reason] for line in lines] == [bulk.NULL, "Holiday"]
+    assert lines[0].split(",")[columns.index("instance_date")] == "2030-01-01"
+    stored = ShowInstance.query.order_by(ShowInstance.instance_date).all()
+    assert [i.cancellation_reason for i in stored] == [None, "Holiday"]
+
+
+@pytest.mark.parametrize("use_copy", [True, False])
+def test_unknown_columns_are_rejected(app_ctx, use_copy):
+    with pytest.raises(ValueError, match="Unknown columns for user: nickname"):
+        bulk.bulk_insert_users(
+            [{"username": "nick", "nickname": "Nicky"}], use_copy=use_copy
+        )
+
+
+def test_seed_database_builds_a_consistent_dataset(app_ctx):
+    counts = seed_database(users=50, shows=10, history_weeks=2, weeks_ahead=4)
+
+    assert counts["users"] == User.query.count() == 50
+    assert counts["shows"] == Show.query.count() == 10
+    assert counts["instances"] == ShowInstance.query.count() > 0
+    assert counts["signups"] == Signup.query.count()
+    assert (
+        db.session.scalar(select(func.sum(ShowInstance.signup_count)))
+        == counts["signups"]
+    )
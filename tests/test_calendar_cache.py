@@ -0,0 +1,180 @@
+"""
+Tests for the pluggable caches and the cached month calendar
+"""
+
+from datetime import date, timedelta
+
+from app import app, db
+from cache import FileCache, MemoryCache, NullCache, get_cache, make_cache
+from calendar_data import build_events_by_date
+from models import ShowInstance, Signup
+from read_models import instance_cards
+from scheduler import materialize_show
+from tests.conftest import count_queries, make_show, make_user
+
+MONTH_START = date(2030, 3, 1)
+NEXT_MONTH_START = date(2030, 4, 1)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_memory_cache_evicts_least_recently_used_and_expires():
+    clock = FakeClock()
+    cache = MemoryCache(maxsize=2, ttl=10, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now the oldest
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+    clock.now = 10
+    assert cache.get("a") is None
+    assert len(cache) == 1
+
+
+def test_file_cache_round_trips_read_models(tmp_path, app_ctx):
+    owner = make_user("filecache")
+    show = make_show(owner)
+    db.session.add(ShowInstance(show_id=show.id, instance_date=MONTH_START))
+    db.session.commit()
+    payload = {"instances": instance_cards(MONTH_START, NEXT_MONTH_START)}
+
+    clock = FakeClock()
+    cache = FileCache(str(tmp_path), ttl=5, clock=clock)
+    cache.set(("month", MONTH_START), payload)
+    assert cache.get(("month", MONTH_START)) == payload
+    clock.now = 5
+    assert cache.get(("month", MONTH_START)) is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_make_cache_reads_config(tmp_path):
+    assert isinstance(make_cache("calendar", {}), MemoryCache)
+    assert isinstance(make_cache("calendar", {"CALENDAR_CACHE": "none"}), NullCache)
+    file_cache = make_cache(
+        "calendar", {"CALENDAR_CACHE": "file", "CACHE_DIR": str(tmp_path)}
+    )
+    assert file_cache.directory == str(tmp_path / "calendar")
+
+
+def _month(owner):
+    show = make_show(owner, name="Cached Show")
+    instances = [
+        ShowInstance(show_id=show.id, instance_date=MONTH_START + timedelta(days=d))
+        for d in (0, 7, 14)
+    ]
+    db.session.add_all(instances)
+    db.session.commit()
+    return show, instances
+
+
+def _counts(user):
+    events = build_events_by_date(MONTH_START, NEXT_MONTH_START, user)
+    return {
+        data["event"].id: data["signup_count"]
+        for day in events.values()
+        for data in day
+    }
+
+
+def test_second_build_reuses_shared_month(app_ctx):
+    owner = make_user("cacheowner")
+    comedian = make_user("cachecomic")
+    _, instances = _month(owner)
+    db.session.add(Signup(comedian_id=comedian.id, show_instance_id=instances[0].id))
+    db.session.commit()
+    db.session.refresh(comedian)
+
+    with count_queries() as first:
+        build_events_by_date(MONTH_START, NEXT_MONTH_START, comedian)
+    with count_queries() as second:
+        events = build_events_by_date(MONTH_START, NEXT_MONTH_START, comedian)
+    with count_queries() as anonymous:
+        build_events_by_date(MONTH_START, NEXT_MONTH_START)
+
+    assert len(first) == 2
+    assert len(second) == 1  # only the viewer's own signups
+    assert len(anonymous) == 0
+    classes = {
+        data["event"].id: data["color_class"] for day in events.values() for data in day
+    }
+    assert classes[instances[0].id] == "signed-up-event"
+
+    owner_view = build_events_by_date(MONTH_START, NEXT_MONTH_START, owner)
+    assert {data["color_class"] for day in owner_view.values() for data in day} == {
+        "owned-event"
+    }
+
+
+def test_signup_changes_invalidate_the_month(app_ctx):
+    owner = make_user("invalowner")
+    comedian = make_user("invalcomic")
+    _, instances = _month(owner)
+    assert _counts(None)[instances[1].id] == 0
+
+    signup = Signup(comedian_id=comedian.id, show_instance_id=instances[1].id)
+    db.session.add(signup)
+    db.session.commit()
+    assert _counts(None)[instances[1].id] == 1
+
+    db.session.delete(signup)
+    db.session.commit()
+    assert _counts(None)[instances[1].id] == 0
+
+
+def test_rolled_back_changes_keep_the_cache(app_ctx):
+    owner = make_user("rollbackowner")
+    comedian = make_user("rollbackcomic")
+    _, instances = _month(owner)
+    _counts(None)
+
+    db.session.add(Signup(comedian_id=comedian.id, show_instance_id=instances[0].id))
+    db.session.flush()
+    db.session.rollback()
+
+    with count_queries() as queries:
+        _counts(None)
+    assert queries == []
+
+
+def test_instance_and_show_edits_invalidate(app_ctx):
+    owner = make_user("editowner")
+    show, instances = _month(owner)
+    assert len(_counts(None)) == 3
+
+    instances[0].cancel("Flooded")
+    db.session.commit()
+    assert instances[0].id not in _counts(None)
+
+    # Moving an instance out of the month drops it from the old month's cache
+    instances[1].instance_date = NEXT_MONTH_START
+    db.session.commit()
+    assert list(_counts(None)) == [instances[2].id]
+
+    show.name = "Renamed Show"
+    db.session.commit()
+    events = build_events_by_date(MONTH_START, NEXT_MONTH_START)
+    assert events[instances[2].instance_date][0]["event"].show.name == "Renamed Show"
+
+
+def test_materialized_instances_invalidate(app_ctx):
+    owner = make_user("materialowner")
+    show = make_show(owner, day_of_week="Monday", started_date=MONTH_START)
+    db.session.commit()
+    assert _counts(None) == {}
+
+    materialize_show(show, MONTH_START, NEXT_MONTH_START - timedelta(days=1))
+    db.session.commit()
+    assert len(_counts(None)) == 4  # Mondays in March 2030
+
+
+def test_app_cache_is_configurable(app_ctx):
+    assert get_cache("calendar") is get_cache("calendar", app)
+    assert isinstance(get_cache("calendar"), MemoryCache)
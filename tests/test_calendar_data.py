@@ -0,0 +1,191 @@
+"""
+Tests for the batched calendar data layer
+"""
+
+from datetime import date, timedelta
+
+import routes
+from app import app, db
+from calendar_data import SIGNED_UP_COLOR, build_events_by_date
+from models import ShowInstance, Signup
+from tests.conftest import count_queries, make_show, make_user
+
+MONTH_START = date(2030, 1, 1)
+NEXT_MONTH_START = date(2030, 2, 1)
+
+
+def _populate(owner, comedians, instance_count):
+    """Spread instances over January 2030, each with a signup per comedian."""
+    instances = []
+    for i in range(instance_count):
+        show = make_show(owner, name=f"Show {i}", venue=f"Venue {i}")
+        instance = ShowInstance(
+            show_id=show.id, instance_date=MONTH_START + timedelta(days=i % 31)
+        )
+        db.session.add(instance)
+        db.session.flush()
+        for comedian in comedians:
+            db.session.add(
+                Signup(comedian_id=comedian.id, show_instance_id=instance.id)
+            )
+        instances.append(instance)
+    db.session.commit()
+    return instances
+
+
+def _render_calendar_data(user):
+    """Build the payload and touch every attribute the template reads."""
+    events_by_date = build_events_by_date(MONTH_START, NEXT_MONTH_START, user)
+    for events in events_by_date.values():
+        for event_data in events:
+            event = event_data["event"]
+            event.show.name, event.show.venue, event.show.owner_id
+            event.start_time, event.max_signups
+    return events_by_date
+
+
+def test_events_by_date_counts_and_colors(app_ctx):
+    owner = make_user("calowner")
+    comedian = make_user("calcomic")
+    other = make_user("calother")
+    instances = _populate(owner, [comedian, other], 3)
+    db.session.delete(
+        Signup.query.filter_by(
+            comedian_id=comedian.id, show_instance_id=instances[2].id
+        ).one()
+    )
+    db.session.commit()
+
+    events_by_date = build_events_by_date(MONTH_START, NEXT_MONTH_START, comedian)
+    by_id = {
+        data["event"].id: data for events in events_by_date.values() for data in events
+    }
+
+    assert by_id[instances[0].id]["signup_count"] == 2
+    assert by_id[instances[2].id]["signup_count"] == 1
+    assert by_id[instances[0].id]["color_class"] == "signed-up-event"
+    assert by_id[instances[2].id]["color_class"] == "default-event"
+
+    owner_view = build_events_by_date(MONTH_START, NEXT_MONTH_START, owner)
+    assert all(
+        data["color_class"] == "owned-event"
+        for events in owner_view.values()
+        for data in events
+    )
+
+
+def test_cancelled_instances_are_excluded(app_ctx):
+    owner = make_user("calcancel")
+    instance = _populate(owner, [], 1)[0]
+    instance.cancel("Snow day")
+    db.session.commit()
+
+    assert build_events_by_date(MONTH_START, NEXT_MONTH_START, owner) == {}
+
+
+def test_query_count_is_flat_as_instances_grow(app_ctx):
+    owner = make_user("calflat")
+    comedian = make_user("calflatcomic")
+
+    _populate(owner, [comedian], 5)
+    db.session.expire_all()
+    db.session.refresh(comedian)
+    with count_queries() as small:
+        _render_calendar_data(comedian)
+
+    _populate(owner, [comedian], 60)
+    db.session.expire_all()
+    db.session.refresh(comedian)
+    with count_queries() as large:
+        events_by_date = _render_calendar_data(comedian)
+
+    assert sum(len(events) for events in events_by_date.values()) == 65
+    assert len(small) == len(large) == 2
+
+
+def _feed_client(username):
+    user = make_user(username)
+    user.set_password("testpass123")
+    db.session.commit()
+    client = app.test_client()
+    client.post("/login", data={"username": username, "password": "testpass123"})
+    return user, client
+
+
+def test_feed_pages_through_range_with_cursor(app_ctx):
+    owner = make_user("feedowner")
+    comedian, client = _feed_client("feedcomic")
+    instances = _populate(owner, [comedian], 7)
+
+    seen = []
+    url = "/api/calendar/events?start=2030-01-01T00:00:00&end=2030-02-01&limit=3"
+    pages = 0
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.mimetype == "application/json"
+        page = response.get_json()
+        assert len(page) <= 3
+        seen.extend(page)
+        pages += 1
+        url = response.headers.get("Link", "").partition(">")[0].lstrip("<") or None
+
+    assert pages == 3
+    assert [event["id"] for event in seen] == [i.id for i in instances]
+    assert seen[0]["url"] == f"/event/{instances[0].id}"
+    assert seen[0]["date"] == "2030-01-01"
+    assert {event["backgroundColor"] for event in seen} == {SIGNED_UP_COLOR}
+
+
+def test_feed_without_limit_is_unpaged(app_ctx, monkeypatch):
+    monkeypatch.setattr(routes, "FEED_PAGE_SIZE", 2)
+    owner = make_user("wholeowner")
+    _, client = _feed_client("wholecomic")
+    instances = _populate(owner, [], 5)
+    base = "/api/calendar/events?start=2030-01-01&end=2030-02-01"
+
+    # Streamed bodies are read before the next request
+    whole = client.get(base)
+    whole_ids = [event["id"] for event in whole.get_json()]
+    first_page = client.get(base + "&limit=2")
+    assert len(first_page.get_json()) == 2
+    cursor = first_page.headers["X-Next-Cursor"]
+    rest = client.get(f"{base}&cursor={cursor}")
+    rest_ids = [event["id"] for event in rest.get_json()]
+
+    assert whole_ids == [i.id for i in instances]
+    assert "X-Next-Cursor" not in whole.headers
+    assert rest_ids == [instances[2].id, instances[3].id]
+    assert "X-Next-Cursor" in rest.headers
+
+
+def test_feed_filters_and_validation(app_ctx):
+    owner = make_user("filterowner")
+    _, client = _feed_client("filtercomic")
+    instances = _populate(owner, [], 4)
+    base = "/api/calendar/events?start=2030-01-01&end=2030-01-03"
+
+    events = client.get(base).get_json()
+    assert [event["id"] for event in events] == [instances[0].id, instances[1].id]
+    assert "X-Next-Cursor" not in client.get(base).headers
+
+    show_id = instances[3].show_id
+    by_show = client.get(
+        f"/api/calendar/events?start=2030-01-01&end=2030-02-01&show_id={show_id}"
+    ).get_json()
+    assert [event["id"] for event in by_show] == [instances[3].id]
+    by_venue = client.get(
+        "/api/calendar/events?start=2030-01-01&end=2030-02-01&venue=venue 2"
+    ).get_json()
+    assert [event["title"] for event in by_venue] == ["Show 2 @ Venue 2"]
+
+    instances[0].max_signups_override = 1
+    db.session.add(Signup(comedian_id=owner.id, show_instance_id=instances[0].id))
+    db.session.commit()
+    open_only = client.get(base + "&open=1").get_json()
+    assert [event["id"] for event in open_only] == [instances[1].id]
+
+    assert client.get("/api/calendar/events?start=nope").status_code == 400
+    assert client.get(base + "&cursor=%%%").status_code == 400
+    reversed_range = "/api/calendar/events?start=2030-02-01&end=2030-01-01"
+    assert client.get(reversed_range).status_code == 400
@@ -0,0 +1,109 @@
+"""
+Tests for the two-query dashboard aggregation
+"""
+
+from datetime import date, time, timedelta
+
+from app import app, db
+from dashboard import build_dashboard
+from models import ShowHost, ShowInstance, Signup
+from tests.conftest import count_queries, make_show, make_user
+
+
+def _instances(show, days):
+    instances = [
+        ShowInstance(show_id=show.id, instance_date=date.today() + timedelta(days=d))
+        for d in days
+    ]
+    db.session.add_all(instances)
+    db.session.flush()
+    return instances
+
+
+def _busy_comedian():
+    comic = make_user("dashcomic")
+    comic.set_password("testpass123")
+    owner = make_user("dashowner")
+    owned = make_show(comic, name="Comic's Own Mic")
+    hosted = make_show(owner, name="Hosted Mic")
+    other = make_show(owner, name="Elsewhere")
+    db.session.add(ShowHost(show_id=hosted.id, user_id=comic.id, added_by_id=owner.id))
+    _instances(owned, [1, 8])
+    _instances(hosted, [2])
+    past = _instances(other, [-21, -14, -7])
+    future = _instances(other, [3, 10])
+    for n, instance in enumerate(past + future):
+        db.session.add(
+            Signup(
+                comedian_id=comic.id,
+                show_instance_id=instance.id,
+                performed=n < 2,
+                position=n + 1,
+            )
+        )
+    db.session.commit()
+    return comic.id
+
+
+def test_dashboard_payload_in_two_queries(app_ctx):
+    user_id = _busy_comedian()
+
+    with count_queries() as queries:
+        data = build_dashboard(user_id)
+
+    assert len(queries) == 2
+    assert [(s.name, s.role) for s in data.owned_shows] == [
+        ("Comic's Own Mic", "owner")
+    ]
+    assert [(s.name, s.role) for s in data.managed_shows] == [("Hosted Mic", "host")]
+    assert data.owned_shows[0].upcoming_instance_count == 2
+    assert (data.signup_count, data.upcoming_signup_count, data.performed_count) == (
+        5,
+        2,
+        2,
+    )
+    assert [card.show.name for card in data.upcoming_instances] == [
+        "Comic's Own Mic",
+        "Hosted Mic",
+        "Comic's Own Mic",
+    ]
+    assert [s.position for s in data.recent_signups] == [4, 5]
+    assert data.recent_signups[0].show_instance.show.name == "Elsewhere"
+
+
+def test_users_without_shows_still_get_counts(app_ctx):
+    loner = make_user("loner")
+    db.session.commit()
+
+    data = build_dashboard(loner.id)
+
+    assert data.all_shows == [] and data.upcoming_instances == []
+    assert data.signup_count == 0
+
+
+def test_dashboards_render(app_ctx):
+    _busy_comedian()
+
+    with app.test_client() as client:
+        client.post("/login", data={"username": "dashcomic", "password": "testpass123"})
+        combined = client.get("/dashboard")
+
+    assert combined.status_code == 200
+    assert b'<h4 class="text-primary">5</h4>' in combined.data
+    assert b'<h4 class="text-success">2</h4>' in combined.data
+
+
+def test_host_dashboard_shows_active_badges(app_ctx):
+    host = make_user("badgehost")
+    host.set_password("testpass123")
+    make_show(host, name="Running Mic", end_time=time(22, 0))
+    make_show(host, name="Ended Mic", end_time=time(22, 0), ended_date=date.today())
+    db.session.commit()
+
+    with app.test_client() as client:
+        client.post("/login", data={"username": "badgehost", "password": "testpass123"})
+        page = client.get("/host/dashboard")
+
+    assert page.status_code == 200
+    assert page.data.count(b'class="badge bg-success"') == 1
+    assert page.data.count(b'class="badge bg-secondary"') == 1
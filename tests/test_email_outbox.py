@@ -0,0 +1,104 @@
+"""
+Tests for the email outbox, its retry policy and the local transports
+"""
+
+from datetime import datetime, timedelta
+from email import message_from_bytes
+
+import pytest
+
+from app import app, db
+from email_outbox import (
+    FileTransport,
+    MemoryTransport,
+    backoff,
+    drain,
+    enqueue_email,
+    send_pending,
+)
+from email_service import send_welcome_email
+from models import OutboundEmail
+from tests.conftest import make_user
+
+
+@pytest.fixture
+def transport(app_ctx, monkeypatch):
+    memory = MemoryTransport()
+    monkeypatch.setitem(app.extensions, "email_transport", memory)
+    monkeypatch.setitem(app.config, "EMAIL_MAX_ATTEMPTS", 3)
+    return memory
+
+
+def test_request_path_only_enqueues(transport):
+    user = make_user("mailcomic")
+    with app.test_request_context():
+        send_welcome_email(user)
+    db.session.commit()
+
+    queued = OutboundEmail.query.one()
+    assert (queued.status, queued.kind, queued.to_address) == (
+        "pending",
+        "welcome",
+        "mailcomic@test.com",
+    )
+    assert "/dashboard" in queued.text_body
+    assert transport.sent == []
+
+
+def test_batches_are_sent_and_marked(transport):
+    for n in range(7):
+        enqueue_email(f"batch{n}@test.com", f"Hello {n}", "Body")
+    db.session.commit()
+
+    assert send_pending(batch_size=5) == {"sent": 5, "retrying": 0, "failed": 0}
+    assert drain(batch_size=5) == {"sent": 2, "retrying": 0, "failed": 0}
+    assert sorted(m["to"] for m in transport.sent) == [
+        f"batch{n}@test.com" for n in range(7)
+    ]
+    assert {m.status for m in OutboundEmail.query} == {"sent"}
+    assert drain() == {"sent": 0, "retrying": 0, "failed": 0}
+
+
+def test_failures_back_off_then_give_up(transport):
+    message = enqueue_email("flaky@test.com", "Retry me", "Body")
+    db.session.commit()
+    transport.fail = ConnectionError("SES unavailable")
+
+    assert send_pending() == {"sent": 0, "retrying": 1, "failed": 0}
+    assert message.attempts == 1
+    assert message.next_attempt_at > datetime.utcnow()
+    assert send_pending()["retrying"] == 0  # not due yet
+
+    for _ in range(2):
+        message.next_attempt_at = datetime.utcnow()
+        db.session.commit()
+        send_pending()
+    assert (message.status, message.attempts) == ("failed", 3)
+    assert message.last_error == "SES unavailable"
+
+    assert backoff(1) <= timedelta(seconds=36)
+    assert backoff(3) >= timedelta(seconds=96)
+    assert backoff(30) <= timedelta(hours=7.2)
+
+
+def test_file_transport_writes_eml(tmp_path, app_ctx):
+    message = enqueue_email("file@test.com", "Saved", "Plain text", "<p>HTML</p>")
+    db.session.commit()
+
+    FileTransport(str(tmp_path), "noreply@test.com").send(message)
+
+    (path,) = tmp_path.iterdir()
+    saved = message_from_bytes(path.read_bytes())
+    assert saved["To"] == "file@test.com"
+    assert saved["Subject"] == "Saved"
+    assert saved.is_multipart()
+
+
+def test_cli_drains_the_outbox(transport):
+    enqueue_email("cli@test.com", "From the CLI", "Body")
+    db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=["send-emails"])
+
+    assert '"sent": 1' in result.output
+    assert transport.sent[0]["subject"] == "From the CLI"
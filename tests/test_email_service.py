@@ -0,0 +1,106 @@
+"""
+Tests for the precompiled email templates and batch rendering
+"""
+
+from datetime import date, timedelta
+
+from app import app, db
+from email_service import get_templates, render_batch, send_lineup_posted
+from models import OutboundEmail, ShowInstance, Signup
+from tests.conftest import count_queries, make_show, make_user
+
+
+def _posted_lineup(size=3):
+    host = make_user("posthost")
+    host.set_password("testpass123")
+    instance = ShowInstance(
+        show_id=make_show(host).id, instance_date=date.today() + timedelta(days=3)
+    )
+    db.session.add(instance)
+    db.session.flush()
+    for n in range(size):
+        db.session.add(
+            Signup(
+                comedian_id=make_user(f"postcomic{n}").id,
+                show_instance_id=instance.id,
+                position=n + 1,
+            )
+        )
+    db.session.commit()
+    return instance
+
+
+def test_templates_are_compiled_once_and_render_without_a_request(app_ctx):
+    templates = get_templates()
+    compiled = templates.templates["welcome"]
+
+    (message,) = render_batch(
+        "welcome",
+        [("fresh@test.com", {"first_name": "Fresh"})],
+        {"dashboard_url": templates.dashboard_url},
+    )
+
+    assert get_templates().templates["welcome"] is compiled
+    assert message.subject == "Welcome to Comedy Open Mic Manager!"
+    assert "Hi Fresh" in message.text_body
+    assert templates.dashboard_url.startswith("http://localhost")
+    assert templates.dashboard_url in message.html_body
+
+
+def test_html_bodies_are_escaped(app_ctx):
+    (message,) = render_batch(
+        "welcome",
+        [("x@test.com", {"first_name": "<b>Bob</b>", "dashboard_url": "/"})],
+    )
+
+    assert "&lt;b&gt;Bob&lt;/b&gt;" in message.html_body
+    assert "<b>Bob</b>" in message.text_body
+
+
+def test_subjects_and_text_bodies_are_not_escaped(app_ctx):
+    instance = _posted_lineup(1)
+    instance.show.name = "Tom & Jerry's <Mic>"
+    db.session.commit()
+
+    send_lineup_posted(instance.id)
+    db.session.commit()
+
+    message = OutboundEmail.query.one()
+    assert message.subject.startswith("Lineup posted: Tom & Jerry's <Mic> on ")
+    assert "Tom & Jerry's <Mic>" in message.text_body
+    assert "Tom &amp; Jerry&#39;s &lt;Mic&gt;" in message.html_body
+
+
+def test_lineup_posted_is_queued_per_comedian_in_one_insert(app_ctx):
+    instance = _posted_lineup()
+
+    with count_queries() as queries:
+        queued = send_lineup_posted(instance.id)
+    db.session.commit()
+
+    inserts = [q for q in queries if q.lstrip().upper().startswith("INSERT")]
+    assert queued == 3
+    assert len(inserts) == 1
+    messages = OutboundEmail.query.order_by(OutboundEmail.to_address).all()
+    assert [m.to_address for m in messages] == [
+        f"postcomic{n}@test.com" for n in range(3)
+    ]
+    assert {m.kind for m in messages} == {"lineup_posted"}
+    first = messages[0]
+    assert "Hi Postcomic0" in first.text_body
+    assert "#1" in first.text_body
+    assert "Postcomic2" in first.text_body  # the shared lineup listing
+    assert f"/live/{instance.id}" in first.html_body
+
+
+def test_host_can_email_the_lineup(app_ctx):
+    instance = _posted_lineup(2)
+
+    with app.test_client() as client:
+        client.post("/login", data={"username": "posthost", "password": "testpass123"})
+        response = client.post(
+            f"/host/notify_lineup/{instance.id}", follow_redirects=True
+        )
+
+    assert b"Lineup emailed to 2 comedians" in response.data
+    assert OutboundEmail.query.count() == 2
@@ -0,0 +1,102 @@
+"""
+Tests for host candidate lookup and the host picker typeahead
+"""
+
+from datetime import date
+
+from app import app, db
+from forms import InstanceHostForm, ShowSettingsForm
+from host_candidates import show_host_candidates
+from models import ShowHost, ShowInstance, ShowInstanceHost, ShowRunner
+from tests.conftest import count_queries, make_show, make_user
+
+
+def _connected_show():
+    owner = make_user("candowner")
+    owner.set_password("testpass123")
+    show = make_show(owner)
+    runner, host, past, default = (
+        make_user(name) for name in ("candrunner", "candhost", "candpast", "canddef")
+    )
+    show.default_host_id = default.id
+    instance = ShowInstance(show_id=show.id, instance_date=date(2030, 2, 6))
+    db.session.add_all(
+        [
+            ShowRunner(show_id=show.id, user_id=runner.id, added_by_id=owner.id),
+            ShowHost(show_id=show.id, user_id=host.id, added_by_id=owner.id),
+            instance,
+        ]
+    )
+    db.session.flush()
+    db.session.add(ShowInstanceHost(show_instance_id=instance.id, user_id=past.id))
+    for n in range(5):
+        make_user(f"stranger{n}")
+    db.session.commit()
+    return show, instance
+
+
+def test_candidates_are_the_shows_people_in_one_query(app_ctx):
+    show_id = _connected_show()[0].id
+
+    with count_queries() as queries:
+        candidates = show_host_candidates(show_id)
+
+    assert len(queries) == 1
+    assert {c.username for c in candidates} == {
+        "candowner",
+        "candrunner",
+        "candhost",
+        "candpast",
+        "canddef",
+    }
+
+
+def test_forms_offer_candidates_and_accept_a_picked_user(app_ctx):
+    show, _ = _connected_show()
+    stranger = make_user("pickedstranger")
+    db.session.commit()
+
+    with app.test_request_context(method="POST", data={"host_id": str(stranger.id)}):
+        picked = InstanceHostForm(show=show, meta={"csrf": False})
+        assert picked.validate()
+    with app.test_request_context():
+        settings = ShowSettingsForm(show=show, meta={"csrf": False})
+
+    assert stranger.id in {value for value, _ in picked.host_id.choices}
+    assert settings.default_host_id.choices[0] == (0, "No default host")
+    assert len(settings.default_host_id.choices) == 6
+
+
+def test_search_endpoint(app_ctx):
+    show_id = _connected_show()[0].id
+    url = f"/api/users/search?show_id={show_id}&q=Str&limit=3"
+
+    with app.test_client() as client:
+        assert client.get(url).status_code == 302
+        client.post("/login", data={"username": "candowner", "password": "testpass123"})
+        assert client.get("/api/users/search?q=Str").status_code == 400
+        response = client.get(url)
+
+    data = response.get_json()
+    assert data["success"] is True
+    assert [user["username"] for user in data["users"]] == [
+        "stranger0",
+        "stranger1",
+        "stranger2",
+    ]
+
+
+def test_search_endpoint_is_for_lineup_managers(app_ctx):
+    show_id = _connected_show()[0].id
+    outsider = make_user("candoutsider")
+    outsider.set_password("testpass123")
+    db.session.commit()
+
+    with app.test_client() as client:
+        client.post(
+            "/login", data={"username": "candoutsider", "password": "testpass123"}
+        )
+        response = client.get(f"/api/users/search?show_id={show_id}&q=cand")
+
+    assert response.status_code == 403
+    assert response.get_json()["success"] is False
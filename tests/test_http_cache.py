@@ -0,0 +1,174 @@
+"""
+Tests for ETag / Last-Modified handling on public instance pages
+"""
+
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import update
+
+import http_cache
+from app import app, db
+from models import ShowInstance, ShowRunner, User
+from signup_service import sign_up
+from tests.conftest import count_queries, make_show, make_user
+
+
+def _instance(updated_at=None):
+    owner = make_user("etagowner")
+    instance = ShowInstance(
+        show_id=make_show(owner).id, instance_date=date.today() + timedelta(days=7)
+    )
+    db.session.add(instance)
+    db.session.commit()
+    # Last-Modified is only sent once the change is at least a second old
+    db.session.execute(
+        update(ShowInstance)
+        .where(ShowInstance.id == instance.id)
+        .values(updated_at=updated_at or datetime.utcnow() - timedelta(minutes=5))
+    )
+    db.session.commit()
+    return instance
+
+
+class _SameSecond(datetime):
+    @classmethod
+    def utcnow(cls):
+        return STAMP + timedelta(milliseconds=200)
+
+
+STAMP = datetime(2030, 1, 2, 20, 15, 30, 500000)
+
+
+class _MonthLater(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return datetime.now(tz) + timedelta(days=30)
+
+    @classmethod
+    def utcnow(cls):
+        return datetime.utcnow() + timedelta(days=30)
+
+
+def test_unchanged_poll_returns_304_without_touching_signups(app_ctx):
+    instance = _instance()
+    instance_id = instance.id
+
+    with app.test_client() as client:
+        for url in (f"/event/{instance_id}", f"/live/{instance_id}"):
+            first = client.get(url)
+            assert first.status_code == 200
+            assert first.headers["ETag"]
+            assert first.headers["Last-Modified"]
+
+            with count_queries() as statements:
+                second = client.get(
+                    url, headers={"If-None-Match": first.headers["ETag"]}
+                )
+            assert second.status_code == 304
+            assert second.data == b""
+            assert len(statements) == 1
+            assert "FROM signup" not in statements[0]
+
+            by_date = client.get(
+                url, headers={"If-Modified-Since": first.headers["Last-Modified"]}
+            )
+            assert by_date.status_code == 304
+
+
+def test_lineup_changes_produce_a_new_etag(app_ctx):
+    instance = _instance()
+    instance_id = instance.id
+    comedian = make_user("etagcomic")
+
+    with app.test_client() as client:
+        etags = [client.get(f"/event/{instance_id}").headers["ETag"]]
+
+        signup = sign_up(instance, comedian.id)
+        etags.append(client.get(f"/event/{instance_id}").headers["ETag"])
+
+        signup.position = 1
+        db.session.commit()
+        etags.append(client.get(f"/event/{instance_id}").headers["ETag"])
+
+        instance.cancel("Rain")
+        db.session.commit()
+        response = client.get(
+            f"/event/{instance_id}", headers={"If-None-Match": etags[-1]}
+        )
+        etags.append(response.headers["ETag"])
+
+    assert response.status_code == 200
+    assert len(set(etags)) == 4
+    assert db.session.get(ShowInstance, instance_id).lineup_version == 4
+
+
+def test_renames_and_show_staff_changes_produce_a_new_etag(app_ctx):
+    instance = _instance()
+    instance_id = instance.id
+    comedian = make_user("etagrenamed")
+    sign_up(instance, comedian.id)
+    url = f"/event/{instance_id}"
+
+    with app.test_client() as client:
+        etags = [client.get(url).headers["ETag"]]
+
+        db.session.get(User, comedian.id).first_name = "Renamed"
+        db.session.commit()
+        etags.append(client.get(url).headers["ETag"])
+
+        make_user("etagbystander").last_name = "Elsewhere"
+        db.session.commit()
+        etags.append(client.get(url).headers["ETag"])
+
+        db.session.add(
+            ShowRunner(
+                show_id=instance.show_id,
+                user_id=comedian.id,
+                added_by_id=instance.show.owner_id,
+            )
+        )
+        db.session.commit()
+        etags.append(client.get(url).headers["ETag"])
+
+    assert etags[0] != etags[1]
+    assert etags[1] == etags[2]
+    assert etags[2] != etags[3]
+
+
+def test_passing_the_signup_deadline_changes_the_validators(app_ctx, monkeypatch):
+    instance_id = _instance().id
+    url = f"/event/{instance_id}"
+
+    with app.test_client() as client:
+        before = client.get(url)
+        monkeypatch.setattr(http_cache, "datetime", _MonthLater)
+        after = client.get(url, headers={"If-None-Match": before.headers["ETag"]})
+        by_date = client.get(
+            url, headers={"If-Modified-Since": before.headers["Last-Modified"]}
+        )
+
+    assert after.status_code == 200
+    assert after.headers["ETag"] != before.headers["ETag"]
+    assert after.last_modified > before.last_modified
+    assert by_date.status_code == 200
+
+
+def test_changes_this_second_are_sent_without_last_modified(app_ctx, monkeypatch):
+    instance_id = _instance(updated_at=STAMP).id
+    monkeypatch.setattr(http_cache, "datetime", _SameSecond)
+
+    with app.test_client() as client:
+        response = client.get(f"/live/{instance_id}")
+        by_date = client.get(
+            f"/live/{instance_id}",
+            headers={"If-Modified-Since": "Sun, 06 Nov 2095 08:49:37 GMT"},
+        )
+
+    assert response.headers["ETag"]
+    assert "Last-Modified" not in response.headers
+    assert by_date.status_code == 200
+
+
+def test_missing_instance_is_404(app_ctx):
+    with app.test_client() as client:
+        assert client.get("/event/999999").status_code == 404
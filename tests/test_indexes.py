@@ -0,0 +1,119 @@
+"""
+EXPLAIN-based checks that the hot queries use the indexes in indexes.py
+"""
+
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import func, inspect, select
+
+from app import db
+from indexes import HOT_PATH_INDEXES, USER_LOOKUP_INDEXES, explain
+from migrations import add_hot_path_indexes, add_user_lookup_indexes
+from models import Show, ShowInstance, Signup, User
+from permissions import membership_query
+from seed_data import seed_database
+from tests.conftest import make_user
+
+
+@pytest.fixture
+def seeded(app_ctx):
+    seed_database(users=80, shows=12, history_weeks=4, weeks_ahead=8)
+    if db.engine.dialect.name == "postgresql":
+        # Tiny tables would otherwise be sequentially scanned
+        db.session.execute(db.text("SET LOCAL enable_seqscan = off"))
+
+
+def _plan(statement):
+    return "\n".join(explain(statement))
+
+
+def test_active_instances_by_date_use_partial_index(seeded):
+    today = date.today()
+    plan = _plan(
+        select(ShowInstance.id, Show.name)
+        .join(Show)
+        .where(
+            Show.is_deleted == False,
+            ShowInstance.instance_date >= today,
+            ShowInstance.instance_date < today + timedelta(days=30),
+            ShowInstance.is_cancelled == False,
+        )
+        .order_by(ShowInstance.instance_date)
+    )
+    assert "ix_show_instance_active_date" in plan
+
+
+def test_signup_counts_for_a_date_range_are_index_only(seeded):
+    today = date.today()
+    plan = _plan(
+        select(Signup.show_instance_id, func.count(Signup.id))
+        .join(ShowInstance, Signup.show_instance_id == ShowInstance.id)
+        .where(
+            ShowInstance.instance_date >= today,
+            ShowInstance.instance_date < today + timedelta(days=30),
+        )
+        .group_by(Signup.show_instance_id)
+    )
+    assert "ix_show_instance_date_id" in plan
+    assert "ix_signup_instance_position" in plan
+    if db.engine.dialect.name == "sqlite":
+        assert "COVERING INDEX ix_show_instance_date_id" in plan
+
+
+def test_lineup_order_uses_instance_position_index(seeded):
+    instance_id = db.session.scalar(select(func.min(ShowInstance.id)))
+    plan = _plan(
+        select(Signup)
+        .where(Signup.show_instance_id == instance_id)
+        .order_by(Signup.position, Signup.signup_time)
+    )
+    assert "ix_signup_instance_position" in plan
+    assert "TEMP B-TREE" not in plan  # No separate sort step
+
+
+def test_membership_lookup_uses_user_indexes(seeded):
+    plan = _plan(membership_query(1))
+    for name in ("ix_show_owner", "ix_show_runner_user", "ix_show_host_user"):
+        assert name in plan
+
+
+def test_case_insensitive_user_lookups_use_expression_indexes(seeded):
+    for column, name in [
+        (User.username, "ix_user_username_lower"),
+        (User.email, "ix_user_email_lower"),
+    ]:
+        plan = _plan(select(User.id).where(func.lower(column) == "someone"))
+        assert name in plan
+
+
+def test_migration_creates_missing_indexes(app_ctx):
+    db.session.remove()
+    with db.engine.begin() as conn:
+        for index in HOT_PATH_INDEXES:
+            index.drop(conn)
+
+    assert add_hot_path_indexes() is True
+    assert add_hot_path_indexes() is False
+    names = {ix["name"] for ix in inspect(db.engine).get_indexes("show_instance")}
+    assert {"ix_show_instance_active_date", "ix_show_instance_date_id"} <= names
+
+
+def test_case_duplicates_only_block_the_user_lookup_indexes(app_ctx):
+    db.session.remove()
+    with db.engine.begin() as conn:
+        for index in HOT_PATH_INDEXES + USER_LOOKUP_INDEXES:
+            index.drop(conn)
+    make_user("Dupe")
+    make_user("dupe", email="dupe2@test.com")
+    db.session.commit()
+
+    assert add_hot_path_indexes() is True
+    with pytest.raises(RuntimeError, match="ix_user_username_lower.*'dupe'"):
+        add_user_lookup_indexes()
+    names = {ix["name"] for ix in inspect(db.engine).get_indexes("show_instance")}
+    assert "ix_show_instance_date_id" in names
+
+    User.query.filter_by(username="Dupe").one().username = "Dupe2"
+    db.session.commit()
+    assert add_user_lookup_indexes() is True
@@ -0,0 +1,125 @@
+"""
+Tests for the live lineup pub/sub and Server-Sent Events stream
+"""
+
+import json
+import threading
+from datetime import date, timedelta
+
+from app import app, db
+from lineup_events import InProcessBroker, get_broker
+from models import ShowInstance
+from signup_service import sign_up
+from tests.conftest import make_show, make_user
+
+
+def _lineup(owner_name, comedian_names):
+    owner = make_user(owner_name)
+    owner.set_password("testpass123")
+    show = make_show(owner)
+    instance = ShowInstance(
+        show_id=show.id, instance_date=date.today() + timedelta(days=7)
+    )
+    db.session.add(instance)
+    db.session.commit()
+    signups = [sign_up(instance, make_user(name).id) for name in comedian_names]
+    return instance, signups
+
+
+def test_broker_fans_out_per_instance():
+    broker = InProcessBroker()
+    first = broker.subscribe(1)
+    second = broker.subscribe(1)
+    other = broker.subscribe(2)
+
+    broker.publish(1, {"type": "removed", "signup_id": 7})
+
+    assert first.get(timeout=0) == {"type": "removed", "signup_id": 7}
+    assert second.get(timeout=0) == {"type": "removed", "signup_id": 7}
+    assert other.get(timeout=0) is None
+
+    first.close()
+    second.close()
+    assert broker.subscriber_count(1) == 0
+
+
+def test_slow_subscriber_is_told_to_resync():
+    broker = InProcessBroker()
+    subscription = broker.subscribe(1)
+    for i in range(150):
+        broker.publish(1, {"type": "removed", "signup_id": i})
+
+    messages = []
+    while (message := subscription.get(timeout=0)) is not None:
+        messages.append(message)
+
+    assert messages[0] == {"type": "resync"}
+    assert len(messages) < 100
+
+
+def test_stream_starts_with_a_snapshot(app_ctx):
+    instance, signups = _lineup("ssehost", ["ssefirst", "ssesecond"])
+    instance_id = instance.id
+
+    with app.test_client() as client:
+        response = client.get(f"/live/{instance_id}/stream", buffered=False)
+        assert response.mimetype == "text/event-stream"
+        frames = iter(response.response)
+        assert next(frames).startswith(b"retry:")
+        snapshot = json.loads(next(frames).removeprefix(b"data: "))
+        response.close()
+
+    assert snapshot["type"] == "snapshot"
+    assert [s["name"] for s in snapshot["signups"]] == [
+        "Ssefirst Test",
+        "Ssesecond Test",
+    ]
+
+
+def test_reorder_publishes_positions(app_ctx):
+    instance, signups = _lineup("reorderhost", ["reorderone", "reordertwo"])
+    instance_id = instance.id
+    ids = [signup.id for signup in reversed(signups)]
+    subscription = get_broker(app).subscribe(instance_id)
+
+    try:
+        with app.test_client() as client:
+            client.post(
+                "/login", data={"username": "reorderhost", "password": "testpass123"}
+            )
+            response = client.post(
+                f"/host/reorder_lineup/{instance_id}", json={"signup_ids": ids}
+            )
+            bad_version = client.post(
+                f"/host/reorder_lineup/{instance_id}",
+                json={"signup_ids": ids, "version": "latest"},
+            )
+        assert response.status_code == 200
+        assert bad_version.status_code == 400
+        assert subscription.get(timeout=1) == {
+            "type": "positions",
+            "positions": {str(ids[0]): 1, str(ids[1]): 2},
+        }
+    finally:
+        subscription.close()
+
+
+def test_streams_over_the_cap_are_turned_away(app_ctx, monkeypatch):
+    instance, _ = _lineup("caphost", [])
+    monkeypatch.setitem(
+        app.extensions, "lineup_stream_slots", threading.BoundedSemaphore(1)
+    )
+    url = f"/live/{instance.id}/stream"
+
+    client = app.test_client()
+    first = client.get(url, buffered=False)
+    next(iter(first.response))
+    second = client.get(url, buffered=False)
+    first.close()
+    third = client.get(url, buffered=False)
+    third.close()
+
+    assert first.status_code == 200
+    assert second.status_code == 503
+    assert second.headers["Retry-After"] == "30"
+    assert third.status_code == 200
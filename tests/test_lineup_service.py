@@ -0,0 +1,134 @@
+"""
+Tests for bulk lineup ordering and its optimistic-concurrency token
+"""
+
+from datetime import date, timedelta
+
+import pytest
+
+from app import app, db
+from lineup_service import LineupError, reorder, set_positions
+from models import ShowInstance, Signup
+from tests.conftest import count_queries, make_show, make_user
+
+
+def _lineup(size=40):
+    host = make_user("orderhost")
+    host.set_password("testpass123")
+    instance = ShowInstance(
+        show_id=make_show(host).id, instance_date=date.today() + timedelta(days=2)
+    )
+    db.session.add(instance)
+    db.session.flush()
+    signups = [
+        Signup(comedian_id=make_user(f"ordercomic{n}").id, show_instance_id=instance.id)
+        for n in range(size)
+    ]
+    db.session.add_all(signups)
+    db.session.commit()
+    return instance, [signup.id for signup in signups]
+
+
+def _positions(instance_id):
+    return dict(
+        db.session.query(Signup.id, Signup.position).filter_by(
+            show_instance_id=instance_id
+        )
+    )
+
+
+def _lineup_on_other_show():
+    owner = make_user("othershowowner")
+    instance = ShowInstance(
+        show_id=make_show(owner, name="Other").id, instance_date=date(2030, 1, 1)
+    )
+    db.session.add(instance)
+    db.session.flush()
+    signup = Signup(comedian_id=owner.id, show_instance_id=instance.id)
+    db.session.add(signup)
+    db.session.commit()
+    return instance, [signup.id]
+
+
+def test_reorder_writes_the_whole_lineup_in_one_statement(app_ctx):
+    instance, ids = _lineup()
+    version = instance.lineup_version
+    new_order = list(reversed(ids))
+
+    with count_queries() as queries:
+        positions, new_version = reorder(instance.id, new_order, version)
+
+    updates = [q for q in queries if q.lstrip().upper().startswith("UPDATE")]
+    assert len(queries) == 3  # validate, claim the version, write positions
+    assert len(updates) == 2
+    assert new_version == version + 1
+    assert _positions(instance.id) == {sid: n for n, sid in enumerate(new_order, 1)}
+    assert positions[new_order[0]] == 1
+
+
+def test_stale_version_is_a_conflict(app_ctx):
+    instance, ids = _lineup(3)
+    version = instance.lineup_version
+    reorder(instance.id, ids, version)
+
+    with pytest.raises(LineupError) as excinfo:
+        reorder(instance.id, list(reversed(ids)), version)
+
+    assert excinfo.value.status_code == 409
+    assert excinfo.value.version == version + 1
+    assert _positions(instance.id) == {ids[0]: 1, ids[1]: 2, ids[2]: 3}
+
+
+def test_reorder_validates_the_list(app_ctx):
+    instance, ids = _lineup(3)
+    other, other_ids = _lineup_on_other_show()
+
+    for bad, status in [
+        (ids + other_ids[:1], 400),
+        ([ids[0], ids[0], ids[1], ids[2]], 400),
+        (["x"], 400),
+        (ids[:2], 409),
+    ]:
+        with pytest.raises(LineupError) as excinfo:
+            reorder(instance.id, bad)
+        assert excinfo.value.status_code == status
+    assert set(_positions(instance.id).values()) == {None}
+
+
+def test_set_positions_allows_gaps_and_clearing(app_ctx):
+    instance, ids = _lineup(3)
+    set_positions(instance.id, {ids[0]: 5, ids[1]: 1})
+    set_positions(instance.id, {ids[0]: None})
+
+    assert _positions(instance.id) == {ids[0]: None, ids[1]: 1, ids[2]: None}
+
+
+def test_endpoints_report_conflicts(app_ctx):
+    instance, ids = _lineup(2)
+    instance_id, version = instance.id, instance.lineup_version
+
+    with app.test_client() as client:
+        client.post("/login", data={"username": "orderhost", "password": "testpass123"})
+        first = client.post(
+            f"/host/reorder_lineup/{instance_id}",
+            json={"signup_ids": ids[::-1], "version": version},
+        )
+        second = client.post(
+            f"/host/reorder_lineup/{instance_id}",
+            json={"signup_ids": ids, "version": version},
+        )
+        form = client.post(
+            f"/manage_lineup/{instance_id}",
+            data={
+                "update_positions": "1",
+                "lineup_version": str(version),
+                f"position_{ids[0]}": "1",
+            },
+            follow_redirects=True,
+        )
+
+    assert first.get_json() == {"success": True, "version": version + 1}
+    assert second.status_code == 409
+    assert second.get_json()["version"] == version + 1
+    assert b"changed by someone else" in form.data
+    assert _positions(instance_id) == {ids[1]: 1, ids[0]: 2}
@@ -0,0 +1,87 @@
+"""
+Tests that dashboard and lineup views render without lazy loads
+"""
+
+from datetime import date, timedelta
+
+import pytest
+
+from app import app, db
+from loader_profiles import LazyLoadError
+from models import ShowInstance, ShowInstanceHost, Signup
+from tests.conftest import make_show, make_user
+
+
+@pytest.fixture
+def strict_loading(app_ctx, monkeypatch):
+    monkeypatch.setitem(app.config, "RAISE_ON_LAZY_LOAD", True)
+
+
+def _lineups():
+    """An owner's show with hosted instances and comedians signed up"""
+    owner = make_user("profileowner")
+    owner.set_password("testpass123")
+    host = make_user("profilehost")
+    show = make_show(owner, default_host_id=host.id)
+    comics = [make_user(f"profilecomic{n}") for n in range(4)]
+    comics[0].set_password("testpass123")
+
+    instances = [
+        ShowInstance(show_id=show.id, instance_date=date.today() + timedelta(days=d))
+        for d in (2, 9, 16)
+    ]
+    db.session.add_all(instances)
+    db.session.flush()
+    db.session.add(ShowInstanceHost(show_instance_id=instances[1].id, user_id=host.id))
+    for instance in instances:
+        for position, comic in enumerate(comics, 1):
+            db.session.add(
+                Signup(
+                    comedian_id=comic.id,
+                    show_instance_id=instance.id,
+                    position=position,
+                )
+            )
+    db.session.commit()
+    return show, instances
+
+
+def _get(client, url):
+    # Start every request from an empty identity map, like a real request
+    db.session.remove()
+    response = client.get(url)
+    assert response.status_code == 200, url
+    return response
+
+
+def test_views_render_without_lazy_loads(strict_loading):
+    show, instances = _lineups()
+    show_id, instance_id = show.id, instances[0].id
+
+    with app.test_client() as client:
+        client.post(
+            "/login", data={"username": "profileowner", "password": "testpass123"}
+        )
+        _get(client, "/dashboard")
+        page = _get(client, f"/host/upcoming_lineups/{show_id}")
+        assert b"Profilehost Test" in page.data
+        assert b"Profilecomic3 Test" in page.data
+        page = _get(client, f"/manage_lineup/{instance_id}")
+        assert b"Profilecomic0 Test" in page.data
+        client.get("/logout")
+
+        client.post(
+            "/login", data={"username": "profilecomic0", "password": "testpass123"}
+        )
+        page = _get(client, "/comedian/dashboard")
+        assert page.data.count(b"Test Show") >= 3
+
+
+def test_lazy_load_raises_in_strict_mode(strict_loading):
+    show, instances = _lineups()
+    instance_id = instances[0].id
+    db.session.remove()
+
+    instance = db.session.get(ShowInstance, instance_id)
+    with pytest.raises(LazyLoadError, match="ShowInstance"):
+        instance.signups
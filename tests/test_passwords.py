@@ -0,0 +1,78 @@
+"""
+Tests for configurable password hashing, rehash on login and the hash pool
+"""
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from app import app, db
+from passwords import PasswordBusyError, PasswordHasher, authenticate
+from tests.conftest import make_user
+
+CURRENT = "pbkdf2:sha256:1000"
+
+
+@pytest.fixture
+def hasher(app_ctx, monkeypatch):
+    current = PasswordHasher(CURRENT)
+    monkeypatch.setitem(app.extensions, "password_hasher", current)
+    return current
+
+
+def test_outdated_hashes_are_upgraded_on_a_correct_password(hasher):
+    user = make_user("rehash")
+    user.password_hash = generate_password_hash("letmein", "pbkdf2:sha256:2000")
+    old_hash = user.password_hash
+
+    assert authenticate(user, "wrong") is False
+    assert user.password_hash == old_hash
+
+    assert authenticate(user, "letmein") is True
+    assert user.password_hash.startswith(f"{CURRENT}$")
+    assert not hasher.needs_rehash(user.password_hash)
+    assert hasher.needs_rehash(generate_password_hash("x", CURRENT, salt_length=8))
+    assert user.check_password("letmein")
+
+
+def test_default_method_is_compared_with_its_parameters(app_ctx):
+    hasher = PasswordHasher("scrypt")
+    assert hasher.scheme == "scrypt:32768:8:1"
+    assert not hasher.needs_rehash(generate_password_hash("x", "scrypt"))
+
+
+def test_pool_rejects_work_beyond_its_bound(app_ctx):
+    hasher = PasswordHasher(CURRENT, threads=1, queue=0)
+    stored = hasher.hash("secret")
+
+    hasher.slots.acquire()  # the only slot is busy
+    with pytest.raises(PasswordBusyError) as excinfo:
+        hasher.verify(stored, "secret")
+    hasher.slots.release()
+
+    assert excinfo.value.status_code == 503
+    assert hasher.verify(stored, "secret") is True
+
+
+def _busy(*args):
+    raise PasswordBusyError()
+
+
+def test_login_saves_the_upgraded_hash(hasher, monkeypatch):
+    user = make_user("upgrader")
+    user.password_hash = generate_password_hash("testpass123", "pbkdf2:sha256:2000")
+    db.session.commit()
+
+    with app.test_client() as client:
+        response = client.post(
+            "/login", data={"username": "upgrader", "password": "testpass123"}
+        )
+        client.get("/logout")
+        monkeypatch.setattr(hasher, "verify", _busy)
+        busy = client.post(
+            "/login", data={"username": "upgrader", "password": "testpass123"}
+        )
+
+    assert response.status_code == 302
+    db.session.refresh(user)
+    assert user.password_hash.startswith(f"{CURRENT}$")
+    assert busy.status_code == 503
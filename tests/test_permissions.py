@@ -0,0 +1,84 @@
+"""
+Tests for the cached show role resolver
+"""
+
+from app import db
+from models import ShowHost, ShowRunner
+from permissions import get_managed_show_ids, get_show_roles, invalidate_roles
+from tests.conftest import count_queries, make_show, make_user
+
+
+def _setup_roles():
+    owner = make_user("permowner")
+    user = make_user("permuser")
+    owned = make_show(user, name="Owned")
+    run = make_show(owner, name="Run")
+    hosted = make_show(owner, name="Hosted")
+    both = make_show(owner, name="Runner and host")
+    other = make_show(owner, name="Other")
+    db.session.add_all(
+        [
+            ShowRunner(show_id=run.id, user_id=user.id, added_by_id=owner.id),
+            ShowHost(show_id=hosted.id, user_id=user.id, added_by_id=owner.id),
+            ShowRunner(show_id=both.id, user_id=user.id, added_by_id=owner.id),
+            ShowHost(show_id=both.id, user_id=user.id, added_by_id=owner.id),
+        ]
+    )
+    db.session.commit()
+    db.session.refresh(user)
+    invalidate_roles()
+    return user, owned, run, hosted, both, other
+
+
+def test_roles_and_permission_checks(app_ctx):
+    user, owned, run, hosted, both, other = _setup_roles()
+
+    assert user.get_show_role(owned) == "owner"
+    assert user.get_show_role(run) == "runner"
+    assert user.get_show_role(hosted) == "host"
+    assert user.get_show_role(both) == "runner"
+    assert user.get_show_role(other) == "comedian"
+
+    assert user.can_edit_show(run) and not user.can_edit_show(hosted)
+    assert user.can_manage_lineup(hosted) and not user.can_manage_lineup(other)
+    assert sorted(get_managed_show_ids(user)) == sorted([run.id, hosted.id, both.id])
+
+
+def test_repeated_checks_hit_the_database_once(app_ctx):
+    user, owned, run, hosted, both, other = _setup_roles()
+    shows = [owned, run, hosted, both, other]
+    for show in shows:
+        show.id, show.owner_id
+
+    with count_queries() as statements:
+        for _ in range(5):
+            for show in shows:
+                user.can_manage_lineup(show)
+
+    assert len(statements) == 1
+
+
+def test_bulk_roles_use_one_query(app_ctx):
+    user, owned, run, hosted, both, other = _setup_roles()
+    ids = [owned.id, run.id, hosted.id, other.id]
+
+    with count_queries() as statements:
+        roles = get_show_roles(user, ids)
+
+    assert len(statements) == 1
+    assert roles == {
+        owned.id: "owner",
+        run.id: "runner",
+        hosted.id: "host",
+        other.id: "comedian",
+    }
+
+
+def test_cache_is_invalidated_when_memberships_change(app_ctx):
+    user, owned, run, hosted, both, other = _setup_roles()
+    assert user.get_show_role(other) == "comedian"
+
+    db.session.add(ShowHost(show_id=other.id, user_id=user.id, added_by_id=user.id))
+    db.session.commit()
+
+    assert user.get_show_role(other) == "host"
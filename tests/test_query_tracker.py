@@ -0,0 +1,146 @@
+"""
+Tests for per-request SQL instrumentation and query budgets
+"""
+
+from datetime import date, timedelta
+
+import pytest
+from flask import g
+from sqlalchemy import event, select, text
+from sqlalchemy.exc import OperationalError
+
+from app import app, db
+from models import ShowInstance, Signup
+from query_tracker import (
+    QueryBudgetExceeded,
+    QueryTracker,
+    _after_cursor_execute,
+    _before_cursor_execute,
+)
+from tests.conftest import make_show, make_user
+
+
+@pytest.fixture
+def instrumented(app_ctx, monkeypatch):
+    monkeypatch.setitem(app.config, "SQL_INSTRUMENTATION", True)
+    monkeypatch.setitem(app.config, "QUERY_BUDGETS", {})
+    app.extensions["query_history"].clear()
+
+
+def _logged_in_client(username):
+    user = make_user(username)
+    user.set_password("testpass123")
+    owner = make_user(f"{username}owner")
+    show = make_show(owner)
+    for week in range(6):
+        db.session.add(
+            ShowInstance(
+                show_id=show.id,
+                instance_date=date.today() + timedelta(weeks=week, days=1),
+            )
+        )
+    db.session.commit()
+
+    client = app.test_client()
+    client.post("/login", data={"username": username, "password": "testpass123"})
+    return client
+
+
+def test_headers_and_debug_page(instrumented, monkeypatch):
+    monkeypatch.setitem(app.config, "SQL_DEBUG_USERS", {"trackcomic"})
+    client = _logged_in_client("trackcomic")
+
+    response = client.get("/api/calendar/events")
+
+    assert response.status_code == 200
+    assert int(response.headers["X-Query-Count"]) >= 2
+    assert float(response.headers["X-Query-Time-Ms"]) >= 0
+    assert response.headers["X-Query-Max-Repeat"] == "1"
+    assert "X-Query-N-Plus-One" not in response.headers
+
+    report = client.get("/debug/queries", headers={"Accept": "application/json"})
+    stats = report.get_json()["endpoints"]["calendar_events_api"]
+    assert stats == {
+        "requests": 1,
+        "max_queries": int(response.headers["X-Query-Count"]),
+        "total_ms": pytest.approx(float(response.headers["X-Query-Time-Ms"])),
+        "n_plus_one": 0,
+    }
+    assert client.get("/debug/queries").status_code == 200
+
+
+def test_debug_page_needs_an_allowed_login(instrumented, monkeypatch):
+    monkeypatch.setitem(app.config, "SQL_DEBUG_USERS", set())
+
+    anonymous = app.test_client().get("/debug/queries")
+    client = _logged_in_client("nosycomic")
+    forbidden = client.get("/debug/queries")
+    monkeypatch.setattr(app, "debug", True)
+    in_debug_mode = client.get("/debug/queries")
+
+    assert anonymous.status_code == 302
+    assert "/login" in anonymous.headers["Location"]
+    assert forbidden.status_code == 403
+    assert in_debug_mode.status_code == 200
+
+
+def test_repeated_statements_are_flagged(instrumented):
+    _logged_in_client("loopcomic")
+    instance_ids = [instance.id for instance in ShowInstance.query.all()]
+
+    with app.test_request_context("/api/calendar/events"):
+        g.query_tracker = QueryTracker()
+        for instance_id in instance_ids:
+            db.session.execute(
+                select(Signup.id).where(Signup.show_instance_id == instance_id)
+            ).all()
+        summary = g.pop("query_tracker").summary(threshold=5)
+
+    assert summary["max_repeat"] == 6
+    assert summary["n_plus_one"][0]["times"] == 6
+    assert "FROM signup" in summary["n_plus_one"][0]["statement"]
+
+
+def test_strict_mode_fails_over_budget(instrumented, monkeypatch):
+    client = _logged_in_client("budgetcomic")
+    monkeypatch.setitem(app.config, "QUERY_BUDGETS", {"calendar_events_api": 1})
+
+    assert client.get("/api/calendar/events").status_code == 200
+
+    monkeypatch.setitem(app.config, "SQL_QUERY_BUDGET_STRICT", True)
+    with pytest.raises(QueryBudgetExceeded, match="calendar_events_api"):
+        client.get("/api/calendar/events")
+
+
+def test_failed_statements_do_not_skew_timings(instrumented):
+    client = _logged_in_client("failcomic")
+    assert client.get("/api/calendar/events").status_code == 200
+
+    with app.test_request_context("/api/calendar/events"):
+        g.query_tracker = QueryTracker()
+        with pytest.raises(OperationalError):
+            db.session.execute(text("SELECT * FROM no_such_table"))
+        db.session.rollback()
+        db.session.execute(text("SELECT 1")).all()
+        tracker = g.pop("query_tracker")
+
+    assert tracker.count == 1
+    assert 0 <= tracker.seconds < 1
+
+
+def test_disabled_by_default(app_ctx):
+    for name, listener in [
+        ("before_cursor_execute", _before_cursor_execute),
+        ("after_cursor_execute", _after_cursor_execute),
+    ]:
+        if event.contains(db.engine, name, listener):
+            event.remove(db.engine, name, listener)
+
+    with app.test_client() as client:
+        response = client.get("/")
+        assert "X-Query-Count" not in response.headers
+        assert client.get("/debug/queries").status_code == 404
+
+    assert not event.contains(
+        db.engine, "before_cursor_execute", _before_cursor_execute
+    )
@@ -0,0 +1,95 @@
+"""
+Tests for the slotted read models used by calendar and lineup pages
+"""
+
+import dataclasses
+from datetime import date, time, timedelta
+
+import pytest
+
+from app import app, db
+from models import ShowInstance, ShowInstanceHost, Signup
+from read_models import instance_cards, instance_detail, lineup_rows
+from tests.conftest import make_show, make_user
+
+
+def _instances():
+    owner = make_user("cardowner")
+    host = make_user("cardhost")
+    show = make_show(owner, default_host_id=host.id, max_signups=12)
+    soon = date.today() + timedelta(days=3)
+    plain = ShowInstance(show_id=show.id, instance_date=soon)
+    special = ShowInstance(
+        show_id=show.id,
+        instance_date=soon + timedelta(days=7),
+        max_signups_override=5,
+        start_time_override=time(21, 30),
+    )
+    cancelled = ShowInstance(show_id=show.id, instance_date=soon + timedelta(days=14))
+    cancelled.cancel("Holiday")
+    db.session.add_all([plain, special, cancelled])
+    db.session.commit()
+    return show, plain, special, cancelled
+
+
+def test_cards_apply_overrides_and_skip_cancelled(app_ctx):
+    show, plain, special, cancelled = _instances()
+
+    cards = instance_cards(date.today(), date.today() + timedelta(days=30))
+
+    assert [card.id for card in cards] == [plain.id, special.id]
+    assert cards[0].max_signups == 12
+    assert cards[0].start_time == time(20, 0)
+    assert cards[1].max_signups == 5
+    assert cards[1].start_time == time(21, 30)
+    assert cards[1].show.name == "Test Show"
+    assert cards[1].show.owner_id == show.owner_id
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        cards[0].max_signups = 99
+    assert not hasattr(cards[0], "__dict__")
+
+
+def test_detail_host_names_fall_back_to_default_host(app_ctx):
+    show, plain, special, _ = _instances()
+    guest = make_user("cardguest")
+    db.session.add(ShowInstanceHost(show_instance_id=special.id, user_id=guest.id))
+    db.session.commit()
+
+    assert instance_detail(plain.id, with_hosts=True).get_host_names() == (
+        "Cardhost Test"
+    )
+    assert instance_detail(special.id, with_hosts=True).get_host_names() == (
+        "Cardguest Test"
+    )
+    detail = instance_detail(plain.id)
+    assert detail.show.owner.full_name == "Cardowner Test"
+    assert detail.get_host_names() == "TBD"
+    assert instance_detail(999999) is None
+
+
+def test_lineup_rows_order_and_names(app_ctx):
+    _, plain, _, _ = _instances()
+    first, second, third = (make_user(f"rowcomic{n}") for n in range(3))
+    db.session.add_all(
+        [
+            Signup(comedian_id=first.id, show_instance_id=plain.id),
+            Signup(comedian_id=second.id, show_instance_id=plain.id, position=2),
+            Signup(comedian_id=third.id, show_instance_id=plain.id, position=1),
+        ]
+    )
+    db.session.commit()
+
+    lineup = lineup_rows(plain.id)
+    assert [row.comedian.full_name for row in lineup] == [
+        "Rowcomic2 Test",
+        "Rowcomic1 Test",
+        "Rowcomic0 Test",
+    ]
+    by_signup = lineup_rows(plain.id, order="signup")
+    assert [row.comedian_id for row in by_signup] == [first.id, second.id, third.id]
+
+    with app.test_client() as client:
+        page = client.get(f"/live/{plain.id}")
+        assert page.data.index(b"Rowcomic2 Test") < page.data.index(b"Rowcomic0 Test")
+        assert b"Cardhost Test" in client.get(f"/event/{plain.id}").data
@@ -0,0 +1,103 @@
+"""
+Tests for recurrence expansion against the original day-by-day search
+"""
+
+import random
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from recurrence import WEEKDAYS, iter_occurrences, show_occurrences
+
+
+def legacy_next_instance_date(show, from_date):
+    """The original Show.get_next_instance_date loop, kept as the reference"""
+    days_ahead = 0
+    while True:
+        check_date = from_date + timedelta(days=days_ahead)
+        if check_date.strftime("%A") == show.day_of_week:
+            if show.repeat_cadence == "weekly":
+                return check_date
+            elif show.repeat_cadence == "bi-weekly":
+                weeks_since_start = (check_date - show.started_date).days // 7
+                if weeks_since_start % 2 == 0:
+                    return check_date
+            elif show.repeat_cadence == "monthly":
+                start_week = (show.started_date.day - 1) // 7
+                current_week = (check_date.day - 1) // 7
+                if start_week == current_week:
+                    return check_date
+            elif show.repeat_cadence == "custom" and show.custom_repeat_days:
+                days_since_start = (check_date - show.started_date).days
+                if days_since_start % show.custom_repeat_days == 0:
+                    return check_date
+
+        days_ahead += 1
+        if days_ahead > 365:
+            return None
+
+
+def legacy_occurrences(show, start, end):
+    occurrences = []
+    current = legacy_next_instance_date(show, start)
+    while current and current <= end:
+        occurrences.append(current)
+        current = legacy_next_instance_date(show, current + timedelta(days=1))
+    return occurrences
+
+
+def make_show(cadence, day_of_week, started_date, custom_repeat_days=None):
+    return SimpleNamespace(
+        day_of_week=day_of_week,
+        repeat_cadence=cadence,
+        started_date=started_date,
+        custom_repeat_days=custom_repeat_days,
+    )
+
+
+@pytest.mark.parametrize("cadence", ["weekly", "bi-weekly", "monthly", "custom"])
+def test_matches_legacy_loop(cadence):
+    rng = random.Random(cadence)
+    for _ in range(200):
+        started = date(2024, 1, 1) + timedelta(days=rng.randrange(730))
+        show = make_show(
+            cadence,
+            rng.choice(list(WEEKDAYS)),
+            started,
+            rng.randrange(1, 45) if cadence == "custom" else None,
+        )
+        start = started + timedelta(days=rng.randrange(-60, 400))
+        end = start + timedelta(days=rng.randrange(0, 500))
+
+        assert list(show_occurrences(show, start, end)) == legacy_occurrences(
+            show, start, end
+        )
+
+
+def test_monthly_fifth_week_skips_short_months():
+    # March 29, 2025 is the fifth Saturday of the month
+    show = make_show("monthly", "Saturday", date(2025, 3, 29))
+    dates = list(show_occurrences(show, date(2025, 3, 1), date(2025, 12, 31)))
+
+    assert dates == [
+        date(2025, 3, 29),
+        date(2025, 5, 31),
+        date(2025, 8, 30),
+        date(2025, 11, 29),
+    ]
+
+
+def test_custom_cadence_never_landing_on_weekday_is_empty():
+    # Every 14 days from a Monday never reaches a Wednesday
+    show = make_show("custom", "Wednesday", date(2025, 1, 6), custom_repeat_days=14)
+
+    assert list(show_occurrences(show, date(2025, 1, 1), date(2026, 1, 1))) == []
+
+
+def test_unknown_values_yield_nothing():
+    today = date.today()
+    end = today + timedelta(days=30)
+
+    assert list(iter_occurrences("Funday", "weekly", today, today, end)) == []
+    assert list(iter_occurrences("Monday", "custom", today, today, end)) == []
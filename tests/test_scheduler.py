@@ -0,0 +1,108 @@
+"""
+Tests for rolling ShowInstance materialization
+"""
+
+import json
+import sqlite3
+from datetime import date, timedelta
+
+import pytest
+
+from app import app, db
+from models import ShowInstance
+from scheduler import materialize_show, sweep
+from tests.conftest import make_show, make_user
+
+
+def _dates(show):
+    return sorted(
+        row.instance_date for row in ShowInstance.query.filter_by(show_id=show.id)
+    )
+
+
+def test_sweep_fills_the_horizon_once(app_ctx):
+    owner = make_user("sweepowner")
+    weekly = make_show(owner, name="Weekly", day_of_week="Monday")
+    deleted = make_show(owner, name="Gone", day_of_week="Tuesday")
+    deleted.soft_delete()
+    db.session.commit()
+
+    result = sweep(weeks_ahead=8)
+
+    expected = list(
+        weekly.get_instance_dates(date.today(), date.today() + timedelta(weeks=8))
+    )
+    assert result["shows"] == 1
+    assert result["created"] == len(expected)
+    assert result["seconds"] >= 0
+    assert _dates(weekly) == expected
+    assert _dates(deleted) == []
+
+    assert sweep(weeks_ahead=8)["created"] == 0
+
+    # Extending the horizon only adds the new dates
+    extended = list(
+        weekly.get_instance_dates(date.today(), date.today() + timedelta(weeks=10))
+    )
+    assert sweep(weeks_ahead=10)["created"] == len(extended) - len(expected)
+    assert _dates(weekly) == extended
+
+
+def test_existing_instances_are_kept(app_ctx):
+    owner = make_user("keepowner")
+    show = make_show(owner, day_of_week="Friday")
+    first = next(
+        show.get_instance_dates(date.today(), date.today() + timedelta(weeks=1))
+    )
+    existing = ShowInstance(show_id=show.id, instance_date=first)
+    existing.cancel("Private event")
+    db.session.add(existing)
+    db.session.commit()
+
+    created = materialize_show(show, date.today(), date.today() + timedelta(weeks=4))
+    db.session.commit()
+
+    assert created == len(_dates(show)) - 1
+    assert (
+        ShowInstance.query.filter_by(show_id=show.id, instance_date=first)
+        .one()
+        .is_cancelled
+    )
+
+
+def test_cli_command_reports_the_sweep(app_ctx):
+    owner = make_user("cliowner")
+    make_show(owner, day_of_week="Sunday")
+    db.session.commit()
+
+    result = app.test_cli_runner().invoke(
+        args=["materialize-instances", "--weeks", "2"]
+    )
+
+    assert result.exit_code == 0
+    summary = json.loads(result.output)
+    assert summary["shows"] == 1
+    assert summary["created"] in (2, 3)
+
+
+def test_batches_past_the_bind_limit_are_split(app_ctx):
+    # Two binds per candidate date: 17,000 weeks would need 34,000 in one
+    # statement, over SQLite's default 32,766 limit (some builds raise it)
+    if db.engine.dialect.name != "sqlite":
+        pytest.skip("exercises SQLite's bind parameter limit")
+    owner = make_user("longowner")
+    show = make_show(owner, day_of_week="Sunday")
+    end = date.today() + timedelta(weeks=17000)
+    connection = db.session.connection().connection.dbapi_connection
+    limit = connection.getlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER)
+    connection.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 32766)
+
+    try:
+        created = materialize_show(show, date.today(), end)
+        db.session.commit()
+    finally:
+        connection.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, limit)
+
+    assert created == len(list(show.get_instance_dates(date.today(), end)))
+    assert len(_dates(show)) == created
+    assert materialize_show(show, date.today(), end) == 0
@@ -0,0 +1,135 @@
+"""
+Tests for the cached Flask-Login user records and their invalidation
+"""
+
+from datetime import date
+
+import session_users
+from app import app, db
+from cache import MemoryCache, get_cache
+from models import Show, ShowInstance, ShowRunner, User
+from session_users import SessionUser, load_session_user
+from tests.conftest import count_queries, make_show, make_user
+
+
+def _runner_setup():
+    owner = make_user("cacheowner")
+    runner = make_user("cacherunner")
+    runner.set_password("testpass123")
+    show = make_show(owner)
+    db.session.commit()
+    return show.id, runner.id, owner.id
+
+
+def test_cache_hits_need_no_user_or_role_queries(app_ctx):
+    show_id, runner_id, _ = _runner_setup()
+    show = db.session.get(Show, show_id)
+
+    with count_queries() as cold:
+        load_session_user(runner_id)
+    with app.test_request_context(), count_queries() as warm:
+        user = load_session_user(runner_id)
+        can_manage = user.can_manage_lineup(show)
+
+    assert len(cold) == 2  # profile columns, then the role UNION
+    assert warm == []
+    assert isinstance(user, SessionUser)
+    assert (user.username, user.full_name) == ("cacherunner", "Cacherunner Test")
+    assert can_manage is False
+
+
+def test_role_and_profile_changes_invalidate_on_commit(app_ctx):
+    show_id, runner_id, owner_id = _runner_setup()
+    assert load_session_user(runner_id).roles == {}
+
+    db.session.add(ShowRunner(show_id=show_id, user_id=runner_id, added_by_id=owner_id))
+    db.session.commit()
+    assert load_session_user(runner_id).roles == {show_id: "runner"}
+
+    runner = db.session.get(User, runner_id)
+    runner.first_name = "Renamed"
+    db.session.rollback()
+    assert load_session_user(runner_id).first_name == "Cacherunner"
+    runner.first_name = "Renamed"
+    db.session.commit()
+    assert load_session_user(runner_id).first_name == "Renamed"
+
+
+def test_entries_expire_after_the_ttl(app_ctx, monkeypatch):
+    now = [0.0]
+    cache = MemoryCache(ttl=60, clock=lambda: now[0])
+    monkeypatch.setitem(app.extensions.setdefault("caches", {}), "session_users", cache)
+    _, runner_id, _ = _runner_setup()
+    load_session_user(runner_id)
+
+    now[0] = 59
+    with count_queries() as fresh:
+        load_session_user(runner_id)
+    now[0] = 61
+    with count_queries() as expired:
+        load_session_user(runner_id)
+
+    assert fresh == []
+    assert len(expired) == 2
+
+
+def test_logged_in_pages_reuse_the_cached_user(app_ctx):
+    _runner_setup()
+
+    client = app.test_client()
+    client.post("/login", data={"username": "cacherunner", "password": "testpass123"})
+    # Fresh app contexts, so each request really goes through the loader
+    with app.app_context():
+        client.get("/dashboard")
+    with app.app_context(), count_queries() as queries:
+        response = client.get("/dashboard")
+
+    # The dashboard's own CTE reads memberships; the user loader must not
+    loader = [
+        q for q in queries if "user.username" in q or q.startswith("SELECT show.id")
+    ]
+    assert response.status_code == 200 and loader == []
+
+
+def _ignore(*args, **kwargs):
+    pass
+
+
+def test_revoked_roles_are_denied_on_the_next_change(app_ctx, monkeypatch):
+    show_id, runner_id, owner_id = _runner_setup()
+    runner = ShowRunner(show_id=show_id, user_id=runner_id, added_by_id=owner_id)
+    instance = ShowInstance(show_id=show_id, instance_date=date(2030, 2, 6))
+    db.session.add_all([runner, instance])
+    db.session.commit()
+    instance_id = instance.id
+
+    client = app.test_client()
+    client.post("/login", data={"username": "cacherunner", "password": "testpass123"})
+    # A new app context per request, as in production, so g starts empty
+    with app.app_context():
+        client.get("/dashboard")
+    # Revoked by another worker: this process's cache never hears of it
+    monkeypatch.setattr(session_users, "invalidate_session_users", _ignore)
+    db.session.delete(runner)
+    db.session.commit()
+    with app.app_context():
+        response = client.post(f"/cancel_show_instance/{instance_id}")
+
+    assert load_session_user(runner_id).roles == {show_id: "runner"}
+    assert response.status_code == 403
+    assert db.session.get(ShowInstance, instance_id).is_cancelled is False
+
+
+def test_records_read_before_an_invalidation_are_not_cached(app_ctx, monkeypatch):
+    _, runner_id, _ = _runner_setup()
+    load_record = session_users.load_record
+
+    def racing_load(user_id):
+        record = load_record(user_id)
+        session_users.invalidate_session_users([user_id])
+        return record
+
+    monkeypatch.setattr(session_users, "load_record", racing_load)
+    load_session_user(runner_id)
+
+    assert get_cache("session_users").get(f"user:{runner_id}") is None
@@ -0,0 +1,290 @@
+"""
+Tests for the atomic signup service, including a concurrent load test
+"""
+
+import os
+import tempfile
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, time, timedelta
+
+import pytest
+from sqlalchemy import create_engine, func, make_url, select, text
+from sqlalchemy.orm import Session
+
+from app import app, db
+from models import Show, ShowInstance, Signup, User
+from signup_service import (
+    SignupError,
+    reconcile_signup_counts,
+    remove_signup,
+    sign_up,
+)
+from tests.conftest import make_show, make_user
+
+
+def _instance(show, days_ahead=7):
+    instance = ShowInstance(
+        show_id=show.id, instance_date=date.today() + timedelta(days=days_ahead)
+    )
+    db.session.add(instance)
+    db.session.commit()
+    return instance
+
+
+def test_signup_increments_counter_and_enforces_capacity(app_ctx):
+    owner = make_user("svcowner")
+    first = make_user("svcfirst")
+    second = make_user("svcsecond")
+    instance = _instance(make_show(owner, max_signups=1))
+
+    sign_up(instance, first.id, notes="New bit")
+    assert instance.signup_count == 1
+
+    with pytest.raises(SignupError) as excinfo:
+        sign_up(instance, second.id)
+    assert excinfo.value.status_code == 409
+    assert excinfo.value.message == "This show is full."
+    assert Signup.query.filter_by(show_instance_id=instance.id).count() == 1
+
+
+def test_duplicate_signup_is_a_conflict_and_releases_the_spot(app_ctx):
+    owner = make_user("dupowner")
+    comedian = make_user("dupcomic")
+    instance = _instance(make_show(owner))
+
+    sign_up(instance, comedian.id)
+    with pytest.raises(SignupError) as excinfo:
+        sign_up(instance, comedian.id)
+
+    assert excinfo.value.status_code == 409
+    assert instance.signup_count == 1
+
+
+def test_cancelled_and_past_deadline_are_rejected(app_ctx):
+    owner = make_user("closedowner")
+    comedian = make_user("closedcomic")
+    show = make_show(owner)
+    cancelled = _instance(show)
+    cancelled.cancel("Venue closed")
+    db.session.commit()
+    past = _instance(show, days_ahead=-1)
+
+    for instance in (cancelled, past):
+        with pytest.raises(SignupError) as excinfo:
+            sign_up(instance, comedian.id)
+        assert excinfo.value.status_code == 400
+
+    # Hosts can still add people after the deadline
+    sign_up(past, comedian.id, enforce_limits=False)
+    assert past.signup_count == 1
+
+
+def test_remove_signup_releases_the_spot(app_ctx):
+    owner = make_user("rmowner")
+    comedian = make_user("rmcomic")
+    instance = _instance(make_show(owner, max_signups=1))
+
+    signup = sign_up(instance, comedian.id)
+    remove_signup(signup)
+
+    assert instance.signup_count == 0
+    sign_up(instance, comedian.id)
+    assert instance.signup_count == 1
+
+
+def test_api_returns_409_when_full(app_ctx):
+    owner = make_user("apiowner")
+    comedian = make_user("apicomic")
+    comedian.set_password("testpass123")
+    instance = _instance(make_show(owner, max_signups=1))
+    sign_up(instance, owner.id)
+    instance_id = instance.id
+
+    with app.test_client() as client:
+        client.post("/login", data={"username": "apicomic", "password": "testpass123"})
+        response = client.post(f"/api/signup/{instance_id}", json={"notes": ""})
+
+    assert response.status_code == 409
+    assert response.get_json() == {"success": False, "error": "This show is full."}
+
+
+@contextmanager
+def _throwaway_engine():
+    """An engine on a fresh SQLite file or Postgres schema, removed afterwards
+
+    Only LOAD_TEST_DATABASE_URL's own throwaway schema is created and
+    dropped, so pointing it at a real database can't wipe its tables.
+    """
+    url = os.environ.get("LOAD_TEST_DATABASE_URL")
+    if not url:
+        db_fd, db_path = tempfile.mkstemp(suffix=".db")
+        engine = create_engine(f"sqlite:///{db_path}", connect_args={"timeout": 30})
+        try:
+            db.metadata.create_all(engine)
+            yield engine
+        finally:
+            engine.dispose()
+            os.close(db_fd)
+            os.unlink(db_path)
+        return
+
+    if make_url(url).get_backend_name() != "postgresql":
+        pytest.skip("LOAD_TEST_DATABASE_URL must be a PostgreSQL URL")
+    schema = f"load_test_{uuid.uuid4().hex[:12]}"
+    admin = create_engine(url)
+    engine = create_engine(url, connect_args={"options": f"-csearch_path={schema}"})
+    with admin.begin() as conn:
+        conn.execute(text(f"CREATE SCHEMA {schema}"))
+    try:
+        db.metadata.create_all(engine)
+        yield engine
+    finally:
+        engine.dispose()
+        with admin.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+        admin.dispose()
+
+
+@pytest.mark.slow
+def test_concurrent_signups_never_overbook():
+    """Fire hundreds of concurrent signups at a real database file.
+
+    Set LOAD_TEST_DATABASE_URL to run against Postgres instead of SQLite;
+    the test works in a throwaway schema there.
+    """
+    capacity, attempts = 20, 300
+
+    with _throwaway_engine() as engine:
+        with Session(engine) as session:
+            owner = User(
+                username="loadowner",
+                email="loadowner@test.com",
+                first_name="Load",
+                last_name="Owner",
+                password_hash="x",
+            )
+            comedians = [
+                User(
+                    username=f"load{i}",
+                    email=f"load{i}@test.com",
+                    first_name="Load",
+                    last_name=str(i),
+                    password_hash="x",
+                )
+                for i in range(attempts)
+            ]
+            session.add_all([owner] + comedians)
+            session.flush()
+            show = Show(
+                name="Packed Mic",
+                venue="Tiny Bar",
+                address="1 Load St",
+                day_of_week="Friday",
+                start_time=time(20, 0),
+                max_signups=capacity,
+                owner_id=owner.id,
+            )
+            session.add(show)
+            session.flush()
+            instance = ShowInstance(
+                show_id=show.id, instance_date=date.today() + timedelta(days=7)
+            )
+            session.add(instance)
+            session.commit()
+            instance_id = instance.id
+            comedian_ids = [comedian.id for comedian in comedians]
+
+        def attempt(comedian_id):
+            with Session(engine) as session:
+                instance = session.get(ShowInstance, instance_id)
+                try:
+                    sign_up(instance, comedian_id, session=session)
+                    return 200
+                except SignupError as e:
+                    return e.status_code
+
+        with ThreadPoolExecutor(max_workers=32) as pool:
+            results = list(pool.map(attempt, comedian_ids))
+
+        with Session(engine) as session:
+            stored = session.scalar(
+                select(func.count(Signup.id)).where(
+                    Signup.show_instance_id == instance_id
+                )
+            )
+            counter = session.get(ShowInstance, instance_id).signup_count
+
+    assert results.count(200) == capacity
+    assert results.count(409) == attempts - capacity
+    assert stored == counter == capacity
+
+
+def test_full_flag_follows_count_and_capacity(app_ctx):
+    owner = make_user("fullowner")
+    first = make_user("fullfirst")
+    second = make_user("fullsecond")
+    show = make_show(owner, max_signups=2)
+    instance = _instance(show)
+
+    sign_up(instance, first.id)
+    signup = sign_up(instance, second.id)
+    assert instance.is_full
+
+    remove_signup(signup)
+    assert not instance.is_full
+
+    instance.max_signups_override = 1
+    db.session.commit()
+    assert instance.is_full
+
+    instance.max_signups_override = None
+    show.max_signups = 5
+    db.session.commit()
+    assert not instance.is_full
+
+
+def test_orm_writes_outside_the_service_are_counted(app_ctx):
+    owner = make_user("ormowner")
+    comedians = [make_user(f"ormcomic{n}") for n in range(3)]
+    instance = _instance(make_show(owner, max_signups=3))
+
+    db.session.add_all(
+        Signup(comedian_id=comedian.id, show_instance_id=instance.id)
+        for comedian in comedians
+    )
+    db.session.commit()
+    assert (instance.signup_count, instance.is_full) == (3, True)
+
+    db.session.delete(Signup.query.filter_by(comedian_id=comedians[0].id).one())
+    db.session.commit()
+    assert (instance.signup_count, instance.is_full) == (2, False)
+
+
+def test_reconcile_fixes_drift(app_ctx):
+    owner = make_user("driftowner")
+    comedian = make_user("driftcomic")
+    show = make_show(owner, max_signups=1)
+    drifted = _instance(show)
+    healthy = _instance(show, days_ahead=14)
+    sign_up(drifted, comedian.id)
+    db.session.execute(
+        ShowInstance.__table__.update()
+        .where(ShowInstance.id == drifted.id)
+        .values(signup_count=7, is_full=False)
+    )
+    db.session.commit()
+
+    assert reconcile_signup_counts(fix=False) == [(drifted.id, 7, 1, True)]
+    assert db.session.get(ShowInstance, drifted.id).signup_count == 7
+
+    assert reconcile_signup_counts() == [(drifted.id, 7, 1, True)]
+    db.session.expire_all()
+    assert db.session.get(ShowInstance, drifted.id).signup_count == 1
+    assert db.session.get(ShowInstance, drifted.id).is_full
+    assert not db.session.get(ShowInstance, healthy.id).is_full
+    assert reconcile_signup_counts() == []
+
+    result = app.test_cli_runner().invoke(args=["reconcile-signup-counts"])
+    assert '"drifted": 0' in result.output
@@ -0,0 +1,96 @@
+"""
+Tests for the streaming JSON helpers and the signup export
+"""
+
+import json
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+import streaming
+from app import app, db
+from models import ShowInstance, Signup
+from streaming import iter_json_array, iter_rows
+from tests.conftest import count_queries, make_show, make_user
+
+
+@pytest.mark.parametrize("fast", [True, False])
+def test_array_chunks_decode_to_the_items(monkeypatch, fast):
+    if not fast:
+        monkeypatch.setattr(streaming, "orjson", None)
+    items = [
+        {"id": n, "day": date(2030, 1, 1) + timedelta(days=n), "name": f"Row {n}"}
+        for n in range(500)
+    ]
+
+    chunks = list(iter_json_array(items, chunk_size=1024))
+
+    assert len(chunks) > 1
+    assert all(len(chunk) < 1024 + 100 for chunk in chunks)
+    decoded = json.loads(b"".join(chunks))
+    assert decoded[3] == {"id": 3, "day": "2030-01-04", "name": "Row 3"}
+    assert len(decoded) == 500
+    assert b"".join(iter_json_array([])) == b"[]"
+
+
+def test_encoders_agree_on_dates(monkeypatch):
+    value = {"at": datetime(2030, 1, 1, 20, 30), "on": date(2030, 1, 1)}
+    fast = streaming.dumps(value)
+    monkeypatch.setattr(streaming, "orjson", None)
+    assert json.loads(fast) == json.loads(streaming.dumps(value))
+
+
+def _signups(owner, comedians, weeks=3):
+    show = make_show(owner)
+    for week in range(weeks):
+        instance = ShowInstance(
+            show_id=show.id, instance_date=date(2030, 1, 2) + timedelta(weeks=week)
+        )
+        db.session.add(instance)
+        db.session.flush()
+        for position, comedian in enumerate(comedians, start=1):
+            db.session.add(
+                Signup(
+                    comedian_id=comedian.id,
+                    show_instance_id=instance.id,
+                    position=position,
+                )
+            )
+    db.session.commit()
+    return show
+
+
+def test_iter_rows_fetches_lazily(app_ctx):
+    owner = make_user("rowsowner")
+    _signups(owner, [make_user(f"rowscomic{n}") for n in range(4)])
+
+    with count_queries() as queries:
+        rows = iter_rows(select(Signup.id).order_by(Signup.id), batch_size=5)
+        assert queries == []
+        assert len(list(rows)) == 12
+    assert len(queries) == 1
+
+
+def test_export_streams_a_shows_signups(app_ctx):
+    owner = make_user("exportowner")
+    owner.set_password("testpass123")
+    comedians = [make_user(f"exportcomic{n}") for n in range(2)]
+    comedians[0].set_password("testpass123")
+    show = _signups(owner, comedians)
+
+    client = app.test_client()
+    client.post("/login", data={"username": "exportowner", "password": "testpass123"})
+    response = client.get(f"/api/show/{show.id}/signups/export", buffered=False)
+    assert response.is_streamed
+    rows = json.loads(b"".join(response.response))
+    response.close()
+
+    assert len(rows) == 6
+    assert rows[0]["instance_date"] == "2030-01-02"
+    assert (rows[0]["first_name"], rows[0]["position"]) == ("Exportcomic0", 1)
+    assert {row["instance_date"] for row in rows[-2:]} == {"2030-01-16"}
+
+    client.get("/logout")
+    client.post("/login", data={"username": "exportcomic0", "password": "testpass123"})
+    assert client.get(f"/api/show/{show.id}/signups/export").status_code == 403
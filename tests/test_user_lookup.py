@@ -0,0 +1,120 @@
+"""
+Tests for case-insensitive user resolution and name search
+"""
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app import app, db
+from models import User
+from tests.conftest import count_queries, make_user
+from user_lookup import (
+    find_user_by_email,
+    fuzzy_search,
+    prefix_search,
+    resolve_user,
+    search_users,
+)
+
+
+def test_usernames_and_emails_resolve_ignoring_case(app_ctx):
+    user = make_user("MixedCase", email="Mixed.Case@Test.com")
+    db.session.commit()
+
+    assert resolve_user("mixedcase") is user
+    assert resolve_user("  @MIXEDCASE ") is user
+    assert resolve_user("mixed.case@test.COM") is user
+    assert find_user_by_email("MIXED.CASE@TEST.COM") is user
+    assert resolve_user("") is None
+    assert resolve_user("nobody") is None
+
+
+def test_login_and_registration_ignore_case(app_ctx):
+    make_user("casey").set_password("testpass123")
+    db.session.commit()
+
+    with app.test_client() as client:
+        login = client.post(
+            "/login", data={"username": "CASEY", "password": "testpass123"}
+        )
+        client.get("/logout")
+        register = client.post(
+            "/register",
+            data={
+                "username": "Casey",
+                "email": "CASEY@test.com",
+                "first_name": "Other",
+                "last_name": "Casey",
+                "password": "secret123",
+                "password2": "secret123",
+            },
+        )
+
+    assert login.status_code == 302
+    assert b"Please use a different username." in register.data
+    assert b"Please use a different email address." in register.data
+    assert User.query.count() == 1
+
+
+def test_usernames_with_at_signs_still_resolve(app_ctx):
+    legacy = make_user("joe@home", email="joe@example.com")
+    other = make_user("joe", email="joe@home.example")
+    db.session.commit()
+
+    assert resolve_user("joe@home") is legacy
+    assert resolve_user("JOE@EXAMPLE.com") is legacy
+    assert resolve_user("joe@home.example") is other
+
+
+def test_registration_rejects_at_signs_and_case_duplicates(app_ctx):
+    make_user("casey")
+    db.session.commit()
+
+    with app.test_client() as client:
+        response = client.post(
+            "/register",
+            data={
+                "username": "new@user",
+                "email": "new@test.com",
+                "first_name": "New",
+                "last_name": "User",
+                "password": "secret123",
+                "password2": "secret123",
+            },
+        )
+
+    assert b"Usernames cannot contain @." in response.data
+    with pytest.raises(IntegrityError, match="UNIQUE|unique"):
+        make_user("CASEY", email="other@test.com")
+    db.session.rollback()
+
+
+def test_prefix_search_is_cached_and_refreshed_on_commit(app_ctx):
+    make_user("zed", first_name="Zelda", last_name="Quip")
+    make_user("zany", first_name="Amy", last_name="Zander")
+    make_user("other", first_name="Otto", last_name="Nobody")
+    db.session.commit()
+
+    assert [u.username for u in prefix_search("Z")] == ["zany", "zed"]
+    assert [u.username for u in prefix_search("zelda q")] == ["zed"]
+    with count_queries() as queries:
+        assert [u.username for u in prefix_search("otto")] == ["other"]
+    assert queries == []
+
+    make_user("zebra", first_name="Zebra", last_name="Stripes")
+    db.session.commit()
+    assert len(prefix_search("ze")) == 2
+    assert prefix_search("  ") == []
+
+
+def test_fuzzy_search_finds_misspelled_names(app_ctx):
+    make_user("jsmith", first_name="John", last_name="Smith")
+    make_user("jsmythe", first_name="Jane", last_name="Smythe")
+    make_user("unrelated", first_name="Pat", last_name="Oleary")
+    db.session.commit()
+
+    assert [u.username for u in fuzzy_search("Jon Smiht")][:1] == ["jsmith"]
+    assert "unrelated" not in {u.username for u in fuzzy_search("Jon Smiht")}
+    # No name starts with the typo, so the typeahead falls back to similarity
+    assert prefix_search("smiht") == []
+    assert "jsmith" in {u.username for u in search_users("smiht")}
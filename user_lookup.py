@@ -0,0 +1,219 @@
+"""
+Finding users by username, email or name.
+
+Every path that turns typed input into a user goes through here so that
+case handling is the same everywhere: usernames and emails match
+case-insensitively, through the unique ``lower(username)`` and
+``lower(email)`` expression indexes in indexes.py rather than a scan.
+
+Name search (host pickers, adding comedians) uses an in-memory index of
+every user, built with one projected query and kept in the ``users`` cache
+until a commit adds, removes or renames a user. It holds
+
+- sorted ``(key, user_id)`` pairs of lowercased usernames, first, last and
+  full names, so a prefix lookup is a ``bisect``
+- postings of name trigrams (as in pg_trgm), so misspelled names are found
+  by trigram similarity without comparing the query against every user
+"""
+
+from bisect import bisect_left
+from dataclasses import dataclass
+
+from flask import has_app_context
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from app import db
+from cache import get_cache
+from models import User
+
+SEARCH_LIMIT = 10
+SEARCH_MAX_LIMIT = 25
+SIMILARITY_THRESHOLD = 0.3
+INDEX_KEY = "search-index"
+INDEXED_FIELDS = ("username", "first_name", "last_name")
+
+
+@dataclass(slots=True, frozen=True)
+class UserSummary:
+    id: int
+    username: str
+    first_name: str
+    last_name: str
+
+    @property
+    def full_name(self):
+        return f"{self.first_name} {self.last_name}"
+
+    def to_dict(self):
+        return {"id": self.id, "name": self.full_name, "username": self.username}
+
+
+def normalize(value):
+    """Lowercased, trimmed form used for username and email matching"""
+    return (value or "").strip().lower()
+
+
+def _find_by(column, value):
+    value = (value or "").strip()
+    if not value:
+        return None
+    # Prefer an exact-case match if older rows differ only by case
+    return (
+        User.query.filter(func.lower(column) == value.lower())
+        .order_by((column == value).desc(), User.id)
+        .first()
+    )
+
+
+def find_user_by_username(username):
+    """The user with ``username``, ignoring case, or None"""
+    return _find_by(User.username, username)
+
+
+def find_user_by_email(email):
+    """The user with ``email``, ignoring case, or None"""
+    return _find_by(User.email, email)
+
+
+def resolve_user(identifier):
+    """The user named by a username, ``@username`` or email address"""
+    identifier = (identifier or "").strip()
+    if "@" in identifier[1:]:
+        # Older usernames may contain "@" too
+        return find_user_by_email(identifier) or find_user_by_username(identifier)
+    return find_user_by_username(identifier.removeprefix("@"))
+
+
+def trigrams(text):
+    """pg_trgm-style trigrams: each word padded with two spaces before, one after"""
+    grams = set()
+    for word in "".join(c if c.isalnum() else " " for c in text.lower()).split():
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _name_variants(user):
+    return (user.full_name, user.username, user.first_name, user.last_name)
+
+
+def build_search_index():
+    """``(keys, postings, grams, users)`` for every user
+
+    ``postings`` maps a trigram to the ids of users with it in any name;
+    ``grams`` holds each user's trigram set per name variant.
+    """
+    rows = db.session.execute(
+        select(User.id, User.username, User.first_name, User.last_name)
+    )
+    users = {}
+    keys = []
+    postings = {}
+    grams = {}
+    for row in rows:
+        user = UserSummary(*row)
+        users[user.id] = user
+        words = {getattr(user, field).lower() for field in INDEXED_FIELDS}
+        words.add(user.full_name.lower())
+        keys.extend((word, user.id) for word in words if word)
+        grams[user.id] = tuple(trigrams(name) for name in _name_variants(user))
+        for gram in set().union(*grams[user.id]):
+            postings.setdefault(gram, []).append(user.id)
+    keys.sort()
+    return keys, postings, grams, users
+
+
+def get_search_index():
+    cache = get_cache("users")
+    index = cache.get(INDEX_KEY)
+    if index is None:
+        index = build_search_index()
+        cache.set(INDEX_KEY, index)
+    return index
+
+
+def _by_name(users):
+    return sorted(users, key=lambda user: (user.full_name.lower(), user.id))
+
+
+def prefix_search(prefix, limit=SEARCH_LIMIT):
+    """Users whose username, first, last or full name starts with ``prefix``"""
+    prefix = " ".join(prefix.lower().split())
+    if not prefix:
+        return []
+    keys, _, _, users = get_search_index()
+    found = {}
+    position = bisect_left(keys, (prefix,))
+    while position < len(keys) and len(found) < limit:
+        key, user_id = keys[position]
+        if not key.startswith(prefix):
+            break
+        found.setdefault(user_id, users[user_id])
+        position += 1
+    return _by_name(found.values())
+
+
+def fuzzy_search(query, limit=SEARCH_LIMIT, threshold=SIMILARITY_THRESHOLD):
+    """Users whose full name, username, first or last name resembles ``query``
+
+    Similarity is pg_trgm's ``similarity()``: shared trigrams over all
+    trigrams of the two strings, taking the user's closest name. Best
+    matches come first.
+    """
+    wanted = trigrams(query)
+    if not wanted:
+        return []
+    _, postings, grams, users = get_search_index()
+    candidates = set()
+    for gram in wanted:
+        candidates.update(postings.get(gram, ()))
+
+    scored = []
+    for user_id in candidates:
+        score = max(len(wanted & name) / len(wanted | name) for name in grams[user_id])
+        if score >= threshold:
+            scored.append((-score, users[user_id].full_name.lower(), user_id))
+    scored.sort()
+    return [users[user_id] for _, _, user_id in scored[:limit]]
+
+
+def search_users(query, limit=SEARCH_LIMIT):
+    """Prefix matches, topped up with fuzzy matches when there are few"""
+    found = prefix_search(query, limit)
+    if len(found) < limit:
+        seen = {user.id for user in found}
+        found.extend(user for user in fuzzy_search(query, limit) if user.id not in seen)
+    return found[:limit]
+
+
+def invalidate_search_index():
+    get_cache("users").delete(INDEX_KEY)
+
+
+@event.listens_for(Session, "after_flush")
+def _note_user_changes(session, flush_context):
+    """Mark the search index stale when users are added, removed or renamed"""
+    for obj in session.new | session.deleted:
+        if isinstance(obj, User):
+            session.info["user_index_stale"] = True
+            return
+    for obj in session.dirty:
+        if isinstance(obj, User):
+            state = db.inspect(obj)
+            if any(
+                state.attrs[field].history.has_changes() for field in INDEXED_FIELDS
+            ):
+                session.info["user_index_stale"] = True
+                return
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_search_index(session):
+    if session.info.pop("user_index_stale", False) and has_app_context():
+        invalidate_search_index()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_user_changes(session):
+    session.info.pop("user_index_stale", None)